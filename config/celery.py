@@ -15,9 +15,13 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute='*/10'),
     },
     'daily-statistics': {
-        'task': 'habits.tasks.send_daily_statistics',
+        'task': 'habits.tasks.send_daily_digests',
         'schedule': crontab(hour=9, minute=0),  # Каждый день в 9 утра
     },
+    'expire-streaks': {
+        'task': 'habits.tasks.expire_streaks',
+        'schedule': crontab(hour=0, minute=5),  # Сразу после начала нового дня
+    },
     'weekly-schedule': {
         'task': 'habits.tasks.schedule_weekly_reminders',
         'schedule': crontab(day_of_week='mon', hour=0, minute=0),  # Каждый понедельник
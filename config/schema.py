@@ -0,0 +1,143 @@
+# config/schema.py
+"""
+OpenAPI-схема API.
+
+drf-yasg строит схему обходом всех представлений и сериализаторов, поэтому
+она генерируется заранее командой generate_schema (при деплое) и сохраняется
+в SCHEMA_DIR. Представления схемы отдают сохраненный файл из памяти
+процесса с ETag (файл перечитывается только после изменения). Генерация
+на лету используется лишь при DEBUG, если файла нет.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.views import UI_RENDERERS, get_schema_view
+from rest_framework import permissions
+
+API_VERSION = 'v1'
+
+API_INFO = openapi.Info(
+    title="Habits API",
+    default_version=API_VERSION,
+    description="API для трекера полезных привычек",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@habits.local"),
+    license=openapi.License(name="MIT License"),
+)
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+# Кодеки сохраняемых файлов: расширение -> кодек
+SCHEMA_CODECS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+
+# Формат запроса (суффикс URL или ?format=) -> (файл схемы, Content-Type)
+SCHEMA_FORMATS = {
+    '.json': ('json', 'application/json'),
+    '.yaml': ('yaml', 'application/yaml'),
+    'openapi': ('json', 'application/openapi+json'),
+}
+
+
+def get_schema_path(extension):
+    """Путь к файлу схемы текущей версии API, например schema/openapi-v1.json"""
+    return os.path.join(settings.SCHEMA_DIR, f'openapi-{API_VERSION}.{extension}')
+
+
+def generate_schema():
+    """Генерирует схему и возвращает содержимое файлов: {расширение: bytes}"""
+    generator = schema_view.generator_class(API_INFO, API_VERSION)
+    schema = generator.get_schema(request=None, public=True)
+    return {extension: codec(validators=[]).encode(schema) for extension, codec in SCHEMA_CODECS.items()}
+
+
+def write_schema():
+    """Генерирует и сохраняет файлы схемы; возвращает их пути"""
+    os.makedirs(settings.SCHEMA_DIR, exist_ok=True)
+    paths = []
+    for extension, content in generate_schema().items():
+        path = get_schema_path(extension)
+        # Запись через временный файл: работающие процессы не увидят недописанную схему
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+@lru_cache(maxsize=len(SCHEMA_CODECS))
+def _read_schema_file(path, mtime):
+    with open(path, 'rb') as file:
+        content = file.read()
+    return content, '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def get_schema_file(extension):
+    """(содержимое, ETag) сохраненной схемы или None, если файла нет"""
+    path = get_schema_path(extension)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_schema_file(path, mtime)
+
+
+def serve_schema(request, schema_format, live_view, *args, **kwargs):
+    extension, content_type = SCHEMA_FORMATS[schema_format]
+    schema_file = get_schema_file(extension)
+    if schema_file is None:
+        if settings.DEBUG:
+            return live_view(request, *args, **kwargs)
+        raise Http404('Схема API не сгенерирована (manage.py generate_schema)')
+
+    content, etag = schema_file
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def schema_file_view():
+    """Представление /swagger.json и /swagger.yaml"""
+    live_view = schema_view.without_ui(cache_timeout=0)
+
+    def view(request, format):
+        return serve_schema(request, format, live_view, format=format)
+
+    return view
+
+
+def schema_ui_view(renderer):
+    """
+    Представление Swagger UI / ReDoc.
+
+    Страница интерфейса строится без обхода API, а саму схему
+    интерфейс запрашивает по ?format=openapi - она отдается из файла.
+    """
+    ui_view = schema_view.as_cached_view(renderer_classes=UI_RENDERERS[renderer])
+    live_view = schema_view.without_ui(cache_timeout=0)
+
+    def view(request, *args, **kwargs):
+        schema_format = request.GET.get('format')
+        if schema_format in SCHEMA_FORMATS:
+            return serve_schema(request, schema_format, live_view)
+        return ui_view(request, *args, **kwargs)
+
+    return view
@@ -136,6 +136,68 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Настройки кэша (Redis, отдельная база от брокера Celery)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f'{REDIS_URL}/1',
+    }
+}
+
+# Хранилище JWT токенов пользователей (см. token_management.services)
+TOKEN_REDIS_URL = f'{REDIS_URL}/3'
+TOKEN_REDIS_MAX_CONNECTIONS = 50
+TOKEN_PIPELINE_BATCH_SIZE = 1000  # ключей в одном MGET / конвейере
+
+# Кэш проверенных JWT (см. token_management.authentication)
+JWT_AUTH_CACHE_SIZE = 10000  # токенов в памяти процесса
+JWT_AUTH_USER_CACHE_TIMEOUT = 60  # секунд хранения пользователя в кэше
+
+# Кэш каталога публичных привычек (см. habits.cache)
+PUBLIC_HABITS_CACHE_TIMEOUT = int(os.getenv('PUBLIC_HABITS_CACHE_TIMEOUT', 300))  # секунд
+
+# Пакетная отметка выполнений (POST /api/habit-completions/bulk/)
+BULK_COMPLETIONS_MAX_ITEMS = int(os.getenv('BULK_COMPLETIONS_MAX_ITEMS', 1000))
+
+# Пакетное изменение привычек (POST /api/habits/bulk/)
+BULK_HABITS_MAX_ITEMS = int(os.getenv('BULK_HABITS_MAX_ITEMS', 500))
+
+# Потоковая выгрузка истории (см. habits.export)
+EXPORT_CHUNK_SIZE = 2000  # строк в одной выборке курсора и фрагменте ответа
+
+# Время жизни закэшированного chat_id пользователя Telegram (в секундах)
+TELEGRAM_CHAT_ID_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Настройки доставки сообщений Telegram (см. telegram_bot.delivery)
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL')  # None - официальный Bot API
+TELEGRAM_DELIVERY_REDIS_URL = f'{REDIS_URL}/2'
+TELEGRAM_DELIVERY_WORKERS = int(os.getenv('TELEGRAM_DELIVERY_WORKERS', 16))
+TELEGRAM_GLOBAL_RATE_LIMIT = int(os.getenv('TELEGRAM_GLOBAL_RATE_LIMIT', 30))  # сообщений в секунду
+TELEGRAM_CHAT_RATE_LIMIT = 1  # сообщений в секунду в один чат
+TELEGRAM_DELIVERY_MAX_RETRIES = 3  # повторы при сетевых ошибках (429 не учитывается)
+TELEGRAM_DELIVERY_MAX_THROTTLE_WAIT = 300  # предел суммарного ожидания по 429 для сообщения, с
+
+# Настройки асинхронной среды бота (см. telegram_bot.runtime)
+TELEGRAM_BOT_CONCURRENCY = int(os.getenv('TELEGRAM_BOT_CONCURRENCY', 256))  # обновлений одновременно
+TELEGRAM_BOT_DB_WORKERS = int(os.getenv('TELEGRAM_BOT_DB_WORKERS', 8))  # потоков (соединений) для ORM
+TELEGRAM_BOT_DB_CONN_MAX_AGE = int(os.getenv('TELEGRAM_BOT_DB_CONN_MAX_AGE', 600))  # секунд жизни соединения потока ORM
+TELEGRAM_BOT_IO_WORKERS = int(os.getenv('TELEGRAM_BOT_IO_WORKERS', 32))  # потоков для запросов к Bot API
+TELEGRAM_BOT_POLL_TIMEOUT = 30  # секунд long polling для getUpdates
+
+# Режим webhook: обновления складываются в очередь Redis, разбитую на секции по chat_id
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL')  # https://<домен>/api/telegram/webhook/
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET')
+TELEGRAM_UPDATES_REDIS_URL = f'{REDIS_URL}/2'
+TELEGRAM_UPDATE_PARTITIONS = int(os.getenv('TELEGRAM_UPDATE_PARTITIONS', 16))
+
+# Состояние диалогов бота (см. telegram_bot.conversations)
+TELEGRAM_STATE_CACHE_TTL = 30  # секунд до повторного чтения состояния из БД
+TELEGRAM_STATE_CACHE_SIZE = 10000  # диалогов в кэше процесса бота (LRU)
+TELEGRAM_STATE_FLUSH_INTERVAL = 1  # секунд между пакетными записями в БД
+TELEGRAM_STATE_FLUSH_BATCH_SIZE = 500  # записать сразу при стольких измененных диалогах
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -157,7 +219,7 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'token_management.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_ROUTING_TRAILING_SLASH': False
 
@@ -197,8 +259,21 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+
+    # Токены с точным временем выпуска для проверки отзыва (см. token_management.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'token_management.serializers.TokenObtainPairSerializer',
 }
 
-API_BASE_URL = 'http://localhost:8000/api'
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000/api')
+# Запросы к API на этом же сервере (localhost) выполняются внутри процесса без HTTP
+API_CLIENT_LOCAL_DISPATCH = True
+
+# Пул соединений клиента API (см. token_management.api_client)
+API_CLIENT_POOL_SIZE = int(os.getenv('API_CLIENT_POOL_SIZE', 20))
+API_CLIENT_CONNECT_TIMEOUT = 3.05  # секунд
+API_CLIENT_TIMEOUT = 10  # секунд на чтение ответа
+API_CLIENT_RETRIES = 2  # повторы идемпотентных запросов при ошибках соединения и 502/503/504
 
-APPEND_SLASH = False
\ No newline at end of file
+APPEND_SLASH = False
+# Заранее сгенерированная OpenAPI-схема (manage.py generate_schema, см. config.schema)
+SCHEMA_DIR = os.getenv('SCHEMA_DIR', os.path.join(BASE_DIR, 'schema'))
@@ -17,22 +17,8 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Habits API",
-        default_version='v1',
-        description="API для трекера полезных привычек",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@habits.local"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from config.schema import schema_file_view, schema_ui_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -40,10 +26,8 @@ urlpatterns = [
     path('api/auth/', include('djoser.urls.jwt')),
     path('api/telegram/', include('telegram_bot.urls')),
     path('api/', include('habits.urls')),
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0),
-            name='schema-json'),
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0),
-            name='schema-swagger-ui'),
-    re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_file_view(), name='schema-json'),
+    re_path(r'^swagger/$', schema_ui_view('swagger'), name='schema-swagger-ui'),
+    re_path(r'^redoc/$', schema_ui_view('redoc'), name='schema-redoc'),
 
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Habit, HabitCompletion
+from .models import DailyUserStatistics, Habit, HabitCompletion, HabitStatistics
 
 
 @admin.register(Habit)
@@ -7,7 +7,7 @@ class HabitAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'periodicity', 'created_at', 'is_active')
     list_filter = ('periodicity', 'is_active')
     search_fields = ('name', 'user__username')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'next_due_at', 'next_reminder_at')
 
 
 @admin.register(HabitCompletion)
@@ -15,4 +15,17 @@ class HabitCompletionAdmin(admin.ModelAdmin):
     list_display = ('habit', 'user', 'completed_at', 'is_successful')
     list_filter = ('is_successful', 'completed_at')
     search_fields = ('habit__name', 'user__username')
-    readonly_fields = ('completed_at',)
\ No newline at end of file
+    readonly_fields = ('completed_at',)
+
+
+@admin.register(HabitStatistics)
+class HabitStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('habit', 'total_completions', 'current_streak', 'longest_streak', 'last_completed_on')
+    search_fields = ('habit__name',)
+
+
+@admin.register(DailyUserStatistics)
+class DailyUserStatisticsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'completions', 'habits_completed', 'streak')
+    list_filter = ('date',)
+    search_fields = ('user__username',)
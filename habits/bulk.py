@@ -0,0 +1,186 @@
+# habits/bulk.py
+"""
+Пакетное создание, изменение и удаление привычек (POST /api/habits/bulk/).
+
+Все привычки, на которые ссылается пачка (изменяемые, удаляемые и связанные),
+загружаются одним запросом. Поля каждого элемента проверяет
+HabitBatchItemSerializer, а правила связанных привычек и вознаграждений
+проверяются один раз для итогового состояния пачки: например, можно
+в одном запросе сделать привычку приятной и сослаться на нее.
+Пачка записывается целиком (bulk_create / bulk_update / delete в одной
+транзакции) или не записывается совсем.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_public_habits
+from .models import Habit
+from .serializers import HabitBatchItemSerializer, HabitSerializer
+
+NOT_FOUND_MESSAGE = 'Привычка не найдена'
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_section(data, name):
+    items = data.get(name, [])
+    if not isinstance(items, list):
+        raise ValidationError({name: ['Ожидается список']})
+    return items
+
+
+def validate_habit_rules(habit, deleted_ids):
+    """Правила приятных привычек, вознаграждений и связанных привычек (как в HabitSerializer)"""
+    related_habit = habit.related_habit
+    if habit.is_pleasant and (habit.reward or related_habit):
+        return ["Приятная привычка не может иметь вознаграждения или связанной привычки"]
+    if related_habit and habit.reward:
+        return ["Нельзя указать одновременно связанную привычку и вознаграждение"]
+    if related_habit and not related_habit.is_pleasant:
+        return ["Связанная привычка должна быть приятной"]
+    if related_habit and related_habit.pk in deleted_ids:
+        return ["Связанная привычка удаляется в этом же запросе"]
+    return []
+
+
+class HabitBatch:
+    """Пачка изменений привычек пользователя: {create: [...], update: [...], delete: [id, ...]}"""
+
+    def __init__(self, request, data):
+        if not isinstance(data, dict):
+            raise ValidationError('Ожидается объект с полями create, update, delete')
+        self.request = request
+        self.user = request.user
+        self.create_items = _get_section(data, 'create')
+        self.update_items = _get_section(data, 'update')
+        self.delete_items = _get_section(data, 'delete')
+
+        size = len(self.create_items) + len(self.update_items) + len(self.delete_items)
+        if not size:
+            raise ValidationError('Пустой запрос')
+        if size > settings.BULK_HABITS_MAX_ITEMS:
+            raise ValidationError(f'Не больше {settings.BULK_HABITS_MAX_ITEMS} привычек за запрос')
+
+    def load_habits(self):
+        """Одним запросом загружает все привычки, упомянутые в пачке"""
+        ids = {_to_int(pk) for pk in self.delete_items}
+        for item in self.create_items + self.update_items:
+            if isinstance(item, dict):
+                ids.add(_to_int(item.get('id')))
+                ids.add(_to_int(item.get('related_habit')))
+        ids.discard(None)
+        return Habit.objects.select_related('user').in_bulk(ids)
+
+    def is_own(self, habit):
+        return habit is not None and habit.user_id == self.user.id
+
+    def validate(self):
+        """
+        Проверяет пачку и готовит объекты к записи.
+
+        Ошибки возвращаются по разделам и индексам элементов.
+        """
+        self.habits = self.load_habits()
+        context = {'request': self.request, 'habits': self.habits}
+        errors = {
+            'create': [{} for _ in self.create_items],
+            'update': [{} for _ in self.update_items],
+            'delete': [{} for _ in self.delete_items],
+        }
+
+        self.deleted_ids = set()
+        for index, pk in enumerate(self.delete_items):
+            habit = self.habits.get(_to_int(pk))
+            if not self.is_own(habit):
+                errors['delete'][index] = {'id': [NOT_FOUND_MESSAGE]}
+            else:
+                self.deleted_ids.add(habit.pk)
+
+        self.created = []
+        for index, item in enumerate(self.create_items):
+            serializer = HabitBatchItemSerializer(data=item, context=context)
+            if serializer.is_valid():
+                self.created.append((index, Habit(**serializer.validated_data)))
+            else:
+                errors['create'][index] = serializer.errors
+
+        self.updated = []
+        self.update_fields = set()
+        seen = set()
+        for index, item in enumerate(self.update_items):
+            habit = self.habits.get(_to_int(item.get('id'))) if isinstance(item, dict) else None
+            if not self.is_own(habit):
+                errors['update'][index] = {'id': [NOT_FOUND_MESSAGE]}
+                continue
+            if habit.pk in seen or habit.pk in self.deleted_ids:
+                errors['update'][index] = {'id': ['Привычка повторяется в запросе']}
+                continue
+            seen.add(habit.pk)
+            serializer = HabitBatchItemSerializer(habit, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                errors['update'][index] = serializer.errors
+                continue
+            self.updated.append((index, habit, serializer.validated_data))
+
+        # Изменения применяются к загруженным объектам до проверки правил,
+        # поэтому ссылки на привычки из этой же пачки видят их новое состояние
+        for index, habit, validated_data in self.updated:
+            validated_data.pop('user', None)
+            for field, value in validated_data.items():
+                setattr(habit, field, value)
+            self.update_fields.update(validated_data)
+
+        for section, items in (('create', self.created), ('update', self.updated)):
+            for index, habit, *rest in items:
+                rule_errors = validate_habit_rules(habit, self.deleted_ids)
+                if rule_errors:
+                    errors[section][index] = {'non_field_errors': rule_errors}
+
+        if any(any(item_errors) for item_errors in errors.values()):
+            raise ValidationError(errors)
+
+    @transaction.atomic
+    def save(self):
+        created = [habit for index, habit in self.created]
+        for habit in created:
+            habit.refresh_schedule()
+        Habit.objects.bulk_create(created)
+
+        updated = [habit for index, habit, validated_data in self.updated]
+        if updated:
+            fields = self.update_fields | {'updated_at'}
+            now = timezone.now()
+            for habit in updated:
+                if habit.schedule_changed():
+                    habit.refresh_schedule()
+                    fields |= {'next_due_at', 'next_reminder_at'}
+                habit.updated_at = now
+            Habit.objects.bulk_update(updated, fields)
+
+        # Удаление через QuerySet отправляет pre_delete/post_delete: кэш каталога
+        # и дневную статистику обновят сигналы
+        Habit.objects.filter(pk__in=self.deleted_ids).delete()
+
+        # bulk_create и bulk_update не отправляют post_save
+        if any(habit.is_public or getattr(habit, '_loaded_is_public', False)
+               for habit in created + updated):
+            invalidate_public_habits()
+        for habit in created + updated:
+            habit._loaded_is_public = habit.is_public
+            habit._loaded_schedule = (habit.time_to_complete, habit.periodicity)
+
+        context = {'request': self.request}
+        return {
+            'created': HabitSerializer(created, many=True, context=context).data,
+            'updated': HabitSerializer(updated, many=True, context=context).data,
+            'deleted': sorted(self.deleted_ids),
+        }
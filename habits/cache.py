@@ -0,0 +1,87 @@
+# habits/cache.py
+"""
+Кэш каталога публичных привычек.
+
+Страницы PublicHabitListView и список /public бота хранятся в кэше Django
+под ключами, включающими номер версии каталога. При сохранении или удалении
+публичной привычки версия меняется (см. habits.signals), и все старые записи
+перестают использоваться, не требуя перебора ключей. Время жизни записей
+PUBLIC_HABITS_CACHE_TIMEOUT ограничивает устаревание данных, которые меняются
+без сигналов (например, имени автора или через queryset.update). ETag
+страницы - хэш ее содержимого, поэтому после истечения записи такие
+изменения меняют и ETag.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import Habit
+from .renderers import FastJSONRenderer
+
+VERSION_KEY = 'public_habits:version'
+
+
+def get_public_habits_version():
+    """Текущая версия каталога публичных привычек"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = bump_public_habits_version()
+    return version
+
+
+def bump_public_habits_version():
+    """Делает недействительными все закэшированные страницы каталога"""
+    # Метка времени вместо счетчика: после вытеснения ключа версия не повторится
+    version = time.time_ns()
+    cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_public_habits():
+    """Сбрасывает кэш каталога после изменения публичных привычек"""
+    # Повторно после фиксации транзакции: страницы, закэшированные до нее,
+    # могли прочитать старые данные
+    bump_public_habits_version()
+    transaction.on_commit(bump_public_habits_version)
+
+
+def get_query_digest(request):
+    """Хэш запроса: хост, путь и параметры без учета их порядка"""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = repr((request.get_host(), request.path, params))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_page_cache_key(version, digest):
+    return f'public_habits:{version}:page:{digest}'
+
+
+def get_page_etag(data):
+    """ETag страницы: хэш ее содержимого в JSON"""
+    content = FastJSONRenderer().render(data)
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def get_summaries_cache_key(version, limit):
+    return f'public_habits:{version}:summaries:{limit}'
+
+
+def get_public_habit_summaries(limit=10):
+    """Краткий список последних публичных привычек (для бота)"""
+    key = get_summaries_cache_key(get_public_habits_version(), limit)
+    summaries = cache.get(key)
+    if summaries is None:
+        summaries = list(
+            Habit.objects.filter(is_public=True)
+            .values('name', 'action', 'place', username=F('user__username'))[:limit]
+        )
+        cache.set(key, summaries, settings.PUBLIC_HABITS_CACHE_TIMEOUT)
+    return summaries
@@ -0,0 +1,130 @@
+# habits/export.py
+"""
+Потоковая выгрузка истории пользователя (привычки и выполнения) в NDJSON и CSV.
+
+Строки читаются из БД через QuerySet.iterator() (в PostgreSQL - серверный
+курсор) в виде кортежей values_list и сразу отдаются клиенту пачками по
+EXPORT_CHUNK_SIZE, поэтому расход памяти не зависит от объема истории.
+"""
+import csv
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import Habit, HabitCompletion
+
+# Поля выгрузки: (имя в выгрузке, путь для values_list)
+COMPLETION_FIELDS = (
+    ('id', 'id'),
+    ('habit', 'habit_id'),
+    ('habit_name', 'habit__name'),
+    ('completed_at', 'completed_at'),
+    ('is_successful', 'is_successful'),
+    ('notes', 'notes'),
+)
+
+HABIT_FIELDS = (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('description', 'description'),
+    ('place', 'place'),
+    ('action', 'action'),
+    ('periodicity', 'periodicity'),
+    ('time_to_complete', 'time_to_complete'),
+    ('estimated_duration', 'estimated_duration'),
+    ('is_pleasant', 'is_pleasant'),
+    ('is_public', 'is_public'),
+    ('is_active', 'is_active'),
+    ('related_habit', 'related_habit_id'),
+    ('reward', 'reward'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+# Форматирование дат и времени как в ответах API
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+_time_field = serializers.TimeField()
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    if isinstance(value, date):
+        return _date_field.to_representation(value)
+    if isinstance(value, time):
+        return _time_field.to_representation(value)
+    return value
+
+
+def completion_rows(user, since=None):
+    """Выполнения пользователя в порядке (completed_at, id); since - не раньше момента"""
+    queryset = HabitCompletion.objects.filter(user=user)
+    if since is not None:
+        queryset = queryset.filter(completed_at__gte=since)
+    queryset = queryset.order_by('completed_at', 'id')
+    return queryset.values_list(*(path for name, path in COMPLETION_FIELDS))
+
+
+def habit_rows(user, since=None):
+    """Привычки пользователя в порядке (updated_at, id); since - измененные не раньше момента"""
+    queryset = Habit.objects.filter(user=user)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    queryset = queryset.order_by('updated_at', 'id')
+    return queryset.values_list(*(path for name, path in HABIT_FIELDS))
+
+
+EXPORTS = {
+    'completions': (COMPLETION_FIELDS, completion_rows),
+    'habits': (HABIT_FIELDS, habit_rows),
+}
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(names, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(names, map(format_value, row))), ensure_ascii=False
+        ) + '\n'
+
+
+def iter_csv(names, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+RENDERERS = {
+    'ndjson': ('application/x-ndjson', iter_ndjson),
+    'csv': ('text/csv', iter_csv),
+}
+
+
+def stream_export(resource, output, user, since=None):
+    """
+    Генератор фрагментов выгрузки resource ('completions' или 'habits')
+    в формате output ('ndjson' или 'csv').
+    """
+    fields, get_rows = EXPORTS[resource]
+    content_type, render = RENDERERS[output]
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    rows = get_rows(user, since).iterator(chunk_size=chunk_size)
+
+    buffer = []
+    for line in render([name for name, path in fields], rows):
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
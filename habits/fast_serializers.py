@@ -0,0 +1,80 @@
+# habits/fast_serializers.py
+"""
+Быстрая сериализация списков привычек и выполнений (только чтение).
+
+Списки строятся из QuerySet.values(): выбираются только нужные столбцы
+(имя пользователя и название привычки - через JOIN), а словари ответа
+собираются по заранее составленной схеме полей, без создания моделей
+и обхода полей ModelSerializer на каждой строке. Ответ совпадает
+с HabitSerializer / HabitCompletionSerializer байт в байт
+(см. habits/test/test_fast_serializers.py).
+"""
+from rest_framework import serializers
+
+# Поля DRF используются только для форматирования значений, как в основных сериализаторах
+_datetime = serializers.DateTimeField().to_representation
+_time = serializers.TimeField().to_representation
+
+
+def _time_completed(value):
+    return value.strftime('%H:%M') if value else None
+
+
+class ValuesSerializer:
+    """
+    Сериализатор строк values().
+
+    fields - схема ответа: (ключ, путь для values(), преобразование или None).
+    """
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.paths = tuple(dict.fromkeys(path for key, path, convert in cls.fields))
+
+    @classmethod
+    def project(cls, queryset):
+        """Оставляет в выборке только столбцы, нужные для ответа"""
+        return queryset.values(*cls.paths)
+
+    @classmethod
+    def to_representation(cls, rows):
+        fields = cls.fields
+        return [
+            {key: row[path] if convert is None else convert(row[path]) for key, path, convert in fields}
+            for row in rows
+        ]
+
+
+class HabitValuesSerializer(ValuesSerializer):
+    """Список привычек в формате HabitSerializer"""
+    fields = (
+        ('id', 'id', None),
+        ('name', 'name', None),
+        ('description', 'description', None),
+        ('place', 'place', None),
+        ('action', 'action', None),
+        ('user_name', 'user__username', None),
+        ('periodicity', 'periodicity', None),
+        ('time_to_complete', 'time_to_complete', _time),
+        ('estimated_duration', 'estimated_duration', None),
+        ('is_pleasant', 'is_pleasant', None),
+        ('is_public', 'is_public', None),
+        ('related_habit', 'related_habit', None),
+        ('reward', 'reward', None),
+        ('created_at', 'created_at', _datetime),
+        ('updated_at', 'updated_at', _datetime),
+    )
+
+
+class HabitCompletionValuesSerializer(ValuesSerializer):
+    """Список выполнений в формате HabitCompletionSerializer"""
+    fields = (
+        ('id', 'id', None),
+        ('habit', 'habit', None),
+        ('habit_name', 'habit__name', None),
+        ('date_completed', 'completed_at', _datetime),
+        ('time_completed', 'completed_at', _time_completed),
+        ('is_successful', 'is_successful', None),
+        ('notes', 'notes', None),
+    )
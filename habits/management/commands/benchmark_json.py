@@ -0,0 +1,78 @@
+# habits/management/commands/benchmark_json.py
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from habits.fast_serializers import HabitCompletionValuesSerializer, HabitValuesSerializer
+from habits.management.commands.benchmark_serializers import create_benchmark_data
+from habits.models import Habit, HabitCompletion
+from habits.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def best_time(repeat, func):
+    """Лучшее время выполнения func в мс и ее результат"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает JSONRenderer/JSONParser DRF с FastJSONRenderer/FastJSONParser '
+            'на списках привычек и выполнений (данные создаются и откатываются)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--habits', type=int, default=1000, help='Количество привычек')
+        parser.add_argument('--completions', type=int, default=5000, help='Количество выполнений')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого замера')
+
+    def handle(self, *args, **kwargs):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson не установлен: сравнивается стандартный json'))
+
+        with transaction.atomic():
+            user = create_benchmark_data(kwargs['habits'], kwargs['completions'])
+            payloads = {
+                'Привычки': HabitValuesSerializer.to_representation(
+                    HabitValuesSerializer.project(Habit.objects.filter(user=user))
+                ),
+                'Выполнения': HabitCompletionValuesSerializer.to_representation(
+                    HabitCompletionValuesSerializer.project(HabitCompletion.objects.filter(user=user))
+                ),
+            }
+            transaction.set_rollback(True)
+
+        for title, results in payloads.items():
+            data = {'count': len(results), 'next': None, 'previous': None, 'results': results}
+            self.compare(title, kwargs['repeat'], data)
+
+    def compare(self, title, repeat, data):
+        default_render, default_content = best_time(repeat, lambda: JSONRenderer().render(data))
+        fast_render, fast_content = best_time(repeat, lambda: FastJSONRenderer().render(data))
+        if default_content != fast_content:
+            raise CommandError(f'{title}: ответы рендереров различаются')
+
+        default_parse, parsed = best_time(
+            repeat, lambda: JSONParser().parse(io.BytesIO(default_content))
+        )
+        fast_parse, fast_parsed = best_time(
+            repeat, lambda: FastJSONParser().parse(io.BytesIO(default_content))
+        )
+        if parsed != fast_parsed:
+            raise CommandError(f'{title}: результаты разбора различаются')
+
+        self.stdout.write(
+            f'{title} ({len(default_content) // 1024} КБ): '
+            f'рендеринг {default_render:.1f} -> {fast_render:.1f} мс '
+            f'(x{default_render / fast_render:.1f}), '
+            f'разбор {default_parse:.1f} -> {fast_parse:.1f} мс '
+            f'(x{default_parse / fast_parse:.1f})'
+        )
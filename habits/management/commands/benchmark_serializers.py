@@ -0,0 +1,118 @@
+# habits/management/commands/benchmark_serializers.py
+import platform
+import sqlite3
+import time
+from datetime import timedelta
+
+import django
+import rest_framework
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from habits.fast_serializers import HabitCompletionValuesSerializer, HabitValuesSerializer
+from habits.models import Habit, HabitCompletion
+from habits.serializers import HabitCompletionSerializer, HabitSerializer
+
+User = get_user_model()
+
+
+def describe_environment():
+    """Окружение замера: без него время в миллисекундах нельзя сравнивать"""
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW server_version')
+            vendor = f'PostgreSQL {cursor.fetchone()[0]}'
+    elif vendor == 'sqlite':
+        vendor = f'SQLite {sqlite3.sqlite_version}'
+    return (f'Python {platform.python_version()}, Django {django.get_version()}, '
+            f'DRF {rest_framework.VERSION}, {vendor}, {platform.platform()}')
+
+
+def create_benchmark_data(habits_count, completions_count):
+    """Данные для замеров: пользователь с привычками и выполнениями (в откатываемой транзакции)"""
+    user = User.objects.create_user(username=f'benchmark_{time.time_ns()}')
+    habits = Habit.objects.bulk_create([
+        Habit(
+            user=user,
+            name=f'Привычка {i}',
+            description='Описание' if i % 2 else None,
+            place='Дом',
+            action='Действие',
+            time_to_complete='09:00',
+            is_public=i % 3 == 0
+        )
+        for i in range(habits_count)
+    ])
+    if habits and completions_count:
+        now = timezone.now()
+        HabitCompletion.objects.bulk_create([
+            HabitCompletion(
+                habit=habits[i % len(habits)],
+                user=user,
+                completed_at=now - timedelta(minutes=i),
+                notes='Заметка' if i % 4 == 0 else None
+            )
+            for i in range(completions_count)
+        ])
+    return user
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость сериализации списков привычек и выполнений: '
+            'ModelSerializer и values()-сериализация (данные создаются и откатываются)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--habits', type=int, default=1000, help='Количество привычек')
+        parser.add_argument('--completions', type=int, default=5000, help='Количество выполнений')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов каждого замера')
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(f'Окружение: {describe_environment()}')
+        self.stdout.write(
+            f'Данные: {kwargs["habits"]} привычек, {kwargs["completions"]} выполнений, '
+            f'лучшее из {kwargs["repeat"]} повторов'
+        )
+        with transaction.atomic():
+            user = create_benchmark_data(kwargs['habits'], kwargs['completions'])
+            habits = Habit.objects.filter(user=user).order_by('-created_at', '-id')
+            completions = HabitCompletion.objects.filter(user=user).order_by('-completed_at', '-id')
+
+            self.compare(
+                'Привычки', kwargs['repeat'],
+                lambda: HabitSerializer(habits.select_related('user'), many=True).data,
+                lambda: HabitValuesSerializer.to_representation(HabitValuesSerializer.project(habits))
+            )
+            self.compare(
+                'Выполнения', kwargs['repeat'],
+                lambda: HabitCompletionSerializer(completions.select_related('habit'), many=True).data,
+                lambda: HabitCompletionValuesSerializer.to_representation(
+                    HabitCompletionValuesSerializer.project(completions)
+                )
+            )
+            transaction.set_rollback(True)
+
+    def measure(self, repeat, serialize):
+        """Лучшее время (в мс) выборки, сериализации и рендеринга JSON"""
+        best = None
+        content = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = JSONRenderer().render(serialize())
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def compare(self, title, repeat, model_path, values_path):
+        model_time, model_content = self.measure(repeat, model_path)
+        values_time, values_content = self.measure(repeat, values_path)
+        if model_content != values_content:
+            raise CommandError(f'{title}: ответы сериализаторов различаются')
+
+        self.stdout.write(
+            f'{title}: ModelSerializer {model_time:.1f} мс, values() {values_time:.1f} мс, '
+            f'ускорение x{model_time / values_time:.1f}'
+        )
@@ -0,0 +1,18 @@
+# habits/management/commands/generate_schema.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = 'Генерирует OpenAPI-схему API в SCHEMA_DIR (выполняется при деплое)'
+
+    def handle(self, *args, **kwargs):
+        started = time.perf_counter()
+        paths = write_schema()
+        elapsed = (time.perf_counter() - started) * 1000
+        for path in paths:
+            self.stdout.write(f'Схема сохранена: {path}')
+        self.stdout.write(self.style.SUCCESS(f'Схема сгенерирована за {elapsed:.0f} мс'))
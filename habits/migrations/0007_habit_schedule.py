@@ -0,0 +1,69 @@
+# Generated by Django 4.2.1 on 2026-10-18 02:56
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_schedule(apps, schema_editor):
+    """Рассчитать ближайшее выполнение и напоминание для существующих привычек."""
+    Habit = apps.get_model("habits", "Habit")
+    now = timezone.now()
+    tz = timezone.get_current_timezone()
+    today = timezone.localtime(now, tz).date()
+
+    habits = Habit.objects.select_related("user").only(
+        "id", "time_to_complete", "user__notify_before_minutes"
+    )
+    batch = []
+    for habit in habits.iterator(chunk_size=1000):
+        due = timezone.make_aware(datetime.combine(today, habit.time_to_complete), tz)
+        if due <= now:
+            due += timedelta(days=1)
+        habit.next_due_at = due
+        habit.next_reminder_at = due - timedelta(minutes=habit.user.notify_before_minutes)
+        batch.append(habit)
+        if len(batch) >= 1000:
+            Habit.objects.bulk_update(batch, ["next_due_at", "next_reminder_at"])
+            batch = []
+    Habit.objects.bulk_update(batch, ["next_due_at", "next_reminder_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0006_habit_is_active"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="next_due_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Следующее выполнение",
+            ),
+        ),
+        migrations.AddField(
+            model_name="habit",
+            name="next_reminder_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Следующее напоминание",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["next_reminder_at"],
+                name="habit_next_reminder_idx",
+            ),
+        ),
+        migrations.RunPython(fill_schedule, migrations.RunPython.noop),
+    ]
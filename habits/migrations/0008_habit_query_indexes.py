@@ -0,0 +1,39 @@
+# Generated by Django 4.2.1 on 2026-10-18 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0007_habit_schedule"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                fields=["user", "-created_at"], name="habit_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habit",
+            index=models.Index(
+                condition=models.Q(("is_public", True)),
+                fields=["-created_at"],
+                name="habit_public_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitcompletion",
+            index=models.Index(
+                fields=["habit", "-completed_at"], name="completion_habit_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="habitcompletion",
+            index=models.Index(
+                fields=["user", "-completed_at"], name="completion_user_date_idx"
+            ),
+        ),
+    ]
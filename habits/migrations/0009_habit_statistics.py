@@ -0,0 +1,192 @@
+# Generated by Django 4.2.1 on 2026-10-18 03:00
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def backfill_statistics(apps, schema_editor):
+    """Заполнить статистику по уже существующим выполнениям."""
+    HabitCompletion = apps.get_model("habits", "HabitCompletion")
+    HabitStatistics = apps.get_model("habits", "HabitStatistics")
+    DailyUserStatistics = apps.get_model("habits", "DailyUserStatistics")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    rows = (
+        HabitCompletion.objects.annotate(
+            day=TruncDate("completed_at", tzinfo=timezone.get_current_timezone())
+        )
+        .values("habit_id", "habit__periodicity", "user_id", "day")
+        .annotate(
+            total=Count("id"), successful=Count("id", filter=Q(is_successful=True))
+        )
+        .order_by("habit_id", "day")
+    )
+
+    habit_statistics = {}
+    daily = {}
+    for row in rows.iterator():
+        stats = habit_statistics.get(row["habit_id"])
+        if stats is None:
+            stats = habit_statistics[row["habit_id"]] = HabitStatistics(
+                habit_id=row["habit_id"]
+            )
+        stats.total_completions += row["total"]
+        stats.successful_completions += row["successful"]
+        last = stats.last_completed_on
+        if last and (row["day"] - last).days <= row["habit__periodicity"]:
+            stats.current_streak += 1
+        else:
+            stats.current_streak = 1
+        stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+        stats.last_completed_on = row["day"]
+
+        key = (row["user_id"], row["day"])
+        day_stats = daily.get(key)
+        if day_stats is None:
+            day_stats = daily[key] = DailyUserStatistics(
+                user_id=row["user_id"], date=row["day"]
+            )
+        day_stats.completions += row["total"]
+        day_stats.successful_completions += row["successful"]
+        day_stats.habits_completed += 1
+
+    user_days = defaultdict(list)
+    for day_stats in daily.values():
+        user_days[day_stats.user_id].append(day_stats)
+    for user_id, days in user_days.items():
+        days.sort(key=lambda day_stats: day_stats.date)
+        previous = None
+        for day_stats in days:
+            if previous and (day_stats.date - previous.date).days == 1:
+                day_stats.streak = previous.streak + 1
+            else:
+                day_stats.streak = 1
+            previous = day_stats
+        User.objects.filter(pk=user_id).update(
+            streak_days=days[-1].streak,
+            longest_streak=max(day_stats.streak for day_stats in days),
+        )
+
+    HabitStatistics.objects.bulk_create(habit_statistics.values(), batch_size=1000)
+    DailyUserStatistics.objects.bulk_create(daily.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("habits", "0008_habit_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HabitStatistics",
+            fields=[
+                (
+                    "habit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="statistics",
+                        serialize=False,
+                        to="habits.habit",
+                    ),
+                ),
+                (
+                    "total_completions",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Всего выполнений"
+                    ),
+                ),
+                (
+                    "successful_completions",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Успешных выполнений"
+                    ),
+                ),
+                (
+                    "current_streak",
+                    models.PositiveIntegerField(default=0, verbose_name="Текущая серия"),
+                ),
+                (
+                    "longest_streak",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Самая длинная серия"
+                    ),
+                ),
+                (
+                    "last_completed_on",
+                    models.DateField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Дата последнего выполнения",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Статистика привычки",
+                "verbose_name_plural": "Статистика привычек",
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyUserStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата")),
+                (
+                    "completions",
+                    models.PositiveIntegerField(default=0, verbose_name="Выполнений"),
+                ),
+                (
+                    "successful_completions",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Успешных выполнений"
+                    ),
+                ),
+                (
+                    "habits_completed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Выполнено привычек"
+                    ),
+                ),
+                (
+                    "streak",
+                    models.PositiveIntegerField(default=0, verbose_name="Серия дней"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_statistics",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Статистика за день",
+                "verbose_name_plural": "Статистика за день",
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyuserstatistics",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="daily_statistics_user_date_uniq"
+            ),
+        ),
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
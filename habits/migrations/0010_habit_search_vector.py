@@ -0,0 +1,63 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:12
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Вектор пересчитывается триггером при вставке и при изменении полей поиска,
+# поэтому его не нужно поддерживать в save() и он остается верным
+# для bulk_create / update.
+CREATE_TRIGGER_SQL = """
+CREATE FUNCTION habits_habit_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.action, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C') ||
+        setweight(to_tsvector('russian', coalesce(NEW.place, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER habits_habit_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, place, action, search_vector
+    ON habits_habit
+    FOR EACH ROW EXECUTE PROCEDURE habits_habit_search_vector_update();
+
+UPDATE habits_habit SET search_vector = NULL;
+
+CREATE INDEX habit_search_vector_idx ON habits_habit USING gin (search_vector);
+"""
+
+DROP_TRIGGER_SQL = """
+DROP INDEX IF EXISTS habit_search_vector_idx;
+DROP TRIGGER IF EXISTS habits_habit_search_vector_trigger ON habits_habit;
+DROP FUNCTION IF EXISTS habits_habit_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER_SQL, params=None)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("habits", "0009_habit_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="habit",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -1,9 +1,13 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .schedule import next_due_after, reminder_time
 from .validators import (
     validate_execution_time,
     validate_periodicity,
@@ -68,6 +72,24 @@ class Habit(models.Model):
         blank=True
     )
 
+    # Расписание, рассчитываемое при сохранении и отметке о выполнении
+    next_due_at = models.DateTimeField(
+        _('Следующее выполнение'),
+        null=True,
+        blank=True,
+        editable=False
+    )
+    next_reminder_at = models.DateTimeField(
+        _('Следующее напоминание'),
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    # Полнотекстовый индекс по name, description, place и action (см. habits.search).
+    # Заполняется триггером PostgreSQL при записи строки, в SQLite не используется.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     created_at = models.DateTimeField(_('Создано'), auto_now_add=True)
     updated_at = models.DateTimeField(_('Обновлено'), auto_now=True)
 
@@ -75,10 +97,65 @@ class Habit(models.Model):
         verbose_name = _('Привычка')
         verbose_name_plural = _('Привычки')
         ordering = ['-created_at']
+        indexes = [
+            # Привычки пользователя в порядке создания (HabitViewSet, my_habits)
+            models.Index(fields=['user', '-created_at'], name='habit_user_created_idx'),
+            # Каталог публичных привычек (PublicHabitListView, /public в боте)
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(is_public=True),
+                name='habit_public_created_idx'
+            ),
+            # Рассылка напоминаний: next_reminder_at <= now по активным привычкам
+            models.Index(
+                fields=['next_reminder_at'],
+                condition=models.Q(is_active=True),
+                name='habit_next_reminder_idx'
+            ),
+            # GIN-индекс habit_search_vector_idx по search_vector создается миграцией
+            # 0010_habit_search_vector только в PostgreSQL
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.user.username})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_schedule = (
+            instance.__dict__.get('time_to_complete'),
+            instance.__dict__.get('periodicity')
+        )
+        # Для сброса кэша каталога, если привычка перестала быть публичной
+        instance._loaded_is_public = instance.__dict__.get('is_public')
+        return instance
+
+    def schedule_changed(self):
+        """Изменились ли поля, от которых зависит расписание."""
+        loaded = getattr(self, '_loaded_schedule', None)
+        return self.next_due_at is None or loaded != (self.time_to_complete, self.periodicity)
+
+    def refresh_schedule(self, after=None, earliest_date=None):
+        """Пересчитывает ближайшее выполнение и время напоминания."""
+        self.next_due_at = next_due_after(
+            self.time_to_complete,
+            after or timezone.now(),
+            earliest_date
+        )
+        self.next_reminder_at = reminder_time(self.next_due_at, self.user.notify_before_minutes)
+
+    def register_completion(self, completed_at):
+        """Переносит ближайшее выполнение на следующий период после отметки."""
+        completed_date = timezone.localtime(completed_at).date()
+        self.refresh_schedule(
+            after=max(completed_at, timezone.now()),
+            earliest_date=completed_date + timedelta(days=self.periodicity)
+        )
+        Habit.objects.filter(pk=self.pk).update(
+            next_due_at=self.next_due_at,
+            next_reminder_at=self.next_reminder_at
+        )
+
     def clean(self):
         """Проверка бизнес-логики модели."""
         super().clean()
@@ -98,7 +175,14 @@ class Habit(models.Model):
 
     def save(self, *args, **kwargs):
         # Удаляем вызов full_clean() для избежания ошибки 500
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'time_to_complete', 'periodicity'} & set(update_fields):
+            if self.schedule_changed():
+                self.refresh_schedule()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'next_due_at', 'next_reminder_at'}
         super().save(*args, **kwargs)
+        self._loaded_schedule = (self.time_to_complete, self.periodicity)
 
 
 class HabitCompletion(models.Model):
@@ -120,10 +204,114 @@ class HabitCompletion(models.Model):
         verbose_name = _('Выполнение привычки')
         verbose_name_plural = _('Выполнения привычек')
         ordering = ['-completed_at']
+        indexes = [
+            # История выполнений привычки, последние сначала
+            models.Index(fields=['habit', '-completed_at'], name='completion_habit_date_idx'),
+            # Выполнения пользователя за период (статистика)
+            models.Index(fields=['user', '-completed_at'], name='completion_user_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.habit.name} ({self.completed_at})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_completed_at = instance.__dict__.get('completed_at')
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .statistics import record_completions, refresh_statistics
+
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                self.habit.register_completion(self.completed_at)
+                record_completions([self])
+            else:
+                refresh_statistics(self, getattr(self, '_loaded_completed_at', None))
+        self._loaded_completed_at = self.completed_at
+
+    @classmethod
+    def bulk_record(cls, completions):
+        """
+        Сохраняет пачку новых выполнений одним INSERT и в той же транзакции
+        переносит расписание затронутых привычек и обновляет статистику.
+
+        У выполнений должна быть задана привычка habit (с загруженным user).
+        """
+        from .statistics import record_completions
+
+        with transaction.atomic():
+            created = cls.objects.bulk_create(completions)
+            # Расписание определяется последним выполнением каждой привычки
+            latest = {}
+            for completion in created:
+                previous = latest.get(completion.habit_id)
+                if previous is None or completion.completed_at > previous.completed_at:
+                    latest[completion.habit_id] = completion
+            for completion in latest.values():
+                completion.habit.register_completion(completion.completed_at)
+            record_completions(created)
+        return created
+
+    def delete(self, *args, **kwargs):
+        from .statistics import refresh_statistics
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            refresh_statistics(self)
+        return result
+
+
+class HabitStatistics(models.Model):
+    """Накопительная статистика выполнения привычки (обновляется при отметках)."""
+    habit = models.OneToOneField(
+        Habit,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics'
+    )
+    total_completions = models.PositiveIntegerField(_('Всего выполнений'), default=0)
+    successful_completions = models.PositiveIntegerField(_('Успешных выполнений'), default=0)
+    current_streak = models.PositiveIntegerField(_('Текущая серия'), default=0)
+    longest_streak = models.PositiveIntegerField(_('Самая длинная серия'), default=0)
+    last_completed_on = models.DateField(_('Дата последнего выполнения'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Статистика привычки')
+        verbose_name_plural = _('Статистика привычек')
+
+    def __str__(self):
+        return f"{self.habit_id}: {self.total_completions}"
+
+
+class DailyUserStatistics(models.Model):
+    """Статистика выполнения привычек пользователя за день."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_statistics'
+    )
+    date = models.DateField(_('Дата'))
+    completions = models.PositiveIntegerField(_('Выполнений'), default=0)
+    successful_completions = models.PositiveIntegerField(_('Успешных выполнений'), default=0)
+    habits_completed = models.PositiveIntegerField(_('Выполнено привычек'), default=0)
+    # Длина серии дней с выполнениями, заканчивающейся этим днем
+    streak = models.PositiveIntegerField(_('Серия дней'), default=0)
+
+    class Meta:
+        verbose_name = _('Статистика за день')
+        verbose_name_plural = _('Статистика за день')
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='daily_statistics_user_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}: {self.completions}"
+
 
 class TelegramProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='telegram_profile')
@@ -1,7 +1,169 @@
 # habits/pagination.py
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
 
 class HabitPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'page_size'
-    max_page_size = 20
\ No newline at end of file
+    max_page_size = 20
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset).
+
+    Записи упорядочены по паре полей ordering (поле сортировки и уникальный id),
+    а следующая страница выбирается условием "после последней записи
+    предыдущей страницы" вместо OFFSET, поэтому стоимость запроса не зависит
+    от глубины страницы и использует индекс по полю сортировки. Общее число
+    записей (COUNT) считается только по запросу ?count=true.
+
+    Если задан page_number_class, курсорный режим включается параметром
+    ?cursor= (пустое значение - первая страница), иначе используется
+    пагинация по номеру страницы. В курсорном режиме параметр ordering
+    не учитывается.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_number_class = None
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.delegate = None
+        if self.page_number_class and self.cursor_query_param not in request.query_params:
+            self.delegate = self.page_number_class()
+            return self.delegate.paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.count_requested(request) else None
+
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(*position))
+
+        # Лишняя запись показывает, есть ли следующая страница
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+
+        response = {'next': self.get_next_link(), 'results': data}
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_key_fields(self, model):
+        return [model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    def get_position_filter(self, value, pk):
+        """Условие (поле, id) после позиции (value, pk) в порядке ordering"""
+        field, pk_field = (name.lstrip('-') for name in self.ordering)
+        after = 'lt' if self.ordering[0].startswith('-') else 'gt'
+        # Условие по одному полю позволяет планировщику ограничить диапазон индекса
+        return Q(**{f'{field}__{after}e': value}) & (
+            Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'{pk_field}__{after}': pk})
+        )
+
+    def encode_cursor(self, obj):
+        if isinstance(obj, dict):
+            # Строка values() (см. habits.fast_serializers)
+            model = self.model
+            obj = model(**{field.attname: obj[field.name] for field in self.get_key_fields(model)})
+        position = [field.value_to_string(obj) for field in self.get_key_fields(type(obj))]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return [
+                field.to_python(value)
+                for field, value in zip(self.get_key_fields(model), position, strict=True)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'Курсор следующей страницы', 'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': 'Количество записей на странице', 'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param, 'required': False, 'in': 'query',
+                'description': 'Вернуть общее число записей', 'schema': {'type': 'boolean'},
+            },
+        ]
+        if self.page_number_class:
+            # page_size уже описан постраничной пагинацией
+            return self.page_number_class().get_schema_operation_parameters(view) + [
+                parameter for parameter in parameters
+                if parameter['name'] != self.page_size_query_param
+            ]
+        return parameters
+
+
+class HabitKeysetPagination(KeysetPagination):
+    """Привычки по (created_at, id); без ?cursor= - постраничная HabitPagination"""
+    ordering = ('-created_at', '-id')
+    page_number_class = HabitPagination
+
+
+class CompletionKeysetPagination(KeysetPagination):
+    """История выполнений по (completed_at, id); без ?cursor= - постраничная HabitPagination"""
+    ordering = ('-completed_at', '-id')
+    page_number_class = HabitPagination
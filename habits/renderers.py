@@ -0,0 +1,105 @@
+# habits/renderers.py
+"""
+Быстрые JSON-рендерер и парсер для REST API на orjson.
+
+Если orjson не установлен, классы работают как стандартные JSONRenderer
+и JSONParser DRF. Нестандартные типы (Decimal, datetime, date, time,
+ленивые строки перевода и т.п.) преобразуются тем же JSONEncoder DRF,
+поэтому ответ совпадает с ответом JSONRenderer. Отступы (indent)
+и некомпактный вывод отдаются стандартному рендереру.
+
+Классы по умолчанию в REST_FRAMEWORK не меняются: представления подключают
+быстрый JSON явно через FastJSONMixin.
+"""
+import codecs
+import re
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_NON_STR_KEYS
+) if orjson else 0
+
+# Числа из 19 и более цифр могут не поместиться в 64 бита (например, < -2**63)
+LONG_NUMBER = re.compile(rb'\d{19,}')
+LONG_NUMBER_STR = re.compile(r'\d{19,}', re.ASCII)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer на orjson с откатом на стандартный json"""
+
+    def __init__(self):
+        super().__init__()
+        self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как JSONRenderer: JSON должен оставаться подмножеством JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson с откатом на стандартный json"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                body = body.decode(encoding)
+            if (LONG_NUMBER_STR if isinstance(body, str) else LONG_NUMBER).search(body):
+                # orjson превращает целые вне 64 бит во float - такие тела разбирает json
+                parse_constant = json.strict_constant if self.strict else None
+                return json.loads(body, parse_constant=parse_constant)
+            return orjson.loads(body)
+        except (ValueError, LookupError) as exc:
+            # JSONDecodeError и UnicodeDecodeError - подклассы ValueError
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class FastJSONMixin:
+    """
+    Заменяет JSONRenderer и JSONParser в классах DRF по умолчанию
+    на FastJSONRenderer и FastJSONParser; остальные классы сохраняются.
+    """
+    renderer_classes = [
+        FastJSONRenderer if renderer_class is renderers.JSONRenderer else renderer_class
+        for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+    parser_classes = [
+        FastJSONParser if parser_class is JSONParser else parser_class
+        for parser_class in api_settings.DEFAULT_PARSER_CLASSES
+    ]
@@ -0,0 +1,32 @@
+# habits/schedule.py
+"""Расчет расписания выполнения привычек."""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_time
+
+
+def next_due_after(time_to_complete, after, earliest_date=None):
+    """
+    Ближайший момент выполнения привычки строго после after.
+
+    time_to_complete трактуется как локальное время текущего часового пояса.
+    Если указан earliest_date, момент выпадает не раньше этой даты.
+    """
+    if isinstance(time_to_complete, str):
+        time_to_complete = parse_time(time_to_complete)
+
+    tz = timezone.get_current_timezone()
+    day = timezone.localtime(after, tz).date()
+    if earliest_date and earliest_date > day:
+        day = earliest_date
+
+    due = timezone.make_aware(datetime.combine(day, time_to_complete), tz)
+    if due <= after:
+        due = timezone.make_aware(datetime.combine(day + timedelta(days=1), time_to_complete), tz)
+    return due
+
+
+def reminder_time(next_due_at, notify_before_minutes):
+    """Момент отправки напоминания с учетом настройки пользователя."""
+    return next_due_at - timedelta(minutes=notify_before_minutes)
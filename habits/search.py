@@ -0,0 +1,35 @@
+# habits/search.py
+"""
+Полнотекстовый поиск привычек.
+
+В PostgreSQL параметр ?search= ищется по полю Habit.search_vector (GIN-индекс,
+русская морфология) с ранжированием результатов. В остальных СУБД (SQLite
+в тестах) используется обычный поиск SearchFilter по search_fields.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+from rest_framework import filters
+
+SEARCH_CONFIG = 'russian'
+
+
+class HabitSearchFilter(filters.SearchFilter):
+    """SearchFilter, использующий tsvector-индекс привычек в PostgreSQL"""
+
+    def filter_queryset(self, request, queryset, view):
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        query = SearchQuery(' '.join(terms), config=SEARCH_CONFIG)
+        queryset = queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+        # Явная сортировка (?ordering=) важнее релевантности
+        if filters.OrderingFilter.ordering_param not in request.query_params:
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
@@ -51,6 +51,40 @@ class HabitSerializer(serializers.ModelSerializer):
         return data
 
 
+class PrefetchedHabitField(serializers.PrimaryKeyRelatedField):
+    """
+    Ссылка на привычку по ID без отдельного запроса: объект берется
+    из словаря context['habits'], загруженного для всей пачки (см. habits.bulk).
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        habit = self.context['habits'].get(pk)
+        if habit is None:
+            self.fail('does_not_exist', pk_value=data)
+        return habit
+
+
+class HabitBatchItemSerializer(HabitSerializer):
+    """
+    Привычка в пакетном запросе.
+
+    Проверяет только поля: правила связанных привычек проверяются
+    для итогового состояния всей пачки в habits.bulk.
+    """
+    related_habit = PrefetchedHabitField(
+        queryset=Habit.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, data):
+        return data
+
+
 class HabitCompletionSerializer(serializers.ModelSerializer):
     # Добавляем поле для получения информации о привычке
     habit_name = serializers.SerializerMethodField(read_only=True)
@@ -84,4 +118,17 @@ class HabitCompletionSerializer(serializers.ModelSerializer):
             if data['habit'].user != request.user:
                 raise serializers.ValidationError("Можно отмечать только свои привычки")
 
-        return data
\ No newline at end of file
+        return data
+
+
+class BulkCompletionItemSerializer(serializers.Serializer):
+    """
+    Элемент пакетной отметки выполнений.
+
+    Привычка передается по ID: принадлежность пользователю проверяется
+    для всей пачки одним запросом во view.
+    """
+    habit = serializers.IntegerField(min_value=1)
+    completed_at = serializers.DateTimeField(required=False)
+    is_successful = serializers.BooleanField(default=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_public_habits
+from .models import Habit
+from .statistics import get_completion_days, refresh_daily_statistics
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Habit)
+@receiver(post_delete, sender=Habit)
+def invalidate_public_habits_cache(sender, instance, **kwargs):
+    """Сбросить кэш каталога при изменении публичной (или бывшей публичной) привычки."""
+    if instance.is_public or getattr(instance, '_loaded_is_public', False):
+        invalidate_public_habits()
+    instance._loaded_is_public = instance.is_public
+
+
+@receiver(pre_delete, sender=Habit)
+def collect_completion_days(sender, instance, **kwargs):
+    """Запомнить дни выполнений привычки до их каскадного удаления."""
+    # При удалении пользователя вся его статистика удаляется вместе с ним
+    if isinstance(kwargs.get('origin'), User):
+        return
+    instance._completion_days = get_completion_days([instance.pk])
+
+
+@receiver(post_delete, sender=Habit)
+def refresh_statistics_after_habit_delete(sender, instance, **kwargs):
+    """
+    Пересчитать дневную статистику и серии пользователя после удаления привычки.
+
+    Выполнения удаляются каскадом, минуя HabitCompletion.delete.
+    """
+    refresh_daily_statistics(getattr(instance, '_completion_days', set()))
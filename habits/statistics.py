@@ -0,0 +1,283 @@
+# habits/statistics.py
+"""
+Накопительная статистика выполнения привычек.
+
+Счетчики HabitStatistics и DailyUserStatistics обновляются в той же транзакции,
+что и запись HabitCompletion, поэтому чтение статистики сводится к выборке
+одной строки вместо подсчета по всей истории выполнений.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import DailyUserStatistics, HabitCompletion, HabitStatistics
+
+User = get_user_model()
+
+
+def local_date(value):
+    """Дата момента выполнения в текущем часовом поясе."""
+    return timezone.localtime(value).date()
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _apply_streak_day(stats, day, periodicity):
+    """Продлевает серию привычки выполнением в день day (не раньше последнего)."""
+    if stats.last_completed_on == day:
+        return
+    if stats.last_completed_on and (day - stats.last_completed_on).days <= periodicity:
+        stats.current_streak += 1
+    else:
+        stats.current_streak = 1
+    stats.longest_streak = max(stats.longest_streak, stats.current_streak)
+    stats.last_completed_on = day
+
+
+def record_completions(completions):
+    """
+    Учитывает новые выполнения в статистике.
+
+    Вызывается внутри транзакции, в которой выполнения были сохранены.
+    Выполнения задним числом приводят к пересчету серии затронутой привычки.
+    """
+    if not completions:
+        return
+
+    by_habit = defaultdict(list)
+    for completion in completions:
+        by_habit[completion.habit_id].append(completion)
+
+    HabitStatistics.objects.bulk_create(
+        [HabitStatistics(habit_id=habit_id) for habit_id in by_habit],
+        ignore_conflicts=True
+    )
+    statistics = (
+        HabitStatistics.objects.select_related('habit')
+        .only('habit__periodicity', *[field.name for field in HabitStatistics._meta.concrete_fields])
+        .select_for_update(of=('self',))
+        .in_bulk(list(by_habit))
+    )
+
+    backdated = []
+    for habit_id, items in by_habit.items():
+        stats = statistics[habit_id]
+        stats.total_completions += len(items)
+        stats.successful_completions += sum(1 for item in items if item.is_successful)
+        for day in sorted({local_date(item.completed_at) for item in items}):
+            if stats.last_completed_on and day < stats.last_completed_on:
+                backdated.append(habit_id)
+                break
+            _apply_streak_day(stats, day, stats.habit.periodicity)
+
+    HabitStatistics.objects.bulk_update(
+        statistics.values(),
+        ['total_completions', 'successful_completions', 'current_streak',
+         'longest_streak', 'last_completed_on']
+    )
+    if backdated:
+        rebuild_habit_statistics(backdated)
+
+    refresh_daily_statistics(
+        {(completion.user_id, local_date(completion.completed_at)) for completion in completions}
+    )
+
+
+def refresh_statistics(completion, previous_completed_at=None):
+    """Пересчитывает статистику после изменения или удаления выполнения."""
+    rebuild_habit_statistics([completion.habit_id])
+
+    days = {(completion.user_id, local_date(completion.completed_at))}
+    if previous_completed_at:
+        days.add((completion.user_id, local_date(previous_completed_at)))
+    refresh_daily_statistics(days)
+
+
+def rebuild_habit_statistics(habit_ids):
+    """Полностью пересчитывает статистику привычек по истории выполнений."""
+    completions = HabitCompletion.objects.filter(habit_id__in=habit_ids).order_by()
+    totals = {
+        row['habit_id']: row
+        for row in completions.values('habit_id').annotate(
+            total=Count('id'),
+            successful=Count('id', filter=Q(is_successful=True))
+        )
+    }
+    days = defaultdict(list)
+    rows = (
+        completions.annotate(day=TruncDate('completed_at', tzinfo=timezone.get_current_timezone()))
+        .values_list('habit_id', 'day', 'habit__periodicity')
+        .distinct()
+        .order_by('habit_id', 'day')
+    )
+    periodicity = {}
+    for habit_id, day, habit_periodicity in rows:
+        days[habit_id].append(day)
+        periodicity[habit_id] = habit_periodicity
+
+    statistics = []
+    for habit_id in habit_ids:
+        stats = HabitStatistics(habit_id=habit_id)
+        total = totals.get(habit_id)
+        if total:
+            stats.total_completions = total['total']
+            stats.successful_completions = total['successful']
+        for day in days[habit_id]:
+            _apply_streak_day(stats, day, periodicity[habit_id])
+        statistics.append(stats)
+
+    HabitStatistics.objects.bulk_create(
+        statistics,
+        update_conflicts=True,
+        unique_fields=['habit'],
+        update_fields=['total_completions', 'successful_completions', 'current_streak',
+                       'longest_streak', 'last_completed_on']
+    )
+
+
+def get_completion_days(habit_ids):
+    """Пары (user_id, date) дней, в которые выполнялись привычки habit_ids."""
+    return set(
+        HabitCompletion.objects.filter(habit_id__in=habit_ids)
+        .annotate(day=TruncDate('completed_at', tzinfo=timezone.get_current_timezone()))
+        .values_list('user_id', 'day')
+        .distinct()
+        .order_by()
+    )
+
+
+def refresh_daily_statistics(user_days):
+    """
+    Пересчитывает дневную статистику для пар (user_id, date) одним групповым запросом
+    и обновляет серии дней пользователей.
+
+    Вызывается в транзакции записи выполнений. Строки пользователей блокируются
+    до подсчета: параллельная транзакция того же пользователя ждет фиксации
+    текущей и затем считает уже с ее выполнениями, поэтому последняя запись
+    не затирает дневную статистику устаревшим подсчетом.
+    """
+    if not user_days:
+        return
+
+    user_ids = {user_id for user_id, day in user_days}
+    # Порядок блокировки по id исключает взаимные блокировки пачек
+    list(User.objects.select_for_update().filter(pk__in=user_ids).order_by('pk').values_list('pk'))
+    dates = {day for user_id, day in user_days}
+    rows = (
+        HabitCompletion.objects.filter(
+            user_id__in=user_ids,
+            completed_at__gte=_day_start(min(dates)),
+            completed_at__lt=_day_start(max(dates) + timedelta(days=1))
+        )
+        .annotate(day=TruncDate('completed_at', tzinfo=timezone.get_current_timezone()))
+        .values('user_id', 'day')
+        .annotate(
+            completions=Count('id'),
+            successful=Count('id', filter=Q(is_successful=True)),
+            habits=Count('habit', distinct=True)
+        )
+        .order_by()
+    )
+
+    found = {}
+    for row in rows:
+        key = (row['user_id'], row['day'])
+        if key in user_days:
+            found[key] = DailyUserStatistics(
+                user_id=row['user_id'],
+                date=row['day'],
+                completions=row['completions'],
+                successful_completions=row['successful'],
+                habits_completed=row['habits']
+            )
+
+    DailyUserStatistics.objects.bulk_create(
+        found.values(),
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=['completions', 'successful_completions', 'habits_completed']
+    )
+    for user_id, day in user_days - found.keys():
+        DailyUserStatistics.objects.filter(user_id=user_id, date=day).delete()
+
+    first_day = defaultdict(lambda: None)
+    for user_id, day in user_days:
+        if first_day[user_id] is None or day < first_day[user_id]:
+            first_day[user_id] = day
+    for user_id, day in first_day.items():
+        _refresh_user_streaks(user_id, day)
+
+
+def _refresh_user_streaks(user_id, from_date):
+    """Пересчитывает серии дней пользователя начиная с from_date."""
+    rows = list(
+        DailyUserStatistics.objects.filter(
+            user_id=user_id,
+            date__gte=from_date - timedelta(days=1)
+        ).order_by('date')
+    )
+
+    previous_date, previous_streak = None, 0
+    changed = []
+    for row in rows:
+        if row.date < from_date:
+            previous_date, previous_streak = row.date, row.streak
+            continue
+        streak = previous_streak + 1 if previous_date == row.date - timedelta(days=1) else 1
+        if row.streak != streak:
+            row.streak = streak
+            changed.append(row)
+        previous_date, previous_streak = row.date, streak
+
+    DailyUserStatistics.objects.bulk_update(changed, ['streak'])
+
+    if rows:
+        User.objects.filter(pk=user_id).update(
+            streak_days=rows[-1].streak,
+            longest_streak=Greatest('longest_streak', Value(max(row.streak for row in rows)))
+        )
+    else:
+        # Удалены все дни, начиная с from_date: текущая серия заканчивается раньше
+        latest = DailyUserStatistics.objects.filter(user_id=user_id).order_by('-date').first()
+        User.objects.filter(pk=user_id).update(streak_days=latest.streak if latest else 0)
+
+
+def expire_streaks(today=None):
+    """
+    Обнуляет текущие серии, которые уже нельзя продолжить.
+
+    Серии пересчитываются только при отметках, поэтому без этого сброса
+    пользователь, переставший отмечать выполнения, сохранял бы серию.
+    Серия дней пользователя прерывается, если не было выполнений ни сегодня,
+    ни вчера; серия привычки - если с последнего выполнения прошло больше
+    ее периодичности.
+    """
+    today = today or timezone.localdate()
+
+    users = (
+        User.objects.filter(streak_days__gt=0)
+        .exclude(daily_statistics__date__gte=today - timedelta(days=1))
+        .update(streak_days=0)
+    )
+
+    periodicities = (
+        HabitStatistics.objects.filter(current_streak__gt=0)
+        .values_list('habit__periodicity', flat=True)
+        .distinct()
+        .order_by()
+    )
+    expired = Q()
+    for periodicity in periodicities:
+        expired |= Q(habit__periodicity=periodicity,
+                     last_completed_on__lt=today - timedelta(days=periodicity))
+    habits = 0
+    if expired:
+        habits = HabitStatistics.objects.filter(expired, current_streak__gt=0).update(current_streak=0)
+
+    return users, habits
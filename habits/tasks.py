@@ -1,14 +1,18 @@
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
+from functools import partial
 
 from telegram import Bot, ParseMode
 from celery import shared_task
-from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count
 
-from habits.models import Habit, HabitCompletion
+from habits import statistics
+from habits.models import DailyUserStatistics, Habit, TelegramProfile
+from telegram_bot.delivery import Outbox
+from telegram_bot.services import ChatIdService
 from dotenv import load_dotenv
 
 # Настройка логирования
@@ -19,68 +23,98 @@ load_dotenv()
 # Загрузка токена бота
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 
+# Количество привычек в одной задаче пакетной отправки напоминаний
+REMINDER_BATCH_SIZE = 500
+
+# Сколько времени после наступления напоминание еще считается актуальным
+REMINDER_WINDOW = timedelta(minutes=30)
+
+# Количество пользователей на одной странице ежедневной рассылки статистики
+DIGEST_BATCH_SIZE = 1000
+
 
 @shared_task
 def send_habit_reminders():
-    """Отправка напоминаний о привычках, которые нужно выполнить в ближайшее время."""
+    """
+    Отправка напоминаний о привычках, время напоминания которых наступило.
+
+    Привычки отбираются по индексу next_reminder_at, где уже учтены периодичность
+    и настройка пользователя notify_before_minutes. Отобранные привычки сразу
+    переносятся на следующий период, поэтому повторный запуск их не выберет.
+    """
     now = timezone.now()
-    current_time = now.time()
+    stale_before = now - REMINDER_WINDOW
 
-    # Проверяем привычки, время которых в ближайшие 30 минут
-    time_threshold = (now + timedelta(minutes=30)).time()
+    count = 0
+    while True:
+        with transaction.atomic():
+            habits = list(
+                get_due_habits(now)
+                .select_related('user')
+                .only('id', 'time_to_complete', 'periodicity', 'next_due_at',
+                      'next_reminder_at', 'user__notify_before_minutes')
+                .select_for_update(skip_locked=True, of=('self',))[:REMINDER_BATCH_SIZE]
+            )
+            if not habits:
+                break
 
-    # Особый случай: если текущее время например 23:45, а time_threshold будет 00:15
-    if current_time > time_threshold:
-        habits_to_remind = Habit.objects.filter(
-            time_to_complete__gte=current_time
-        ) | Habit.objects.filter(
-            time_to_complete__lte=time_threshold
-        )
-    else:
-        habits_to_remind = Habit.objects.filter(
-            time_to_complete__gte=current_time,
-            time_to_complete__lte=time_threshold
-        )
+            # Напоминания, пропущенные дольше REMINDER_WINDOW (например, при простое), не отправляем
+            habit_ids = [habit.id for habit in habits if habit.next_reminder_at > stale_before]
 
-    # Исключаем привычки, которые уже выполнены сегодня
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            for habit in habits:
+                habit.refresh_schedule(
+                    after=now,
+                    earliest_date=(timezone.localtime(habit.next_due_at).date()
+                                   + timedelta(days=habit.periodicity))
+                )
+            Habit.objects.bulk_update(habits, ['next_due_at', 'next_reminder_at'])
 
-    count = 0
-    for habit in habits_to_remind:
-        # Проверяем, выполнена ли привычка сегодня
-        is_completed_today = HabitCompletion.objects.filter(
-            habit=habit,
-            completed_at__gte=today_start
-        ).exists()
-
-        if not is_completed_today:
-            # Используем .delay() для асинхронного вызова
-            send_habit_reminder.delay(habit.id)
-            count += 1
+            if habit_ids:
+                transaction.on_commit(partial(send_habit_reminders_batch.delay, habit_ids))
+                count += len(habit_ids)
 
     logger.info(f"Запланировано {count} напоминаний о привычках")
     return count
 
 
+def get_due_habits(now):
+    """Активные привычки, время напоминания которых наступило (индекс habit_next_reminder_idx)."""
+    return Habit.objects.filter(is_active=True, next_reminder_at__lte=now).order_by()
+
+
+@shared_task
+def send_habit_reminders_batch(habit_ids):
+    """
+    Формирование напоминаний для пачки привычек и постановка их в очередь доставки.
+
+    Сообщения отправляет процесс DeliveryEngine (команда deliver_messages),
+    который соблюдает лимиты Telegram.
+    """
+    reminders = render_reminders(habit_ids)
+    chat_ids = ChatIdService().get_chat_ids({user_id for user_id, text in reminders})
+
+    messages = []
+    for user_id, text in reminders:
+        telegram_chat_id = chat_ids.get(user_id)
+        if not telegram_chat_id:
+            logger.warning(f"Не найден telegram_chat_id для пользователя {user_id}")
+            continue
+        messages.append({'chat_id': telegram_chat_id, 'text': text})
+
+    Outbox().push_many(messages)
+    return len(messages)
+
+
 @shared_task
 def send_habit_reminder(habit_id):
     """Отправка напоминания о конкретной привычке."""
     try:
         # Получаем привычку из базы по ID для предотвращения ошибок сериализации
-        habit = Habit.objects.get(id=habit_id)
+        habit = Habit.objects.select_related('related_habit', 'statistics').get(id=habit_id)
         bot = Bot(token=TELEGRAM_BOT_TOKEN)
 
-        # Импортируем здесь для предотвращения циклического импорта
-        from telegram_bot import user_data
-
         user_id = habit.user_id
-        telegram_chat_id = None
-
-        # Поиск telegram_chat_id для пользователя
-        for chat_id, data in user_data.items():
-            if data.get('user_id') == user_id:
-                telegram_chat_id = chat_id
-                break
+        telegram_chat_id = get_chat_id_by_user(user_id)
 
         if telegram_chat_id:
             # Формируем текст напоминания
@@ -145,94 +179,182 @@ def schedule_weekly_reminders():
     return scheduled
 
 
-def format_habit_reminder(habit):
-    """Формирование текста напоминания о привычке."""
-    message = f"⏰ *НАПОМИНАНИЕ*\n\n"
-    message += f"Пора выполнить привычку: *{habit.name}*\n"
+# Шаблоны напоминания компилируются один раз: при рендеринге только подставляются значения
+_REMINDER_HEADER = "⏰ *НАПОМИНАНИЕ*\n\nПора выполнить привычку: *{}*\n".format
+_REMINDER_TIME = "Время: {}\n".format
+_REMINDER_PLACE = "Место: {}\n".format
+_REMINDER_ACTION = "Действие: {}\n".format
+_REMINDER_DURATION = "Продолжительность: {} минут\n\n".format
+_REMINDER_RELATED = "После выполнения вы можете: _{}_\n".format
+_REMINDER_REWARD = "Ваша награда: _{}_\n".format
+_REMINDER_PROGRESS = "\nВы выполнили эту привычку {} раз!\n".format
+_REMINDER_FOOTER = "\nНе забудьте отметить выполнение в боте командой /complete"
+
 
-    # Обработка времени выполнения с проверкой типа данных
-    if habit.time_to_complete:
+def _render_reminder(name, time_to_complete, place, action, estimated_duration,
+                     related_habit_name, reward, completions_count):
+    parts = [_REMINDER_HEADER(name)]
+
+    if time_to_complete:
         try:
-            # Если это объект datetime/time, используем strftime
-            time_str = habit.time_to_complete.strftime('%H:%M')
+            time_str = time_to_complete.strftime('%H:%M')
         except (AttributeError, TypeError):
-            # Если это строка или другой тип, используем как есть
-            time_str = habit.time_to_complete
-        message += f"Время: {time_str}\n"
+            # Время еще не приведено к datetime.time (например, строка до сохранения)
+            time_str = time_to_complete
+        parts.append(_REMINDER_TIME(time_str))
+    if place:
+        parts.append(_REMINDER_PLACE(place))
+    if action:
+        parts.append(_REMINDER_ACTION(action))
+    parts.append(_REMINDER_DURATION(estimated_duration))
+
+    # Связанная привычка или награда
+    if related_habit_name:
+        parts.append(_REMINDER_RELATED(related_habit_name))
+    elif reward:
+        parts.append(_REMINDER_REWARD(reward))
+
+    if completions_count:
+        parts.append(_REMINDER_PROGRESS(completions_count))
+    parts.append(_REMINDER_FOOTER)
+    return ''.join(parts)
+
+
+def render_reminders(habit_ids):
+    """
+    Тексты напоминаний для пачки привычек: список (user_id, текст).
 
-    if habit.place:
-        message += f"Место: {habit.place}\n"
+    Привычки, названия связанных привычек и число выполнений (HabitStatistics)
+    читаются одним запросом независимо от размера пачки.
+    """
+    rows = (
+        Habit.objects.filter(id__in=habit_ids)
+        .order_by('id')
+        .values_list(
+            'user_id', 'name', 'time_to_complete', 'place', 'action', 'estimated_duration',
+            'related_habit__name', 'reward', 'statistics__total_completions'
+        )
+    )
+    return [(user_id, _render_reminder(*fields)) for user_id, *fields in rows]
 
-    if habit.action:
-        message += f"Действие: {habit.action}\n"
 
-    message += f"Продолжительность: {habit.estimated_duration} минут\n\n"
+def format_habit_reminder(habit):
+    """Формирование текста напоминания о привычке (для пачки привычек - render_reminders)."""
+    related_habit = getattr(habit, 'related_habit', None)
+    statistics = getattr(habit, 'statistics', None)
+    return _render_reminder(
+        habit.name, habit.time_to_complete, habit.place, habit.action, habit.estimated_duration,
+        related_habit.name if related_habit else None, getattr(habit, 'reward', None),
+        statistics.total_completions if statistics else 0
+    )
+
+
+def format_daily_statistics(day, total_habits, completed):
+    """Формирование текста ежедневной статистики."""
+    # Процент выполнения
+    completion_percentage = (completed / total_habits * 100) if total_habits > 0 else 0
+
+    message = f"📊 *Статистика за {day.strftime('%d.%m.%Y')}*\n\n"
+    message += f"Всего привычек: {total_habits}\n"
+    message += f"Выполнено вчера: {completed}\n"
+    message += f"Процент выполнения: {completion_percentage:.1f}%\n\n"
+
+    if completion_percentage >= 80:
+        message += "🎉 Отличная работа! Продолжайте в том же духе!"
+    elif completion_percentage >= 50:
+        message += "👍 Хороший результат! Стремитесь к большему!"
+    else:
+        message += "💪 Не сдавайтесь! Маленькие шаги приводят к большим результатам!"
 
-    # Добавляем информацию о связанных привычках или наградах
-    if hasattr(habit, 'related_habit') and habit.related_habit:
-        message += f"После выполнения вы можете: _{habit.related_habit.name}_\n"
-    elif hasattr(habit, 'reward') and habit.reward:
-        message += f"Ваша награда: _{habit.reward}_\n"
+    return message
 
-    # Добавляем информацию о прогрессе
-    completions_count = HabitCompletion.objects.filter(habit=habit).count()
-    if completions_count > 0:
-        message += f"\nВы выполнили эту привычку {completions_count} раз!\n"
 
-    message += "\nНе забудьте отметить выполнение в боте командой /complete"
+@shared_task
+def send_daily_digests():
+    """
+    Рассылка ежедневной статистики всем пользователям с привязанным Telegram.
 
-    return message
+    Профили читаются страницами по DIGEST_BATCH_SIZE; для каждой страницы число
+    привычек и выполнения за вчера получаются двумя сгруппированными запросами,
+    а готовые сообщения ставятся в очередь доставки одной командой.
+    """
+    yesterday = timezone.localdate() - timedelta(days=1)
+    outbox = Outbox()
+
+    count = 0
+    last_user_id = 0
+    while True:
+        profiles = list(
+            TelegramProfile.objects.filter(user_id__gt=last_user_id)
+            .order_by('user_id')
+            .values_list('user_id', 'chat_id')[:DIGEST_BATCH_SIZE]
+        )
+        if not profiles:
+            break
+        last_user_id = profiles[-1][0]
+        user_ids = [user_id for user_id, chat_id in profiles]
+
+        total_habits = dict(
+            Habit.objects.filter(user_id__in=user_ids)
+            .order_by()
+            .values('user_id')
+            .annotate(total=Count('id'))
+            .values_list('user_id', 'total')
+        )
+        completed = dict(
+            DailyUserStatistics.objects.filter(user_id__in=user_ids, date=yesterday)
+            .order_by()
+            .values_list('user_id', 'habits_completed')
+        )
+
+        messages = [
+            {
+                'chat_id': chat_id,
+                'text': format_daily_statistics(
+                    yesterday, total_habits.get(user_id, 0), completed.get(user_id, 0)
+                ),
+                'parse_mode': ParseMode.MARKDOWN
+            }
+            for user_id, chat_id in profiles
+            if chat_id
+        ]
+        outbox.push_many(messages)
+        count += len(messages)
+
+    logger.info(f"Поставлено в очередь {count} сообщений со статистикой за {yesterday}")
+    return count
+
+
+@shared_task
+def expire_streaks():
+    """Ежедневный сброс серий пользователей и привычек, прерванных пропуском."""
+    users, habits = statistics.expire_streaks()
+    logger.info(f"Сброшено серий: пользователей {users}, привычек {habits}")
+    return users + habits
 
 
 @shared_task
 def send_daily_statistics(user_id):
-    """Отправка ежедневной статистики выполнения привычек"""
+    """Отправка ежедневной статистики выполнения привычек одному пользователю"""
     try:
-        today = timezone.now().date()
-        yesterday = today - timedelta(days=1)
+        yesterday = timezone.localdate() - timedelta(days=1)
 
         # Получаем привычки пользователя
-        habits = Habit.objects.filter(user_id=user_id)
-        total_habits = habits.count()
-
-        # Получаем выполненные вчера привычки
-        completed_yesterday = HabitCompletion.objects.filter(
-            habit__user_id=user_id,
-            completed_at__date=yesterday
-        ).values('habit').distinct().count()
-
-        # Процент выполнения
-        completion_percentage = (
-                    completed_yesterday / total_habits * 100) if total_habits > 0 else 0
-
-        # Импортируем здесь для предотвращения циклического импорта
-        from telegram_bot import user_data
-
-        telegram_chat_id = None
-        # Поиск telegram_chat_id для пользователя
-        for chat_id, data in user_data.items():
-            if data.get('user_id') == user_id:
-                telegram_chat_id = chat_id
-                break
+        total_habits = Habit.objects.filter(user_id=user_id).count()
 
-        if telegram_chat_id:
-            bot = Bot(token=TELEGRAM_BOT_TOKEN)
-
-            message = f"📊 *Статистика за {yesterday.strftime('%d.%m.%Y')}*\n\n"
-            message += f"Всего привычек: {total_habits}\n"
-            message += f"Выполнено вчера: {completed_yesterday}\n"
-            message += f"Процент выполнения: {completion_percentage:.1f}%\n\n"
+        # Выполненные вчера привычки берем из дневной статистики
+        completed_yesterday = DailyUserStatistics.objects.filter(
+            user_id=user_id,
+            date=yesterday
+        ).values_list('habits_completed', flat=True).first() or 0
 
-            if completion_percentage >= 80:
-                message += "🎉 Отличная работа! Продолжайте в том же духе!"
-            elif completion_percentage >= 50:
-                message += "👍 Хороший результат! Стремитесь к большему!"
-            else:
-                message += "💪 Не сдавайтесь! Маленькие шаги приводят к большим результатам!"
+        telegram_chat_id = get_chat_id_by_user(user_id)
 
+        if telegram_chat_id:
+            bot = Bot(token=TELEGRAM_BOT_TOKEN)
             bot.send_message(
                 chat_id=telegram_chat_id,
-                text=message,
+                text=format_daily_statistics(yesterday, total_habits, completed_yesterday),
                 parse_mode=ParseMode.MARKDOWN
             )
             return True
@@ -247,15 +369,8 @@ def send_daily_statistics(user_id):
 def get_chat_id_by_user(user_id):
     """
     Получить chat_id пользователя Telegram по ID пользователя Django.
-    """
-    # Импортируем здесь для предотвращения циклического импорта
-    from telegram_bot import user_data
-
-    telegram_chat_id = None
-    # Поиск telegram_chat_id для пользователя
-    for chat_id, data in user_data.items():
-        if data.get('user_id') == user_id:
-            telegram_chat_id = chat_id
-            break
 
-    return telegram_chat_id
\ No newline at end of file
+    Chat_id берется из TelegramProfile через общий кэш, поэтому работает
+    и в воркерах Celery, где нет данных процесса бота.
+    """
+    return ChatIdService().get_chat_id(user_id)
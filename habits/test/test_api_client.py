@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from habits.models import Habit
+from habits.views import create_habit_view, get_habits_view
+from token_management.api_client import APIClient, AsyncAPIClient, create_session
+
+User = get_user_model()
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    """Имитация API с поддержкой keep-alive, считающая TCP-соединения"""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'null')
+        time.sleep(self.server.delay)
+        body = json.dumps({
+            'method': self.command,
+            'path': self.path,
+            'authorization': self.headers.get('Authorization'),
+            'data': payload,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+class APIClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAPIHandler)
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        host, port = self.server.server_address
+        settings_override = override_settings(API_BASE_URL=f'http://{host}:{port}/api',
+                                              API_CLIENT_LOCAL_DISPATCH=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        token_service = mock.Mock()
+        token_service.get_user_token.return_value = 'access-token'
+        self.client = APIClient(session=create_session(pool_size=10), token_service=token_service)
+
+    def tearDown(self):
+        self.client.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_reuse_connection(self):
+        """Тест переиспользования соединения между запросами"""
+        for _ in range(5):
+            response = self.client.make_request(1, 'get', '/habits/')
+            self.assertEqual(response.status_code, 200)
+        response = self.client.make_request(1, 'post', '/habits/', data={'name': 'Зарядка'})
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(response.json(), {
+            'method': 'POST',
+            'path': '/api/habits/',
+            'authorization': 'JWT access-token',
+            'data': {'name': 'Зарядка'},
+        })
+
+    def test_unsupported_method(self):
+        """Тест ошибки при неподдерживаемом методе"""
+        with self.assertRaises(ValueError):
+            self.client.make_request(1, 'trace', '/habits/')
+
+    def test_async_client_runs_requests_concurrently(self):
+        """Тест одновременного выполнения запросов асинхронным клиентом"""
+        self.server.delay = 0.1
+
+        async def run():
+            async with AsyncAPIClient(client=self.client, max_workers=10) as async_client:
+                return await async_client.gather([(1, 'get', f'/habits/{i}/') for i in range(10)])
+
+        started = time.monotonic()
+        responses = asyncio.run(run())
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual([response.json()['path'] for response in responses],
+                         [f'/api/habits/{i}/' for i in range(10)])
+        self.assertLessEqual(self.server.connections, 10)
+
+
+@override_settings(API_BASE_URL='http://localhost:8000/api', ALLOWED_HOSTS=['localhost'])
+class LocalDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+        cls.other_user = User.objects.create_user(username='otheruser', password='12345')
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Своя привычка', place='Дом', action='Действие',
+            time_to_complete='09:00'
+        )
+        Habit.objects.create(
+            user=cls.other_user, name='Чужая привычка', place='Дом', action='Действие',
+            time_to_complete='09:00'
+        )
+
+    def setUp(self):
+        self.token_service = mock.Mock()
+        self.token_service.get_user_token.return_value = str(AccessToken.for_user(self.user))
+        self.session = mock.Mock()
+        self.client_instance = APIClient(session=self.session, token_service=self.token_service)
+        patcher = mock.patch('habits.views.get_api_client', return_value=self.client_instance)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_request(self, method='get', data=None):
+        request = getattr(RequestFactory(), method)('/habits/', data or {})
+        request.user = self.user
+        return request
+
+    def test_get_habits_dispatched_in_process(self):
+        """Тест получения привычек без HTTP-запроса к самому себе"""
+        response = get_habits_view(self.make_request())
+
+        self.assertEqual(response.status_code, 200)
+        names = [habit['name'] for habit in json.loads(response.content)['results']]
+        self.assertEqual(names, ['Своя привычка'])
+        self.session.request.assert_not_called()
+        self.token_service.get_user_token.assert_called_once_with(self.user.id)
+
+    def test_create_habit_uses_caller_identity(self):
+        """Тест создания привычки от имени пользователя по его токену"""
+        response = create_habit_view(self.make_request('post', {
+            'name': 'Новая привычка',
+            'place': 'Парк',
+            'time_to_complete': '08:00',
+            'action': 'Бег',
+            'is_pleasant': 'false',
+            'is_public': 'false',
+            'periodicity': '1',
+            'estimated_duration': '2',
+        }))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Habit.objects.filter(user=self.user, name='Новая привычка').exists())
+        self.session.request.assert_not_called()
+
+    def test_missing_token_is_unauthorized(self):
+        """Тест: без сохраненного токена внутренний вызов не аутентифицирован"""
+        self.token_service.get_user_token.return_value = None
+
+        response = get_habits_view(self.make_request())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('detail', json.loads(response.content))
+
+    @override_settings(API_BASE_URL='http://api.example.com/api')
+    def test_remote_host_uses_http(self):
+        """Тест: для другого хоста запрос выполняется по HTTP"""
+        client = APIClient(session=self.session, token_service=self.token_service)
+
+        client.make_request(self.user.id, 'get', '/habits/')
+
+        self.session.request.assert_called_once()
+        self.assertEqual(self.session.request.call_args.args[1], 'http://api.example.com/api/habits/')
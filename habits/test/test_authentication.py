@@ -0,0 +1,164 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, UntypedToken
+
+from token_management.authentication import (
+    CachedJWTAuthentication,
+    get_revoked_cache_key,
+    get_user_cache_key,
+    revoke_user_tokens,
+    token_cache,
+)
+from token_management.services import TokenService
+from token_management.tokens import ISSUED_AT_CLAIM
+from token_management.tokens import AccessToken as PreciseAccessToken
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.token = str(AccessToken.for_user(self.user))
+        self.authentication = CachedJWTAuthentication()
+
+    def count_validations(self):
+        """Подсчет проверок токена родительским JWTAuthentication"""
+        return mock.patch.object(JWTAuthentication, 'get_validated_token',
+                                 side_effect=JWTAuthentication.get_validated_token, autospec=True)
+
+    def authenticate(self, token=None):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'JWT {token or self.token}')
+        return self.authentication.authenticate(request)
+
+    def test_hot_token_skips_validation_and_db(self):
+        """Тест: повторный запрос с тем же токеном не проверяет подпись и не ходит в БД"""
+        with self.count_validations() as validate:
+            self.authenticate()
+            with self.assertNumQueries(0):
+                user, validated_token = self.authenticate()
+
+        self.assertEqual(user, self.user)
+        # Обращение к родительскому методу было только при первом запросе
+        self.assertEqual(validate.call_count, 1)
+
+    def test_expired_cache_entry_is_revalidated(self):
+        """Тест: запись кэша не используется после истечения exp"""
+        self.authenticate()
+        for key, (token, expires_at) in list(token_cache.entries.items()):
+            token_cache.entries[key] = (token, 0)
+
+        with self.count_validations() as validate:
+            self.authenticate()
+
+        self.assertEqual(validate.call_count, 1)
+
+    def token_issued_at(self, issued_at, token_class=PreciseAccessToken):
+        token = token_class.for_user(self.user)
+        token['iat'] = int(issued_at)
+        if ISSUED_AT_CLAIM in token:
+            token[ISSUED_AT_CLAIM] = int(issued_at * 1_000_000)
+        return str(token)
+
+    def test_revocation_takes_effect_immediately(self):
+        """Тест отзыва закэшированного токена через delete_user_tokens"""
+        self.token = self.token_issued_at(int(time.time()) - 1)
+        self.authenticate()
+
+        TokenService(redis_client=mock.Mock()).delete_user_tokens(self.user.id)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_revocation_compares_precise_issue_time(self):
+        """Тест: отзыв отклоняет токен, выпущенный в ту же секунду до него, но не после"""
+        revoke_user_tokens(self.user.id)
+        revoked_at = cache.get(get_revoked_cache_key(self.user.id))
+
+        user, validated_token = self.authenticate(self.token_issued_at(revoked_at + 0.000002))
+        self.assertEqual(user, self.user)
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token_issued_at(revoked_at - 0.000002))
+
+    def test_token_without_precise_issue_time_revoked_in_same_second(self):
+        """Тест: токен без iat_us, выпущенный в секунду отзыва, отклоняется"""
+        revoke_user_tokens(self.user.id)
+        revoked_at = cache.get(get_revoked_cache_key(self.user.id))
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token_issued_at(revoked_at, token_class=AccessToken))
+
+    def test_cached_user_has_no_password_hash(self):
+        """Тест: в общем кэше нет хэша пароля, а пользователь из кэша его не затирает"""
+        self.authenticate()
+        entry = cache.get(get_user_cache_key(self.user.id))
+        self.assertNotIn('password', entry['fields'])
+        self.assertNotIn(self.user.password, str(entry))
+
+        with self.assertNumQueries(0):
+            user, validated_token = self.authenticate()
+        self.assertEqual(user.username, 'testuser')
+
+        user.first_name = 'Тест'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Тест')
+        self.assertTrue(self.user.check_password('12345'))
+
+    def test_user_changes_invalidate_cache(self):
+        """Тест: изменения пользователя сбрасывают закэшированную запись"""
+        self.authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cache_is_bounded(self):
+        """Тест ограничения размера LRU-кэша"""
+        with mock.patch.object(token_cache, 'maxsize', 2):
+            for _ in range(3):
+                self.authenticate(str(AccessToken.for_user(self.user)))
+
+            self.assertEqual(len(token_cache.entries), 2)
+
+
+class CachedJWTAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+
+    def test_issued_tokens_have_precise_issue_time(self):
+        """Тест: выданные при входе и обновлении токены содержат iat_us"""
+        response = self.client.post(reverse('jwt-create'), {'username': 'testuser', 'password': '12345'})
+        self.assertEqual(response.status_code, 200)
+        refresh = UntypedToken(response.data['refresh'])
+        self.assertIn(ISSUED_AT_CLAIM, refresh)
+        self.assertIn(ISSUED_AT_CLAIM, UntypedToken(response.data['access']))
+
+        response = self.client.post(reverse('jwt-refresh'), {'refresh': response.data['refresh']})
+        self.assertEqual(UntypedToken(response.data['access'])[ISSUED_AT_CLAIM], refresh[ISSUED_AT_CLAIM])
+
+    def test_api_accepts_jwt(self):
+        """Тест доступа к API по JWT через кэширующую аутентификацию"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'JWT {AccessToken.for_user(self.user)}')
+
+        response = self.client.get(reverse('habit-list'))
+
+        self.assertEqual(response.status_code, 200)
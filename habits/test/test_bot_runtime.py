@@ -0,0 +1,163 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+from telegram import Update
+
+from habits.models import Habit, HabitCompletion, TelegramProfile
+from telegram_bot.handlers import AUTH_STATE, router
+from telegram_bot.runtime import BotRuntime, LocalConversationStore, Router, configure_db_connections
+
+User = get_user_model()
+
+
+def make_message_update(update_id, chat_id, text, bot):
+    return Update.de_json({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': 0,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Тест'},
+            'text': text,
+        },
+    }, bot)
+
+
+def make_callback_update(update_id, chat_id, data, bot):
+    return Update.de_json({
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'chat_instance': '1',
+            'data': data,
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Тест'},
+            'message': {
+                'message_id': 1,
+                'date': 0,
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': 'Выберите привычку для отметки:',
+            },
+        },
+    }, bot)
+
+
+class BotRuntimeConcurrencyTests(SimpleTestCase):
+    def test_chats_processed_concurrently_in_order(self):
+        """Тест параллельной обработки разных чатов и очередности внутри чата"""
+        test_router = Router()
+        handled = []
+
+        @test_router.state(None)
+        async def slow_handler(update, context):
+            await asyncio.sleep(0.05)
+            handled.append((context.chat_id, update.message.text))
+
+        bot = mock.Mock()
+        updates = [
+            make_message_update(i, chat_id, str(step), bot)
+            for i, (step, chat_id) in enumerate((step, chat_id) for step in range(2) for chat_id in range(50))
+        ]
+
+        async def run():
+            runtime = BotRuntime(bot, test_router, concurrency=100, io_workers=2)
+            for update in updates:
+                runtime.submit(update)
+            await runtime.shutdown()
+
+        started = time.monotonic()
+        asyncio.run(run())
+
+        # 100 обновлений по 50 мс: последовательно заняло бы 5 секунд
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(len(handled), 100)
+        for chat_id in range(50):
+            self.assertEqual([text for chat, text in handled if chat == chat_id], ['0', '1'])
+
+
+class DatabaseConnectionsTests(SimpleTestCase):
+    def test_bot_process_keeps_connections(self):
+        """Тест постоянных соединений с БД для потоков ORM бота"""
+        with mock.patch.dict(connections.settings['default']):
+            configure_db_connections()
+
+            settings_dict = connections['default'].settings_dict
+            self.assertEqual(settings_dict['CONN_MAX_AGE'], settings.TELEGRAM_BOT_DB_CONN_MAX_AGE)
+            self.assertTrue(settings_dict['CONN_HEALTH_CHECKS'])
+
+
+class BotHandlersTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.bot = mock.Mock()
+        self.store = LocalConversationStore()
+        self.update_id = 0
+
+    def send(self, *updates):
+        async def run():
+            runtime = BotRuntime(self.bot, router, store=self.store, io_workers=2)
+            for update in updates:
+                runtime.submit(update)
+            await runtime.shutdown()
+
+        asyncio.run(run())
+
+    def message(self, text, chat_id=42):
+        self.update_id += 1
+        return make_message_update(self.update_id, chat_id, text, self.bot)
+
+    def replies(self):
+        return [call.kwargs['text'] for call in self.bot.send_message.call_args_list]
+
+    def test_authentication_links_chat(self):
+        """Тест авторизации через диалог /start"""
+        self.send(self.message('/start'))
+        self.assertEqual(asyncio.run(self.store.load(42))['state'], AUTH_STATE)
+
+        self.send(self.message('testuser 12345'))
+
+        conversation = asyncio.run(self.store.load(42))
+        self.assertIsNone(conversation['state'])
+        self.assertEqual(conversation['user_data']['user_id'], self.user.id)
+        self.assertEqual(TelegramProfile.objects.get(user=self.user).chat_id, '42')
+        self.assertIn('Вы успешно авторизованы', self.replies()[-1])
+
+    @mock.patch('telegram_bot.handlers.schedule_reminder')
+    def test_create_habit_conversation(self, mock_schedule):
+        """Тест создания привычки через диалог /create"""
+        asyncio.run(self.store.save(42, {'state': None, 'user_data': {'user_id': self.user.id}}))
+
+        self.send(*[
+            self.message(text)
+            for text in ('/create', 'Зарядка', 'Дом', 'Отжимания', '2', '09:00')
+        ])
+
+        habit = Habit.objects.get(user=self.user)
+        self.assertEqual(habit.name, 'Зарядка')
+        self.assertEqual(habit.estimated_duration, 2)
+        mock_schedule.delay.assert_called_once_with(habit.id, minutes_before=30)
+        self.assertIsNone(asyncio.run(self.store.load(42))['state'])
+
+    def test_button_callback_completes_own_habit(self):
+        """Тест отметки выполнения привычки кнопкой"""
+        habit = Habit.objects.create(
+            user=self.user, name='Зарядка', place='Дом', action='Отжимания',
+            time_to_complete='09:00'
+        )
+        asyncio.run(self.store.save(42, {'state': None, 'user_data': {'user_id': self.user.id}}))
+
+        self.send(make_callback_update(1, 42, f'complete_{habit.id}', self.bot))
+
+        self.assertTrue(HabitCompletion.objects.filter(habit=habit, user=self.user).exists())
+        self.bot.answer_callback_query.assert_called_once()
+        self.assertIn('отмечена как выполненная', self.bot.edit_message_text.call_args.kwargs['text'])
+
+    def test_commands_require_authentication(self):
+        """Тест команд без авторизации"""
+        self.send(self.message('/list'))
+
+        self.assertEqual(self.replies(), ['Пожалуйста, авторизуйтесь с помощью команды /start'])
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.models import DailyUserStatistics, Habit, HabitCompletion, HabitStatistics
+
+User = get_user_model()
+
+DAY = datetime(2025, 4, 1, 9, 0, tzinfo=dt_timezone.utc)
+
+
+class BulkCompletionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.other_user = User.objects.create_user(username='otheruser', password='12345')
+        self.habit = self.create_habit(self.user, 'Зарядка')
+        self.other_habit = self.create_habit(self.user, 'Чтение')
+        self.foreign_habit = self.create_habit(self.other_user, 'Чужая привычка')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('habit-completion-bulk')
+
+    def create_habit(self, user, name):
+        return Habit.objects.create(
+            user=user, name=name, place='Дом', action='Действие', time_to_complete='09:00'
+        )
+
+    def item(self, habit, days=0, **kwargs):
+        return {'habit': habit.id, 'completed_at': (DAY + timedelta(days=days)).isoformat(), **kwargs}
+
+    def test_all_items_created(self):
+        """Тест сохранения пачки выполнений со статистикой и расписанием"""
+        response = self.client.post(self.url, [
+            self.item(self.habit, 0),
+            self.item(self.habit, 1, is_successful=False, notes='Поздно'),
+            self.item(self.other_habit, 1),
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        ids = [result['id'] for result in response.data['results']]
+        self.assertEqual(
+            list(HabitCompletion.objects.filter(id__in=ids).order_by('id').values_list('notes', flat=True)),
+            [None, 'Поздно', None]
+        )
+
+        stats = HabitStatistics.objects.get(habit=self.habit)
+        self.assertEqual((stats.total_completions, stats.successful_completions), (2, 1))
+        self.assertEqual(stats.current_streak, 2)
+        daily = DailyUserStatistics.objects.get(user=self.user, date=(DAY + timedelta(days=1)).date())
+        self.assertEqual((daily.completions, daily.habits_completed), (2, 2))
+
+        self.habit.refresh_from_db()
+        self.assertGreater(self.habit.next_due_at.date(), (DAY + timedelta(days=1)).date())
+
+    def test_query_count_does_not_grow_with_batch(self):
+        """Тест: число запросов не зависит от размера пачки"""
+        def count_queries(items):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, items, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        small = count_queries([self.item(self.habit, 0), self.item(self.other_habit, 0)])
+        large = count_queries(
+            [self.item(habit, 10) for habit in (self.habit, self.other_habit) for _ in range(10)]
+        )
+
+        self.assertEqual(small, large)
+
+    def test_partial_success(self):
+        """Тест результатов по элементам: чужая привычка и ошибка валидации"""
+        response = self.client.post(self.url, [
+            self.item(self.habit),
+            self.item(self.foreign_habit),
+            {'habit': 'abc'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'error', 'error'])
+        self.assertIn('habit', results[1]['errors'])
+        self.assertIn('habit', results[2]['errors'])
+        self.assertEqual(HabitCompletion.objects.count(), 1)
+        self.assertFalse(HabitCompletion.objects.filter(habit=self.foreign_habit).exists())
+
+    def test_nothing_created(self):
+        """Тест ответа 400, если ни одно выполнение не сохранено"""
+        response = self.client.post(self.url, [self.item(self.foreign_habit)], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 0)
+
+    @override_settings(BULK_COMPLETIONS_MAX_ITEMS=2)
+    def test_invalid_payload(self):
+        """Тест ошибок формата запроса: не список, пустой список, превышение размера"""
+        for payload in ({'habit': self.habit.id}, [], [self.item(self.habit)] * 3):
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(HabitCompletion.objects.exists())
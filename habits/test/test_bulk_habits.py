@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.cache import get_public_habits_version
+from habits.models import Habit
+
+User = get_user_model()
+
+
+class BulkHabitTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.other_user = User.objects.create_user(username='otheruser', password='12345')
+        self.pleasant = self.create_habit(self.user, 'Кофе', is_pleasant=True)
+        self.habit = self.create_habit(self.user, 'Зарядка')
+        self.foreign_habit = self.create_habit(self.other_user, 'Чужая привычка')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('habit-bulk')
+
+    def create_habit(self, user, name, **kwargs):
+        return Habit.objects.create(
+            user=user, name=name, place='Дом', action='Действие', time_to_complete='09:00', **kwargs
+        )
+
+    def new_habit(self, name, **kwargs):
+        return {'name': name, 'place': 'Парк', 'action': 'Бег', 'time_to_complete': '07:30', **kwargs}
+
+    def test_create_and_update_in_one_request(self):
+        """Тест создания и изменения привычек одним запросом"""
+        response = self.client.post(self.url, {
+            'create': [
+                self.new_habit('Пробежка', related_habit=self.pleasant.id),
+                self.new_habit('Прогулка', is_public=True),
+            ],
+            'update': [{'id': self.habit.id, 'time_to_complete': '10:00', 'reward': 'Десерт'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([habit['name'] for habit in response.data['created']], ['Пробежка', 'Прогулка'])
+        created = Habit.objects.get(pk=response.data['created'][0]['id'])
+        self.assertEqual(created.user, self.user)
+        self.assertEqual(created.related_habit, self.pleasant)
+        self.assertIsNotNone(created.next_due_at)
+
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.reward, 'Десерт')
+        self.assertEqual(self.habit.next_due_at.hour, 10)
+
+    def test_delete(self):
+        """Тест пакетного удаления своих привычек"""
+        response = self.client.post(self.url, {'delete': [self.habit.id]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], [self.habit.id])
+        self.assertFalse(Habit.objects.filter(pk=self.habit.id).exists())
+
+    def test_related_habits_prefetched_in_one_query(self):
+        """Тест: связанные привычки всей пачки загружаются одним запросом"""
+        related = [self.create_habit(self.user, f'Приятная {i}', is_pleasant=True) for i in range(5)]
+        payload = {'create': [
+            self.new_habit(f'Привычка {i}', related_habit=habit.id) for i, habit in enumerate(related)
+        ]}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
+    def test_rules_checked_against_final_state(self):
+        """Тест: ссылка на привычку, которая становится приятной в той же пачке"""
+        response = self.client.post(self.url, {
+            'create': [self.new_habit('Пробежка', related_habit=self.habit.id)],
+            'update': [{'id': self.habit.id, 'is_pleasant': True}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_errors_reported_per_item_and_nothing_saved(self):
+        """Тест ошибок по элементам: ничего не сохраняется"""
+        response = self.client.post(self.url, {
+            'create': [
+                self.new_habit('Пробежка'),
+                self.new_habit('Пробежка', related_habit=self.habit.id),
+                self.new_habit('Пробежка', is_pleasant=True, reward='Торт'),
+                {'name': 'Без времени'},
+            ],
+            'update': [{'id': self.foreign_habit.id, 'name': 'Моя'}],
+            'delete': [self.foreign_habit.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        create_errors = response.data['create']
+        self.assertEqual(create_errors[0], {})
+        self.assertIn('non_field_errors', create_errors[1])
+        self.assertIn('non_field_errors', create_errors[2])
+        self.assertIn('time_to_complete', create_errors[3])
+        self.assertIn('id', response.data['update'][0])
+        self.assertIn('id', response.data['delete'][0])
+        self.assertEqual(Habit.objects.count(), 3)
+        self.assertEqual(Habit.objects.get(pk=self.foreign_habit.id).name, 'Чужая привычка')
+
+    def test_related_habit_deleted_in_same_request(self):
+        """Тест: нельзя ссылаться на привычку, удаляемую в этом же запросе"""
+        response = self.client.post(self.url, {
+            'create': [self.new_habit('Пробежка', related_habit=self.pleasant.id)],
+            'delete': [self.pleasant.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_public_changes_invalidate_catalogue_cache(self):
+        """Тест сброса кэша каталога при пакетном создании публичной привычки"""
+        version = get_public_habits_version()
+
+        self.client.post(self.url, {'create': [self.new_habit('Прогулка', is_public=True)]},
+                         format='json')
+
+        self.assertNotEqual(get_public_habits_version(), version)
+
+    @override_settings(BULK_HABITS_MAX_ITEMS=2)
+    def test_invalid_payload(self):
+        """Тест ошибок формата запроса"""
+        for payload in ([], {}, {'create': {}}, {'delete': [1, 2, 3]}):
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
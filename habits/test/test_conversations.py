@@ -0,0 +1,190 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TransactionTestCase
+
+from habits.test.test_bot_runtime import make_message_update
+from telegram_bot.conversations import ConversationStore, save_states
+from telegram_bot.handlers import AUTH_STATE, HABIT_NAME, router
+from telegram_bot.models import TelegramState
+from telegram_bot.runtime import BotRuntime
+
+User = get_user_model()
+
+
+class ConversationStoreTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+
+    def test_writes_are_deferred_and_batched(self):
+        """Тест отложенной пакетной записи состояния в TelegramState"""
+        store = ConversationStore(flush_interval=60)
+
+        async def run():
+            for chat_id in (1, 2, 3):
+                await store.save(chat_id, {'state': HABIT_NAME, 'user_data': {'user_id': self.user.id}})
+            count_before_flush = await asyncio.to_thread(TelegramState.objects.count)
+            flushed = await store.flush()
+            await store.close()
+            return count_before_flush, flushed
+
+        count_before_flush, flushed = asyncio.run(run())
+
+        self.assertEqual(count_before_flush, 0)
+        self.assertEqual(flushed, 3)
+        state = TelegramState.objects.get(telegram_id='2')
+        self.assertEqual(state.user, self.user)
+        self.assertEqual(state.state, str(HABIT_NAME))
+        self.assertEqual(state.context, {'user_id': self.user.id})
+
+    def test_flush_when_batch_is_full(self):
+        """Тест записи при накоплении flush_batch_size измененных диалогов"""
+        store = ConversationStore(flush_interval=60, flush_batch_size=2)
+
+        async def run():
+            await store.save(1, {'state': None, 'user_data': {}})
+            await store.save(2, {'state': None, 'user_data': {}})
+            await store.close()
+
+        asyncio.run(run())
+
+        self.assertEqual(TelegramState.objects.count(), 2)
+        self.assertIsNone(TelegramState.objects.get(telegram_id='1').user)
+
+    def test_state_shared_between_replicas(self):
+        """Тест: другой процесс бота продолжает диалог после TTL"""
+        first = ConversationStore(ttl=0)
+        second = ConversationStore(ttl=0)
+
+        async def run():
+            await second.load(7)
+            await first.save(7, {'state': AUTH_STATE, 'user_data': {'username': 'testuser'}})
+            await first.close()
+            return await second.load(7)
+
+        conversation = asyncio.run(run())
+
+        self.assertEqual(conversation, {'state': AUTH_STATE, 'user_data': {'username': 'testuser'}})
+
+    def test_cache_is_bounded(self):
+        """Тест: кэш диалогов вытесняет давно не использованные сохраненные диалоги"""
+        store = ConversationStore(flush_interval=60, max_size=2)
+
+        async def run():
+            await store.save(1, {'state': HABIT_NAME, 'user_data': {}})
+            await store.save(2, {'state': None, 'user_data': {}})
+            await store.save(3, {'state': None, 'user_data': {}})
+            # Несохраненные диалоги остаются в кэше сверх лимита
+            unsaved = list(store.cache)
+            await store.flush()
+            await store.load(1)
+            await store.load(4)
+            cached = list(store.cache)
+            conversation = await store.load(2)
+            await store.close()
+            return unsaved, cached, conversation
+
+        unsaved, cached, conversation = asyncio.run(run())
+
+        self.assertEqual(unsaved, ['1', '2', '3'])
+        self.assertEqual(cached, ['1', '4'])
+        # Вытесненный диалог читается из базы
+        self.assertEqual(conversation, {'state': None, 'user_data': {}})
+        self.assertEqual(TelegramState.objects.count(), 3)
+
+    def test_failed_flush_keeps_conversations(self):
+        """Тест: диалоги, запись которых не удалась, не вытесняются и сохраняются позже"""
+        store = ConversationStore(flush_interval=60, max_size=2)
+        real_save_states = save_states
+        calls = []
+
+        async def failing_save_states(states):
+            calls.append([state.telegram_id for state in states])
+            if len(calls) == 1:
+                # Пока идет запись, приходят сообщения других чатов
+                for chat_id in ('b', 'c', 'd'):
+                    await store.load(chat_id)
+            if len(calls) <= 2:
+                raise DatabaseError('База недоступна')
+            return await real_save_states(states)
+
+        async def run():
+            await store.save('a', {'state': HABIT_NAME, 'user_data': {}})
+            with mock.patch('telegram_bot.conversations.save_states', failing_save_states):
+                first = await store.flush()
+                second = await store.flush()
+            await store.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        self.assertEqual((first, second), (0, 1))
+        self.assertEqual(TelegramState.objects.get(telegram_id='a').state, str(HABIT_NAME))
+
+    def test_bad_row_does_not_block_batch(self):
+        """Тест: строка, которую нельзя записать, не мешает записи остальных"""
+        store = ConversationStore(flush_interval=60)
+        real_save_states = save_states
+
+        async def save_states_rejecting_bad(states):
+            if any(state.telegram_id == '2' for state in states):
+                raise DatabaseError('Нарушение внешнего ключа')
+            return await real_save_states(states)
+
+        async def run():
+            for chat_id in (1, 2, 3):
+                await store.save(chat_id, {'state': None, 'user_data': {}})
+            with mock.patch('telegram_bot.conversations.save_states', save_states_rejecting_bad):
+                saved = await store.flush()
+                saved_again = await store.flush()
+            await store.close()
+            return saved, saved_again
+
+        self.assertEqual(asyncio.run(run()), (2, 0))
+        self.assertEqual(
+            sorted(TelegramState.objects.values_list('telegram_id', flat=True)), ['1', '3']
+        )
+
+    def test_background_flush_survives_errors(self):
+        """Тест: ошибка записи не останавливает фоновую запись"""
+        store = ConversationStore(flush_interval=0.01)
+        calls = []
+
+        async def flaky_flush():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('Сбой записи')
+
+        async def run():
+            with mock.patch.object(store, 'flush', flaky_flush):
+                await store.save(1, {'state': None, 'user_data': {}})
+                await asyncio.sleep(0.1)
+                done = store.flush_task.done()
+                store.flush_task.cancel()
+            return done
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertGreater(len(calls), 1)
+
+    def test_conversation_survives_restart(self):
+        """Тест продолжения диалога /start после перезапуска бота"""
+        bot = mock.Mock()
+
+        def run_bot(*texts):
+            async def run():
+                runtime = BotRuntime(bot, router, store=ConversationStore(), io_workers=1)
+                for i, text in enumerate(texts):
+                    runtime.submit(make_message_update(i, 42, text, bot))
+                await runtime.shutdown()
+
+            asyncio.run(run())
+
+        run_bot('/start')
+        run_bot('testuser 12345')
+
+        state = TelegramState.objects.get(telegram_id='42')
+        self.assertEqual(state.user, self.user)
+        self.assertEqual(state.state, 'start')
+        self.assertIn('Вы успешно авторизованы', bot.send_message.call_args.kwargs['text'])
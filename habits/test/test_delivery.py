@@ -0,0 +1,225 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from telegram import Bot
+from telegram.error import RetryAfter
+
+from habits.models import Habit, TelegramProfile
+from habits.tasks import send_habit_reminders_batch
+from telegram_bot import delivery
+from telegram_bot.delivery import DeliveryEngine, Outbox, TokenBucket
+
+User = get_user_model()
+
+
+class FakeBotAPIHandler(BaseHTTPRequestHandler):
+    """Минимальная имитация Bot API: sendMessage с одним ответом 429 на чат"""
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        chat_id = int(payload['chat_id'])
+
+        with server.lock:
+            if chat_id in server.throttle_chats:
+                server.throttle_chats.remove(chat_id)
+                status, body = 429, {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': 'Too Many Requests: retry after 0.1',
+                    'parameters': {'retry_after': 0.1},
+                }
+            else:
+                server.delivered.append((chat_id, payload['text']))
+                status, body = 200, {
+                    'ok': True,
+                    'result': {
+                        'message_id': len(server.delivered),
+                        'date': 0,
+                        'chat': {'id': chat_id, 'type': 'private'},
+                        'text': payload['text'],
+                    },
+                }
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DeliveryEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBotAPIHandler)
+        self.server.lock = threading.Lock()
+        self.server.delivered = []
+        self.server.throttle_chats = {2}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        host, port = self.server.server_address
+        self.bot = Bot(token='123:TEST', base_url=f'http://{host}:{port}/bot')
+        self.engine = DeliveryEngine(bot=self.bot, workers=4, global_rate=100, chat_rate=100)
+
+    def tearDown(self):
+        self.engine.shutdown()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_deliver_batch_with_retry_after(self):
+        """Тест доставки пачки сообщений с повтором после ответа 429"""
+        messages = [{'chat_id': chat_id, 'text': f'Сообщение {chat_id}'} for chat_id in range(1, 6)]
+
+        sent = self.engine.deliver(messages)
+
+        self.assertEqual(sent, 5)
+        self.assertFalse(self.server.throttle_chats)
+        self.assertCountEqual(
+            self.server.delivered,
+            [(message['chat_id'], message['text']) for message in messages]
+        )
+
+
+class DeliveryRetryTests(SimpleTestCase):
+    def setUp(self):
+        self.bot = mock.Mock()
+        self.message = {'chat_id': 1, 'text': 'Сообщение'}
+
+    def test_retry_after_not_counted_as_attempt(self):
+        """Тест повторов после 429 сверх max_retries"""
+        self.bot.send_message.side_effect = [RetryAfter(0.01)] * 3 + [mock.Mock()]
+        engine = DeliveryEngine(bot=self.bot, workers=1, global_rate=100, chat_rate=100,
+                                max_retries=0)
+        self.addCleanup(engine.shutdown)
+
+        self.assertTrue(engine.send(self.message))
+        self.assertEqual(self.bot.send_message.call_count, 4)
+
+    def test_throttle_wait_limited(self):
+        """Тест отказа от сообщения после превышения суммарного ожидания по 429"""
+        self.bot.send_message.side_effect = RetryAfter(0.01)
+        engine = DeliveryEngine(bot=self.bot, workers=1, global_rate=100, chat_rate=100,
+                                max_throttle_wait=0.025)
+        self.addCleanup(engine.shutdown)
+
+        self.assertFalse(engine.send(self.message))
+        self.assertEqual(self.bot.send_message.call_count, 3)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_rate_limit(self):
+        """Тест выдачи токенов с заданной скоростью"""
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+
+        now[0] = 0.5
+        self.assertEqual(bucket.try_acquire(), 0)
+
+    def test_pause(self):
+        """Тест паузы после ответа 429"""
+        now = [0.0]
+        bucket = TokenBucket(rate=10, clock=lambda: now[0])
+
+        bucket.pause(3)
+        self.assertAlmostEqual(bucket.try_acquire(), 3)
+
+        now[0] = 3.2
+        self.assertEqual(bucket.try_acquire(), 0)
+
+
+class OutboxTests(SimpleTestCase):
+    def test_redis_pool_shared_between_instances(self):
+        """Тест общего пула соединений для всех экземпляров очереди"""
+        with mock.patch.object(delivery, '_pool', None):
+            first, second = Outbox(), Outbox()
+
+            self.assertIs(first.redis.connection_pool, second.redis.connection_pool)
+            self.assertEqual(first.redis.connection_pool.connection_kwargs['db'], 2)
+
+    def test_pop_many_moves_to_processing_list(self):
+        """Тест переноса забранных сообщений в список обработки до подтверждения"""
+        client = mock.MagicMock()
+        client.blmove.return_value = b'{"chat_id": 1}'
+        client.pipeline.return_value.execute.return_value = [b'{"chat_id": 2}', None]
+        outbox = Outbox(redis_client=client, consumer='worker-1')
+
+        messages = outbox.pop_many(3)
+
+        self.assertEqual(messages, [{'chat_id': 1}, {'chat_id': 2}])
+        client.blmove.assert_called_once_with(
+            'telegram:outbox', 'telegram:outbox:processing:worker-1', 1, 'LEFT', 'RIGHT')
+        client.lpop.assert_not_called()
+        client.delete.assert_not_called()
+
+        outbox.ack()
+        client.delete.assert_called_once_with('telegram:outbox:processing:worker-1')
+
+    def test_recover_returns_unacked_messages(self):
+        """Тест возврата неподтвержденных сообщений в начало очереди"""
+        client = mock.MagicMock()
+        client.lmove.side_effect = [b'{"chat_id": 2}', b'{"chat_id": 1}', None]
+        outbox = Outbox(redis_client=client, consumer='worker-1')
+
+        self.assertEqual(outbox.recover(), 2)
+        client.lmove.assert_called_with(
+            'telegram:outbox:processing:worker-1', 'telegram:outbox', 'RIGHT', 'LEFT')
+
+    def test_run_acks_after_delivery(self):
+        """Тест подтверждения пачки только после ее отправки"""
+        stop_event = threading.Event()
+        outbox = mock.Mock()
+        outbox.recover.return_value = 0
+        outbox.pop_many.return_value = [{'chat_id': 1, 'text': 'Сообщение'}]
+        engine = DeliveryEngine(bot=mock.Mock(), workers=1)
+        self.addCleanup(engine.shutdown)
+        calls = []
+        outbox.ack.side_effect = lambda: (calls.append('ack'), stop_event.set())
+
+        with mock.patch.object(engine, 'deliver', side_effect=lambda messages: calls.append('deliver')):
+            engine.run(outbox, stop_event=stop_event)
+
+        outbox.recover.assert_called_once_with()
+        self.assertEqual(calls, ['deliver', 'ack'])
+
+
+class ReminderBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+        cls.other_user = User.objects.create_user(username='otheruser', password='12345')
+        TelegramProfile.objects.create(user=cls.user, chat_id='123456789')
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Тестовая привычка', place='Дом', action='Действие',
+            time_to_complete='10:00'
+        )
+        cls.orphan_habit = Habit.objects.create(
+            user=cls.other_user, name='Без Telegram', place='Дом', action='Действие',
+            time_to_complete='10:00'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('habits.tasks.Outbox')
+    def test_batch_pushes_to_outbox(self, mock_outbox):
+        """Тест постановки напоминаний пачки в очередь доставки"""
+        queued = send_habit_reminders_batch([self.habit.id, self.orphan_habit.id])
+
+        self.assertEqual(queued, 1)
+        messages = mock_outbox.return_value.push_many.call_args.args[0]
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]['chat_id'], '123456789')
+        self.assertIn(self.habit.name, messages[0]['text'])
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.models import Habit, HabitCompletion
+
+User = get_user_model()
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='password')
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Зарядка', place='Дом', action='Упражнения',
+            time_to_complete='09:00'
+        )
+        other_habit = Habit.objects.create(
+            user=other_user, name='Чужая', place='Дом', action='Действие',
+            time_to_complete='09:00'
+        )
+        cls.now = timezone.now().replace(microsecond=0)
+        cls.completions = [
+            HabitCompletion.objects.create(
+                habit=cls.habit, user=cls.user, completed_at=cls.now - timedelta(days=i),
+                notes=f'Заметка {i}'
+            )
+            for i in range(5)
+        ]
+        HabitCompletion.objects.create(habit=other_habit, user=other_user, completed_at=cls.now)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_completions(self):
+        """Тест выгрузки выполнений в NDJSON: только свои, по возрастанию времени"""
+        response = self.client.get(reverse('export-completions'))
+
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        self.assertEqual([record['id'] for record in records],
+                         [completion.id for completion in reversed(self.completions)])
+        self.assertEqual(records[-1], {
+            'id': self.completions[0].id,
+            'habit': self.habit.id,
+            'habit_name': 'Зарядка',
+            'completed_at': self.now.isoformat().replace('+00:00', 'Z'),
+            'is_successful': True,
+            'notes': 'Заметка 0',
+        })
+
+    def test_csv_habits(self):
+        """Тест выгрузки привычек в CSV"""
+        response = self.client.get(reverse('export-habits'), {'output': 'csv'})
+
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="habits.csv"')
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'Зарядка')
+        self.assertEqual(rows[0]['time_to_complete'], '09:00:00')
+
+    def test_since_filters_incrementally(self):
+        """Тест инкрементальной выгрузки с параметром since"""
+        since = (self.now - timedelta(days=1)).isoformat()
+
+        response = self.client.get(reverse('export-completions'), {'since': since})
+
+        ids = [json.loads(line)['id'] for line in self.read(response).splitlines()]
+        self.assertEqual(ids, [self.completions[1].id, self.completions[0].id])
+
+    def test_invalid_parameters(self):
+        """Тест ошибок в параметрах выгрузки"""
+        url = reverse('export-completions')
+
+        self.assertEqual(self.client.get(url, {'output': 'xml'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'since': 'вчера'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from habits.models import Habit, HabitCompletion
+from habits.serializers import HabitCompletionSerializer, HabitSerializer
+
+User = get_user_model()
+
+
+class ValuesSerializerCompatibilityTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+        cls.pleasant = Habit.objects.create(
+            user=cls.user, name='Кофе', place='Кафе', action='Пить кофе',
+            time_to_complete='09:15:30', is_pleasant=True, is_public=True
+        )
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Зарядка', description='Каждое утро', place='Дом',
+            action='Упражнения', time_to_complete='07:00', related_habit=cls.pleasant
+        )
+        HabitCompletion.objects.create(
+            habit=cls.habit, user=cls.user, notes='Легко',
+            completed_at=datetime(2025, 4, 1, 7, 5, 12, 345678, tzinfo=dt_timezone.utc)
+        )
+        HabitCompletion.objects.create(
+            habit=cls.pleasant, user=cls.user, is_successful=False,
+            completed_at=datetime(2025, 4, 2, 9, 0, tzinfo=dt_timezone.utc)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_habit_list_is_byte_compatible(self):
+        """Тест: список привычек совпадает с ответом HabitSerializer байт в байт"""
+        habits = Habit.objects.order_by('-created_at')
+        expected = self.render({
+            'count': 2, 'next': None, 'previous': None,
+            'results': HabitSerializer(habits, many=True).data,
+        })
+
+        for url in (reverse('habit-list'), reverse('my-habits')):
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+            self.assertEqual(response.content, expected)
+
+        public = self.client.get(reverse('public-habit-list'), HTTP_ACCEPT='application/json')
+        self.assertEqual(public.content, self.render({
+            'count': 1, 'next': None, 'previous': None,
+            'results': HabitSerializer([self.pleasant], many=True).data,
+        }))
+
+    def test_completion_list_is_byte_compatible(self):
+        """Тест: список выполнений совпадает с ответом HabitCompletionSerializer байт в байт"""
+        completions = HabitCompletion.objects.order_by('-completed_at', '-id')
+        results = HabitCompletionSerializer(completions, many=True).data
+        url = reverse('habit-completion-list')
+
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, self.render({
+            'count': 2, 'next': None, 'previous': None, 'results': results,
+        }))
+
+        response = self.client.get(url, {'cursor': ''}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.content, self.render({'next': None, 'results': results}))
+
+    def test_benchmark_command(self):
+        """Тест команды сравнения скорости сериализаторов"""
+        out = StringIO()
+
+        call_command('benchmark_serializers', habits=5, completions=10, repeat=1, stdout=out)
+
+        self.assertIn('Окружение: Python', out.getvalue())
+        self.assertIn('Данные: 5 привычек, 10 выполнений', out.getvalue())
+        self.assertIn('Привычки: ModelSerializer', out.getvalue())
+        self.assertIn('Выполнения: ModelSerializer', out.getvalue())
+        self.assertEqual(Habit.objects.count(), 2)
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from habits.models import HabitCompletion
+from habits.tasks import get_due_habits
+from habits.views import HabitViewSet, PublicHabitListView
+
+User = get_user_model()
+
+
+class QueryPlanTests(TestCase):
+    """Проверка, что горячие запросы используют индексы (через EXPLAIN)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # На маленьких тестовых таблицах планировщик иначе выберет Seq Scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def view_queryset(self, view_class):
+        request = APIRequestFactory().get('/')
+        request.user = self.user
+        return view_class(request=request, format_kwarg=None).get_queryset()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_habit_viewset_uses_indexes(self):
+        """Тест списка привычек: свои и публичные привычки по индексам"""
+        queryset = self.view_queryset(HabitViewSet)
+
+        self.assertUsesIndex(queryset, 'habit_user_created_idx')
+        self.assertUsesIndex(queryset, 'habit_public_created_idx')
+
+    def test_public_habit_list_uses_partial_index(self):
+        """Тест каталога публичных привычек"""
+        queryset = self.view_queryset(PublicHabitListView)
+
+        self.assertUsesIndex(queryset, 'habit_public_created_idx')
+
+    def test_reminder_sweep_uses_index(self):
+        """Тест отбора привычек для рассылки напоминаний"""
+        self.assertUsesIndex(get_due_habits(timezone.now()), 'habit_next_reminder_idx')
+
+    def test_completion_history_uses_composite_index(self):
+        """Тест истории выполнений привычки"""
+        queryset = HabitCompletion.objects.filter(habit_id=1)
+
+        self.assertUsesIndex(queryset, 'completion_habit_date_idx')
+
+    def test_user_completions_by_period_use_composite_index(self):
+        """Тест выборки выполнений пользователя за период"""
+        queryset = HabitCompletion.objects.filter(
+            user=self.user,
+            completed_at__gte=timezone.now()
+        )
+
+        self.assertUsesIndex(queryset, 'completion_user_date_idx')
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.models import Habit, HabitCompletion
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='password')
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Привычка', place='Дом', action='Действие',
+            time_to_complete='09:00'
+        )
+        now = timezone.now()
+        # Пары выполнений с одинаковым временем проверяют разрешение по id
+        for i in range(8):
+            HabitCompletion.objects.create(
+                habit=cls.habit, user=cls.user, completed_at=now - timedelta(hours=i // 2)
+            )
+        cls.expected_ids = list(
+            HabitCompletion.objects.order_by('-completed_at', '-id').values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_walks_all_completions_without_gaps(self):
+        """Тест обхода всей истории выполнений по курсору"""
+        url = reverse('habit-completion-list')
+        params = {'cursor': '', 'page_size': 3}
+        ids = []
+        while url:
+            # Одна выборка на страницу: без COUNT и OFFSET
+            with self.assertNumQueries(1):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids += [completion['id'] for completion in response.data['results']]
+            url, params = response.data['next'], {}
+
+        self.assertEqual(ids, self.expected_ids)
+
+    def test_count_is_optional(self):
+        """Тест подсчета общего числа записей по запросу"""
+        response = self.client.get(reverse('habit-completion-list'), {'cursor': '', 'count': 'true'})
+
+        self.assertEqual(response.data['count'], 8)
+        self.assertIsNone(response.data['next'])
+
+    def test_completions_cursor_mode_is_opt_in(self):
+        """Тест: без параметра cursor выполнения отдаются постранично с count и previous"""
+        for url in (reverse('habit-completion-list'), reverse('habit-completion-list', args=[self.habit.id])):
+            response = self.client.get(url, {'page': 1})
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], 8)
+            self.assertIn('previous', response.data)
+
+    def test_invalid_cursor(self):
+        """Тест ответа 404 на поврежденный курсор"""
+        response = self.client.get(reverse('habit-completion-list'), {'cursor': 'broken'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_habits_cursor_mode_is_opt_in(self):
+        """Тест: список привычек переходит на курсор только с параметром cursor"""
+        for i in range(6):
+            Habit.objects.create(
+                user=self.user, name=f'Привычка {i}', place='Дом', action='Действие',
+                time_to_complete='09:00'
+            )
+        url = reverse('habit-list')
+
+        self.assertIn('previous', self.client.get(url).data)
+
+        first = self.client.get(url, {'cursor': '', 'page_size': 4}).data
+        second = self.client.get(first['next']).data
+        names = [habit['name'] for habit in first['results'] + second['results']]
+
+        self.assertNotIn('previous', first)
+        self.assertEqual(len(names), 7)
+        self.assertEqual(names, list(
+            Habit.objects.order_by('-created_at', '-id').values_list('name', flat=True)
+        ))
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.cache import get_public_habit_summaries, get_public_habits_version
+from habits.models import Habit
+
+User = get_user_model()
+
+
+class PublicHabitCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('public-habit-list')
+        self.habit = self.create_habit('Публичная привычка', is_public=True)
+
+    def create_habit(self, name, is_public):
+        return Habit.objects.create(
+            user=self.user, name=name, place='Дом', action='Действие',
+            time_to_complete='09:00', is_public=is_public
+        )
+
+    def test_repeated_request_served_from_cache(self):
+        """Тест: повторный запрос с теми же параметрами не обращается к БД"""
+        first = self.client.get(self.url, {'ordering': 'name', 'page_size': 10})
+
+        with self.assertNumQueries(0):
+            # Порядок параметров не влияет на ключ кэша
+            second = self.client.get(f'{self.url}?page_size=10&ordering=name')
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_not_modified(self):
+        """Тест ответа 304 при совпадении ETag"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    @override_settings(PUBLIC_HABITS_CACHE_TIMEOUT=0)
+    def test_etag_follows_content(self):
+        """Тест: ETag меняется при изменении без сигналов и совпадает для прежнего содержимого"""
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Habit.objects.filter(pk=self.habit.pk).update(name='Новое название')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'][0]['name'], 'Новое название')
+
+    def test_public_habit_changes_invalidate_cache(self):
+        """Тест сброса кэша при создании, изменении и удалении публичной привычки"""
+        etag = self.client.get(self.url)['ETag']
+
+        self.create_habit('Новая публичная привычка', is_public=True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+
+        # Привычка перестала быть публичной
+        self.habit.is_public = False
+        self.habit.save()
+        self.assertEqual(self.client.get(self.url).data['count'], 1)
+
+        Habit.objects.filter(is_public=True).get().delete()
+        self.assertEqual(self.client.get(self.url).data['count'], 0)
+
+    def test_private_habit_changes_keep_cache(self):
+        """Тест: изменения личных привычек не сбрасывают кэш каталога"""
+        version = get_public_habits_version()
+
+        habit = self.create_habit('Личная привычка', is_public=False)
+        habit.name = 'Другое название'
+        habit.save()
+        habit.delete()
+
+        self.assertEqual(get_public_habits_version(), version)
+
+    def test_bot_summaries_cached(self):
+        """Тест кэширования списка публичных привычек для бота"""
+        self.assertEqual(get_public_habit_summaries(), [{
+            'name': 'Публичная привычка', 'action': 'Действие', 'place': 'Дом',
+            'username': 'testuser',
+        }])
+
+        with self.assertNumQueries(0):
+            get_public_habit_summaries()
+
+        self.habit.delete()
+        self.assertEqual(get_public_habit_summaries(), [])
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from habits.models import Habit, HabitStatistics
+from habits.tasks import format_habit_reminder, render_reminders
+
+User = get_user_model()
+
+
+class RenderRemindersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+        cls.other_user = User.objects.create_user(username='otheruser', password='12345')
+        cls.pleasant = Habit.objects.create(
+            user=cls.user, name='Кофе', place='Кафе', action='Пить кофе',
+            time_to_complete='09:15', is_pleasant=True
+        )
+        cls.habit = Habit.objects.create(
+            user=cls.user, name='Зарядка', place='Дом', action='Упражнения',
+            time_to_complete='07:00', estimated_duration=60, related_habit=cls.pleasant
+        )
+        cls.rewarded = Habit.objects.create(
+            user=cls.other_user, name='Прогулка', place='Парк', action='Гулять',
+            time_to_complete='18:30', reward='Десерт'
+        )
+        HabitStatistics.objects.create(habit=cls.habit, total_completions=3)
+
+    def test_reminder_text(self):
+        """Тест: текст напоминания со связанной привычкой и прогрессом"""
+        [(user_id, text)] = render_reminders([self.habit.id])
+
+        self.assertEqual(user_id, self.user.id)
+        self.assertEqual(
+            text,
+            "⏰ *НАПОМИНАНИЕ*\n\n"
+            "Пора выполнить привычку: *Зарядка*\n"
+            "Время: 07:00\n"
+            "Место: Дом\n"
+            "Действие: Упражнения\n"
+            "Продолжительность: 60 минут\n\n"
+            "После выполнения вы можете: _Кофе_\n"
+            "\nВы выполнили эту привычку 3 раз!\n"
+            "\nНе забудьте отметить выполнение в боте командой /complete"
+        )
+
+    def test_batch_matches_single_reminder(self):
+        """Тест: пакетный рендеринг совпадает с format_habit_reminder"""
+        habits = [self.pleasant, self.habit, self.rewarded]
+        reminders = render_reminders([habit.id for habit in habits])
+
+        expected = [
+            (habit.user_id, format_habit_reminder(Habit.objects.get(pk=habit.pk)))
+            for habit in habits
+        ]
+        self.assertEqual(reminders, expected)
+        self.assertIn('Ваша награда: _Десерт_', reminders[2][1])
+
+    def test_batch_uses_constant_queries(self):
+        """Тест: число запросов не зависит от размера пачки"""
+        habits = Habit.objects.bulk_create([
+            Habit(
+                user=self.user, name=f'Привычка {i}', place='Дом', action='Действие',
+                time_to_complete='10:00', related_habit=self.pleasant
+            )
+            for i in range(200)
+        ])
+        HabitStatistics.objects.bulk_create([
+            HabitStatistics(habit=habit, total_completions=i) for i, habit in enumerate(habits)
+        ])
+
+        with self.assertNumQueries(1):
+            reminders = render_reminders([habit.id for habit in habits])
+        self.assertEqual(len(reminders), 200)
+
+    def test_unknown_ids_are_skipped(self):
+        """Тест: несуществующие привычки пропускаются"""
+        self.assertEqual(render_reminders([]), [])
+        self.assertEqual(len(render_reminders([self.habit.id, 999999])), 1)
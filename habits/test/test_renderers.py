@@ -0,0 +1,132 @@
+import io
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from habits.models import Habit
+from habits.renderers import FastJSONParser, FastJSONRenderer
+
+User = get_user_model()
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'decimal': Decimal('12.50'),
+        'datetime': datetime(2025, 4, 1, 7, 5, 12, 345678, tzinfo=dt_timezone.utc),
+        'naive': datetime(2025, 4, 1, 7, 5),
+        'date': date(2025, 4, 1),
+        'time': time(9, 15, 30, 123),
+        'lazy': gettext_lazy('Привычка'),
+        'separators': 'строка\u2028абзац\u2029',
+        'ids': {1: 'один', 2: None},
+        'nested': ReturnDict({'items': [1, 2.5, True, None]}, serializer=None),
+        'tuple': (1, 2),
+    }
+
+    def test_output_matches_json_renderer(self):
+        """Тест: ответ совпадает с JSONRenderer байт в байт, включая нестандартные типы"""
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_none_and_indent_fall_back_to_json_renderer(self):
+        """Тест: None и отступы обрабатываются стандартным рендерером"""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            FastJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type),
+        )
+
+    def test_big_integers_fall_back_to_json_renderer(self):
+        """Тест: числа, которые orjson не поддерживает, рендерятся стандартным json"""
+        data = {'value': 2 ** 70}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"value":1180591620717411303424}')
+
+    def test_works_without_orjson(self):
+        """Тест: без orjson рендерер и парсер работают как стандартные"""
+        with mock.patch('habits.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse_matches_json_parser(self):
+        """Тест: результат разбора совпадает с JSONParser"""
+        body = '{"name": "Зарядка", "items": [1, 2.5, null, true], "nested": {"a": "б"}}'.encode()
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parse_non_utf8_encoding(self):
+        """Тест: тело в другой кодировке перекодируется перед разбором"""
+        body = '{"name": "Зарядка"}'.encode('cp1251')
+        result = FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'cp1251'})
+        self.assertEqual(result, {'name': 'Зарядка'})
+
+    def test_big_integers_parsed_exactly(self):
+        """Тест: целые вне 64 бит не превращаются во float"""
+        for value in (2 ** 64, -2 ** 63 - 1, 10 ** 30):
+            body = ('{"value": %d}' % value).encode()
+            result = FastJSONParser().parse(io.BytesIO(body))
+            self.assertEqual(result, {'value': value})
+            self.assertIsInstance(result['value'], int)
+            result = FastJSONParser().parse(io.BytesIO(body.decode().encode('cp1251')),
+                                            parser_context={'encoding': 'cp1251'})
+            self.assertIsInstance(result['value'], int)
+
+    def test_invalid_json_raises_parse_error(self):
+        """Тест: некорректный JSON дает ParseError"""
+        for body in (b'{"name": ', b'\xff\xfe', b'', b'{"value": 100000000000000000000'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class FastJSONApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.client.force_authenticate(user=self.user)
+
+    def test_api_uses_fast_json(self):
+        """Тест: API принимает и отдает JSON через FastJSONParser/FastJSONRenderer"""
+        data = {
+            'name': 'Зарядка', 'place': 'Дом', 'action': 'Упражнения',
+            'time_to_complete': '07:00', 'periodicity': 1, 'estimated_duration': 60
+        }
+        response = self.client.post(reverse('habit-list'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertTrue(Habit.objects.filter(name='Зарядка').exists())
+
+    def test_other_views_keep_drf_defaults(self):
+        """Тест: представления без FastJSONMixin используют классы DRF по умолчанию"""
+        response = self.client.get(reverse('user-list'))
+        self.assertIs(type(response.accepted_renderer), JSONRenderer)
+
+    def test_malformed_body_returns_400(self):
+        """Тест: некорректное тело запроса дает 400"""
+        response = self.client.post(
+            reverse('habit-list'), data=b'{"name":', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+    def test_benchmark_command(self):
+        """Тест: команда benchmark_json сравнивает рендереры и откатывает данные"""
+        out = StringIO()
+        call_command('benchmark_json', habits=5, completions=10, repeat=1, stdout=out)
+        self.assertIn('Привычки', out.getvalue())
+        self.assertIn('Выполнения', out.getvalue())
+        self.assertEqual(Habit.objects.count(), 0)
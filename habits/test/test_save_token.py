@@ -0,0 +1,110 @@
+import csv
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+import jwt
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from token_management.services import TokenService
+
+
+def make_token(lifetime=3600):
+    return jwt.encode({'exp': int(time.time()) + lifetime}, 'secret', algorithm='HS256')
+
+
+class SaveTokenBulkTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = mock.MagicMock()
+        patcher = mock.patch('token_management.management.commands.save_token.TokenService',
+                             return_value=TokenService(redis_client=self.redis))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.rows = [
+            {'user_id': user_id, 'access': make_token(), 'refresh': make_token(86400)}
+            for user_id in range(1, 6)
+        ]
+
+    def write_file(self, suffix, rows):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w', newline='') as f:
+            if suffix == '.csv':
+                writer = csv.DictWriter(f, fieldnames=['user_id', 'access', 'refresh'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write(json.dumps(row) + '\n')
+        return path
+
+    def stored_keys(self):
+        pipeline = self.redis.pipeline.return_value
+        return sorted(call.args[0] for call in pipeline.setex.call_args_list)
+
+    def expected_keys(self):
+        return sorted(
+            f'{token_type}_token:{row["user_id"]}'
+            for row in self.rows for token_type in ('access', 'refresh')
+        )
+
+    def run_bulk(self, path, *args):
+        out = StringIO()
+        call_command('save_token', '--bulk', path, '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_jsonl_import_with_worker_pool(self):
+        """Тест загрузки JSONL с расчетом времени жизни в пуле процессов"""
+        output = self.run_bulk(self.write_file('.jsonl', self.rows), '--workers', '2')
+
+        self.assertEqual(self.stored_keys(), self.expected_keys())
+        self.assertIn('Сохранено токенов: 10', output)
+        # Пачки по 2 строки (4 токена) отправляются конвейером, а не по одной команде
+        self.redis.setex.assert_not_called()
+        self.assertEqual(self.redis.pipeline.return_value.execute.call_count, 3)
+
+    def test_csv_import_inline(self):
+        """Тест загрузки CSV без пула процессов"""
+        self.run_bulk(self.write_file('.csv', self.rows), '--workers', '0')
+
+        self.assertEqual(self.stored_keys(), self.expected_keys())
+        pipeline = self.redis.pipeline.return_value
+        ttl = dict((call.args[0], call.args[1]) for call in pipeline.setex.call_args_list)
+        self.assertGreater(ttl['refresh_token:1'], 3600)
+        self.assertLessEqual(ttl['access_token:1'], 3600)
+
+    def test_invalid_rows_are_skipped(self):
+        """Тест пропуска строк с ошибками"""
+        rows = self.rows[:1] + [{'user_id': 'x', 'access': make_token()}, {'access': 'broken'}]
+
+        output = self.run_bulk(self.write_file('.jsonl', rows), '--workers', '0')
+
+        self.assertEqual(self.stored_keys(), ['access_token:1', 'refresh_token:1'])
+        self.assertIn('пропущено строк с ошибками: 2', output)
+
+    def test_malformed_jsonl_lines_are_skipped(self):
+        """Тест: некорректные строки JSONL учитываются как ошибки, загрузка продолжается"""
+        path = self.write_file('.jsonl', self.rows[:2])
+        with open(path, 'a') as f:
+            f.write('{"user_id": 3, "access": \n')
+            f.write('[1, 2]\n')
+            f.write('"text"\n')
+            for row in self.rows[2:]:
+                f.write(json.dumps(row) + '\n')
+
+        output = self.run_bulk(path, '--workers', '2')
+
+        self.assertEqual(self.stored_keys(), self.expected_keys())
+        self.assertIn('Сохранено токенов: 10', output)
+        self.assertIn('пропущено строк с ошибками: 3', output)
+
+    def test_missing_arguments(self):
+        """Тест ошибки без user_id и без --bulk"""
+        with self.assertRaises(CommandError):
+            call_command('save_token')
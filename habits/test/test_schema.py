@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from config.schema import get_schema_path
+
+
+class SchemaFileTests(TestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.schema_dir)
+        settings_override = override_settings(SCHEMA_DIR=self.schema_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def generate(self):
+        out = StringIO()
+        call_command('generate_schema', stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_generate_schema_command(self):
+        """Тест: команда generate_schema сохраняет схему в JSON и YAML"""
+        output = self.generate()
+
+        with open(get_schema_path('json'), 'rb') as file:
+            schema = json.loads(file.read())
+        self.assertEqual(schema['info']['version'], 'v1')
+        self.assertIn('/habits/', schema['paths'])
+        self.assertTrue(os.path.exists(get_schema_path('yaml')))
+        self.assertIn(get_schema_path('json'), output)
+
+    def test_schema_is_served_from_file(self):
+        """Тест: схема отдается из файла с ETag без генерации на лету"""
+        self.generate()
+        with open(get_schema_path('json'), 'rb') as file:
+            expected = file.read()
+
+        with mock.patch('drf_yasg.generators.OpenAPISchemaGenerator.get_schema') as get_schema:
+            response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+            yaml_response = self.client.get(reverse('schema-json', kwargs={'format': '.yaml'}))
+            ui_response = self.client.get(reverse('schema-swagger-ui') + '?format=openapi')
+            get_schema.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertTrue(response['ETag'])
+        self.assertEqual(yaml_response['Content-Type'], 'application/yaml')
+        self.assertEqual(ui_response.content, expected)
+        self.assertEqual(ui_response['ETag'], response['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        """Тест: при совпадении If-None-Match возвращается 304 без тела"""
+        self.generate()
+        url = reverse('schema-json', kwargs={'format': '.json'})
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_regenerated_schema_changes_etag(self):
+        """Тест: после перегенерации отдается новый файл с новым ETag"""
+        self.generate()
+        url = reverse('schema-json', kwargs={'format': '.json'})
+        etag = self.client.get(url)['ETag']
+
+        path = get_schema_path('json')
+        with open(path, 'wb') as file:
+            file.write(b'{"swagger": "2.0"}')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+
+        response = self.client.get(url)
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_missing_schema_returns_404(self):
+        """Тест: без сгенерированной схемы и без DEBUG возвращается 404"""
+        response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(DEBUG=True)
+    def test_missing_schema_is_generated_in_debug(self):
+        """Тест: в DEBUG без файла схема генерируется на лету"""
+        response = self.client.get(reverse('schema-json', kwargs={'format': '.json'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/habits/', json.loads(response.content)['paths'])
+
+    def test_ui_pages(self):
+        """Тест: страницы Swagger UI и ReDoc открываются"""
+        for name in ('schema-swagger-ui', 'schema-redoc'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
@@ -0,0 +1,79 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from habits.models import Habit
+
+User = get_user_model()
+
+
+class HabitSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_authenticate(user=self.user)
+        self.create_habit('Утренняя зарядка', action='Делать упражнения', place='Дом')
+        self.create_habit('Чтение', action='Читать книгу', place='Зал для зарядки')
+        self.create_habit('Прогулка', action='Гулять', place='Парк')
+
+    def create_habit(self, name, action, place, is_public=True):
+        return Habit.objects.create(
+            user=self.user, name=name, action=action, place=place,
+            time_to_complete='09:00', is_public=is_public
+        )
+
+    def search(self, url_name, term, **params):
+        response = self.client.get(reverse(url_name), {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [habit['name'] for habit in response.data['results']]
+
+    def test_search_by_exact_word(self):
+        """Тест поиска по слову из названия и места"""
+        self.assertCountEqual(self.search('habit-list', 'Прогулка'), ['Прогулка'])
+        self.assertCountEqual(self.search('public-habit-list', 'Парк'), ['Прогулка'])
+
+    def test_search_respects_explicit_ordering(self):
+        """Тест: параметр ordering сохраняет приоритет над релевантностью"""
+        self.create_habit('Вечерняя зарядка', action='Упражнения', place='Дом')
+
+        names = self.search('public-habit-list', 'зарядка', ordering='name')
+
+        self.assertEqual(names, sorted(names))
+
+    @skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск только в PostgreSQL')
+    def test_search_uses_stemming_and_ranking(self):
+        """Тест морфологии и ранжирования: совпадение в названии выше совпадения в месте"""
+        names = self.search('public-habit-list', 'зарядку')
+
+        self.assertEqual(names, ['Утренняя зарядка', 'Чтение'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск только в PostgreSQL')
+    def test_search_vector_maintained_on_write(self):
+        """Тест обновления вектора при изменении полей и массовой вставке"""
+        habit = Habit.objects.get(name='Прогулка')
+        habit.name = 'Пробежка'
+        habit.save()
+        Habit.objects.bulk_create([
+            Habit(user=self.user, name='Медитация', time_to_complete='09:00', is_public=True)
+        ])
+
+        self.assertEqual(self.search('public-habit-list', 'пробежки'), ['Пробежка'])
+        self.assertEqual(self.search('public-habit-list', 'медитацию'), ['Медитация'])
+        self.assertEqual(self.search('public-habit-list', 'прогулка'), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Полнотекстовый поиск только в PostgreSQL')
+    def test_search_uses_gin_index(self):
+        """Тест использования GIN-индекса при поиске"""
+        from django.contrib.postgres.search import SearchQuery
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Habit.objects.filter(
+            search_vector=SearchQuery('зарядка', config='russian')
+        ).explain()
+
+        self.assertIn('habit_search_vector_idx', plan)
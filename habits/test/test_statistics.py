@@ -0,0 +1,249 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from habits.models import DailyUserStatistics, Habit, HabitCompletion, HabitStatistics
+from habits.statistics import expire_streaks
+from habits.tasks import format_habit_reminder
+
+User = get_user_model()
+
+DAY = datetime(2025, 4, 1, 9, 0, tzinfo=dt_timezone.utc)
+
+
+class StatisticsRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='12345')
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name='Тестовая привычка',
+            place='Дом',
+            action='Действие',
+            time_to_complete='09:00'
+        )
+        self.other_habit = Habit.objects.create(
+            user=self.user,
+            name='Другая привычка',
+            place='Дом',
+            action='Действие',
+            time_to_complete='10:00'
+        )
+
+    def complete(self, habit, days=0, **kwargs):
+        return HabitCompletion.objects.create(
+            habit=habit,
+            user=self.user,
+            completed_at=DAY + timedelta(days=days),
+            **kwargs
+        )
+
+    def test_completion_updates_habit_statistics(self):
+        """Тест инкрементального обновления статистики привычки"""
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 1, is_successful=False)
+        self.complete(self.habit, 2)
+
+        stats = HabitStatistics.objects.get(habit=self.habit)
+        self.assertEqual(stats.total_completions, 3)
+        self.assertEqual(stats.successful_completions, 2)
+        self.assertEqual(stats.current_streak, 3)
+        self.assertEqual(stats.longest_streak, 3)
+        self.assertEqual(stats.last_completed_on, (DAY + timedelta(days=2)).date())
+
+    def test_gap_resets_streak_but_keeps_longest(self):
+        """Тест сброса серии при пропуске с сохранением самой длинной серии"""
+        for days in (0, 1, 2, 5):
+            self.complete(self.habit, days)
+
+        stats = HabitStatistics.objects.get(habit=self.habit)
+        self.assertEqual(stats.current_streak, 1)
+        self.assertEqual(stats.longest_streak, 3)
+
+    def test_streak_respects_periodicity(self):
+        """Тест серии для привычки, выполняемой раз в несколько дней"""
+        self.habit.periodicity = 3
+        self.habit.save()
+        for days in (0, 3, 6):
+            self.complete(self.habit, days)
+
+        self.assertEqual(HabitStatistics.objects.get(habit=self.habit).current_streak, 3)
+
+    def test_backdated_completion_rebuilds_streak(self):
+        """Тест пересчета серии при отметке задним числом"""
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 2)
+        self.complete(self.habit, 1)
+
+        stats = HabitStatistics.objects.get(habit=self.habit)
+        self.assertEqual(stats.total_completions, 3)
+        self.assertEqual(stats.current_streak, 3)
+
+    def test_daily_statistics_and_user_streak(self):
+        """Тест дневной статистики и серии дней пользователя"""
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 1)
+        self.complete(self.other_habit, 1, is_successful=False)
+
+        day = DailyUserStatistics.objects.get(user=self.user, date=(DAY + timedelta(days=1)).date())
+        self.assertEqual(day.completions, 2)
+        self.assertEqual(day.successful_completions, 1)
+        self.assertEqual(day.habits_completed, 2)
+        self.assertEqual(day.streak, 2)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 2)
+        self.assertEqual(self.user.longest_streak, 2)
+
+    def test_delete_completion_recomputes_statistics(self):
+        """Тест пересчета статистики при удалении выполнения"""
+        self.complete(self.habit, 0)
+        completion = self.complete(self.habit, 1)
+
+        completion.delete()
+
+        stats = HabitStatistics.objects.get(habit=self.habit)
+        self.assertEqual(stats.total_completions, 1)
+        self.assertEqual(stats.current_streak, 1)
+        self.assertFalse(
+            DailyUserStatistics.objects.filter(user=self.user, date=(DAY + timedelta(days=1)).date()).exists()
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 1)
+
+    def test_delete_habit_recomputes_daily_statistics(self):
+        """Тест пересчета дневной статистики и серии пользователя при удалении привычки"""
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 1)
+        self.complete(self.other_habit, 0)
+
+        self.habit.delete()
+
+        day = DailyUserStatistics.objects.get(user=self.user, date=DAY.date())
+        self.assertEqual((day.completions, day.habits_completed), (1, 1))
+        self.assertFalse(
+            DailyUserStatistics.objects.filter(user=self.user, date=(DAY + timedelta(days=1)).date()).exists()
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 1)
+
+    def test_queryset_delete_recomputes_daily_statistics(self):
+        """Тест пересчета статистики при удалении привычек через QuerySet"""
+        self.complete(self.habit, 0)
+        self.complete(self.other_habit, 1)
+
+        Habit.objects.filter(user=self.user).delete()
+
+        self.assertFalse(DailyUserStatistics.objects.filter(user=self.user).exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 0)
+
+    def test_delete_user_with_statistics(self):
+        """Тест удаления пользователя вместе с привычками и статистикой"""
+        self.complete(self.habit, 0)
+
+        self.user.delete()
+
+        self.assertFalse(DailyUserStatistics.objects.exists())
+        self.assertFalse(HabitStatistics.objects.exists())
+
+    def test_expire_streaks(self):
+        """Тест сброса серий, прерванных пропуском"""
+        self.other_habit.periodicity = 3
+        self.other_habit.save()
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 1)
+        self.complete(self.other_habit, 1)
+
+        # Вчера было последнее выполнение: серии еще можно продолжить
+        self.assertEqual(expire_streaks(today=(DAY + timedelta(days=2)).date()), (0, 0))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.streak_days, 2)
+
+        # Через три дня прервалась серия пользователя и ежедневной привычки
+        self.assertEqual(expire_streaks(today=(DAY + timedelta(days=4)).date()), (1, 1))
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.streak_days, self.user.longest_streak), (0, 2))
+        self.assertEqual(HabitStatistics.objects.get(habit=self.habit).current_streak, 0)
+        self.assertEqual(HabitStatistics.objects.get(habit=self.other_habit).current_streak, 1)
+
+        self.assertEqual(expire_streaks(today=(DAY + timedelta(days=5)).date()), (0, 1))
+        self.assertEqual(HabitStatistics.objects.get(habit=self.other_habit).current_streak, 0)
+
+    def test_reminder_reads_rollup(self):
+        """Тест: текст напоминания берет число выполнений из статистики без подсчета"""
+        self.complete(self.habit, 0)
+        self.complete(self.habit, 1)
+        habit = Habit.objects.select_related('related_habit', 'statistics').get(pk=self.habit.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            message = format_habit_reminder(habit)
+
+        self.assertEqual(len(queries), 0)
+        self.assertIn('2 раз', message)
+
+
+class CompleteEndpointStatisticsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.habit = Habit.objects.create(
+            user=self.user,
+            name='Тестовая привычка',
+            place='Дом',
+            action='Действие',
+            time_to_complete='08:00'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_complete_action_updates_statistics(self):
+        """Тест обновления статистики при отметке через действие complete"""
+        url = reverse('habit-complete', args=[self.habit.id])
+        response = self.client.post(url, {'habit': self.habit.id})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(HabitStatistics.objects.get(habit=self.habit).total_completions, 1)
+        self.assertEqual(DailyUserStatistics.objects.get(user=self.user).completions, 1)
+
+
+class ConcurrentStatisticsTests(TransactionTestCase):
+    @skipUnless(connection.vendor == 'postgresql', 'Блокировки строк проверяются в PostgreSQL')
+    def test_concurrent_completions_are_both_counted(self):
+        """Тест: параллельные отметки разных привычек пользователя обе попадают в дневную статистику"""
+        user = User.objects.create_user(username='testuser', password='12345')
+        habits = [
+            Habit.objects.create(user=user, name=f'Привычка {i}', place='Дом', action='Действие',
+                                 time_to_complete='09:00')
+            for i in range(2)
+        ]
+        first_recorded = threading.Event()
+        errors = []
+
+        def complete_first():
+            try:
+                with transaction.atomic():
+                    HabitCompletion.objects.create(habit=habits[0], user=user, completed_at=DAY)
+                    first_recorded.set()
+                    # Вторая отметка начинается, пока первая не зафиксирована
+                    time.sleep(0.5)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=complete_first)
+        thread.start()
+        first_recorded.wait(5)
+        HabitCompletion.objects.create(habit=habits[1], user=user, completed_at=DAY)
+        thread.join()
+
+        self.assertEqual(errors, [])
+        day = DailyUserStatistics.objects.get(user=user, date=DAY.date())
+        self.assertEqual((day.completions, day.habits_completed), (2, 2))
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from habits.models import Habit, HabitCompletion, TelegramProfile
+from habits.tasks import send_daily_digests, send_habit_reminders
+
+User = get_user_model()
+
+NOW = datetime(2025, 4, 1, 9, 0, tzinfo=dt_timezone.utc)
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class HabitReminderSweepTests(TestCase):
+    def setUp(self):
+        with mock.patch('django.utils.timezone.now', return_value=NOW):
+            self.user = User.objects.create_user(username='testuser', password='12345')
+
+            # Привычки в окне напоминаний (напоминание за 30 минут) и вне его
+            self.due_habits = [
+                Habit.objects.create(
+                    user=self.user,
+                    name=f'Привычка {i}',
+                    place='Дом',
+                    action='Действие',
+                    time_to_complete=f'09:{10 + i:02d}'
+                )
+                for i in range(5)
+            ]
+            self.late_habit = Habit.objects.create(
+                user=self.user,
+                name='Вечерняя привычка',
+                place='Дом',
+                action='Действие',
+                time_to_complete='21:00'
+            )
+
+    def queued_ids(self, mock_delay):
+        return [habit_id for call in mock_delay.call_args_list for habit_id in call.args[0]]
+
+    @mock.patch('habits.tasks.send_habit_reminders_batch.delay')
+    def test_sweep_skips_completed_today(self, mock_delay, mock_now):
+        """Тест исключения выполненных сегодня привычек из рассылки"""
+        completed = self.due_habits[0]
+        HabitCompletion.objects.create(habit=completed, user=self.user, completed_at=NOW)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            count = send_habit_reminders()
+
+        self.assertEqual(count, 4)
+        self.assertCountEqual(self.queued_ids(mock_delay), [habit.id for habit in self.due_habits[1:]])
+
+    @mock.patch('habits.tasks.send_habit_reminders_batch.delay')
+    def test_sweep_advances_schedule(self, mock_delay, mock_now):
+        """Тест переноса расписания: повторный запуск не отправляет напоминания повторно"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(send_habit_reminders(), 5)
+            self.assertEqual(send_habit_reminders(), 0)
+
+        # Отбор и перенос пачки выполняются фиксированным числом запросов
+        self.assertLessEqual(len(queries), 7)
+        habit = Habit.objects.get(pk=self.due_habits[0].pk)
+        self.assertEqual(habit.next_due_at, datetime(2025, 4, 2, 9, 10, tzinfo=dt_timezone.utc))
+
+    @mock.patch('habits.tasks.REMINDER_BATCH_SIZE', 2)
+    @mock.patch('habits.tasks.send_habit_reminders_batch.delay')
+    def test_sweep_enqueues_in_chunks(self, mock_delay, mock_now):
+        """Тест постановки напоминаний в очередь пачками"""
+        with self.captureOnCommitCallbacks(execute=True):
+            count = send_habit_reminders()
+
+        self.assertEqual(count, 5)
+        self.assertEqual([len(call.args[0]) for call in mock_delay.call_args_list], [2, 2, 1])
+
+    @mock.patch('habits.tasks.send_habit_reminders_batch.delay')
+    def test_sweep_honors_lead_time_and_periodicity(self, mock_delay, mock_now):
+        """Тест учета настройки notify_before_minutes, периодичности и активности"""
+        Habit.objects.filter(pk__in=[habit.pk for habit in self.due_habits]).update(is_active=False)
+        self.user.notify_before_minutes = 720
+        self.user.save()
+        self.late_habit.periodicity = 3
+        self.late_habit.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            count = send_habit_reminders()
+
+        self.assertEqual(count, 1)
+        self.assertEqual(self.queued_ids(mock_delay), [self.late_habit.id])
+        self.late_habit.refresh_from_db()
+        self.assertEqual(self.late_habit.next_due_at, NOW.replace(hour=21) + timedelta(days=3))
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class DailyDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'user{i}', password='12345')
+            TelegramProfile.objects.create(user=user, chat_id=f'10{i}')
+            cls.users.append(user)
+        cls.unlinked_user = User.objects.create_user(username='unlinked', password='12345')
+
+        habits = [
+            Habit.objects.create(
+                user=cls.users[0],
+                name=f'Привычка {i}',
+                place='Дом',
+                action='Действие',
+                time_to_complete='08:00'
+            )
+            for i in range(2)
+        ]
+        Habit.objects.create(
+            user=cls.unlinked_user, name='Привычка', place='Дом', action='Действие',
+            time_to_complete='08:00'
+        )
+        HabitCompletion.objects.create(
+            habit=habits[0], user=cls.users[0], completed_at=NOW - timedelta(days=1)
+        )
+
+    @mock.patch('habits.tasks.Outbox')
+    def test_digests_for_linked_users(self, mock_outbox, mock_now):
+        """Тест формирования статистики для всех пользователей с Telegram"""
+        count = send_daily_digests()
+
+        self.assertEqual(count, 3)
+        messages = {
+            message['chat_id']: message['text']
+            for call in mock_outbox.return_value.push_many.call_args_list
+            for message in call.args[0]
+        }
+        self.assertEqual(set(messages), {'100', '101', '102'})
+        self.assertIn('Статистика за 31.03.2025', messages['100'])
+        self.assertIn('Всего привычек: 2', messages['100'])
+        self.assertIn('Выполнено вчера: 1', messages['100'])
+        self.assertIn('Процент выполнения: 50.0%', messages['100'])
+        self.assertIn('Всего привычек: 0', messages['101'])
+
+    @mock.patch('habits.tasks.DIGEST_BATCH_SIZE', 2)
+    @mock.patch('habits.tasks.Outbox')
+    def test_digests_use_grouped_queries_per_page(self, mock_outbox, mock_now):
+        """Тест: число запросов зависит от числа страниц, а не пользователей"""
+        with CaptureQueriesContext(connection) as queries:
+            send_daily_digests()
+
+        # Две страницы по три запроса и пустая завершающая выборка
+        self.assertEqual(len(queries), 7)
+        self.assertEqual(
+            [len(call.args[0]) for call in mock_outbox.return_value.push_many.call_args_list],
+            [2, 1]
+        )
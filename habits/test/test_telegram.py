@@ -1,10 +1,12 @@
 from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 
 from habits.models import Habit, TelegramProfile
 from habits.tasks import send_habit_reminder, schedule_reminder, format_habit_reminder
+from telegram_bot.services import ChatIdService
 
 User = get_user_model()
 
@@ -76,3 +78,49 @@ class TelegramIntegrationTests(TestCase):
         with mock.patch('habits.tasks.schedule_reminder', return_value=True):
             result = schedule_reminder(self.habit.id, minutes_before=30)
             self.assertTrue(result)
+
+
+class ChatIdServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='12345')
+        cls.other_user = User.objects.create_user(username='otheruser', password='12345')
+        TelegramProfile.objects.create(user=cls.user, chat_id='123456789')
+
+    def setUp(self):
+        cache.clear()
+        self.service = ChatIdService()
+
+    def test_get_chat_id_cached(self):
+        """Тест получения chat_id из профиля с последующим чтением из кэша"""
+        self.assertEqual(self.service.get_chat_id(self.user.id), '123456789')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.get_chat_id(self.user.id), '123456789')
+
+    def test_missing_profile_cached(self):
+        """Тест кэширования отсутствия привязанного Telegram"""
+        self.assertIsNone(self.service.get_chat_id(self.other_user.id))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.service.get_chat_id(self.other_user.id))
+
+    def test_get_chat_ids_bulk(self):
+        """Тест получения chat_id для нескольких пользователей одним запросом"""
+        with self.assertNumQueries(1):
+            chat_ids = self.service.get_chat_ids([self.user.id, self.other_user.id])
+
+        self.assertEqual(chat_ids, {self.user.id: '123456789'})
+
+    def test_invalidate_on_profile_update(self):
+        """Тест сброса кэша при изменении профиля Telegram"""
+        self.assertIsNone(self.service.get_chat_id(self.other_user.id))
+
+        TelegramProfile.objects.create(user=self.other_user, chat_id='987654321')
+        self.assertEqual(self.service.get_chat_id(self.other_user.id), '987654321')
+
+        TelegramProfile.objects.update_or_create(
+            user=self.other_user,
+            defaults={'chat_id': '555'}
+        )
+        self.assertEqual(self.service.get_chat_id(self.other_user.id), '555')
@@ -0,0 +1,64 @@
+import time
+from unittest import mock
+
+import jwt
+from django.test import SimpleTestCase, override_settings
+
+from token_management import services
+from token_management.services import TokenService
+
+
+def make_token(user_id, lifetime=300):
+    return jwt.encode({'user_id': user_id, 'exp': int(time.time()) + lifetime}, 'secret',
+                      algorithm='HS256')
+
+
+class TokenServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = mock.MagicMock()
+        self.service = TokenService(redis_client=self.redis)
+
+    def test_redis_pool_shared_between_instances(self):
+        """Тест общего пула соединений для всех экземпляров сервиса"""
+        with mock.patch.object(services, '_pool', None):
+            first, second = TokenService(), TokenService()
+
+            self.assertIs(first.redis.connection_pool, second.redis.connection_pool)
+            self.assertEqual(first.redis.connection_pool.connection_kwargs['db'], 3)
+
+    def test_delete_user_tokens_single_command(self):
+        """Тест удаления обоих токенов одной командой"""
+        self.service.delete_user_tokens(7)
+
+        self.redis.delete.assert_called_once_with('access_token:7', 'refresh_token:7')
+
+    @override_settings(TOKEN_PIPELINE_BATCH_SIZE=2)
+    def test_get_user_tokens_uses_mget(self):
+        """Тест чтения токенов многих пользователей через MGET"""
+        self.redis.mget.side_effect = [[b'token-1', None], [b'token-3']]
+
+        tokens = self.service.get_user_tokens([1, 2, 3])
+
+        self.assertEqual(tokens, {1: 'token-1', 2: None, 3: 'token-3'})
+        self.assertEqual(self.redis.mget.call_args_list, [
+            mock.call(['access_token:1', 'access_token:2']),
+            mock.call(['access_token:3']),
+        ])
+        self.redis.get.assert_not_called()
+
+    @override_settings(TOKEN_PIPELINE_BATCH_SIZE=2)
+    def test_store_user_tokens_pipelined(self):
+        """Тест сохранения токенов многих пользователей конвейером"""
+        pipeline = self.redis.pipeline.return_value
+        tokens = {user_id: make_token(user_id) for user_id in range(1, 4)}
+
+        count = self.service.store_user_tokens(tokens)
+
+        self.assertEqual(count, 3)
+        self.redis.pipeline.assert_called_once_with(transaction=False)
+        self.assertEqual(pipeline.setex.call_count, 3)
+        self.assertEqual(pipeline.execute.call_count, 2)
+        key, ttl, token = pipeline.setex.call_args_list[0].args
+        self.assertEqual((key, token), ('access_token:1', tokens[1]))
+        self.assertTrue(290 <= ttl <= 300)
+        self.redis.setex.assert_not_called()
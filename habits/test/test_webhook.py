@@ -0,0 +1,166 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from telegram_bot.runtime import BotRuntime, Router
+from telegram_bot.updates import UpdateQueue, parse_partitions
+
+# Обновления в том виде, в котором их присылает Telegram
+RECORDED_UPDATES = [
+    {
+        'update_id': 100001,
+        'message': {
+            'message_id': 11,
+            'from': {'id': 5001, 'is_bot': False, 'first_name': 'Иван', 'language_code': 'ru'},
+            'chat': {'id': 5001, 'first_name': 'Иван', 'type': 'private'},
+            'date': 1743498000,
+            'text': '/list',
+            'entities': [{'offset': 0, 'length': 5, 'type': 'bot_command'}],
+        },
+    },
+    {
+        'update_id': 100002,
+        'callback_query': {
+            'id': '4382',
+            'from': {'id': 5001, 'is_bot': False, 'first_name': 'Иван'},
+            'message': {
+                'message_id': 12,
+                'from': {'id': 7000, 'is_bot': True, 'first_name': 'HabitsBot'},
+                'chat': {'id': 5001, 'first_name': 'Иван', 'type': 'private'},
+                'date': 1743498005,
+                'text': 'Выберите привычку для отметки:',
+            },
+            'chat_instance': '-123456',
+            'data': 'complete_1',
+        },
+    },
+    {
+        'update_id': 100003,
+        'message': {
+            'message_id': 3,
+            'from': {'id': 5002, 'is_bot': False, 'first_name': 'Мария'},
+            'chat': {'id': 5002, 'first_name': 'Мария', 'type': 'private'},
+            'date': 1743498010,
+            'text': 'Зарядка',
+        },
+    },
+]
+
+
+class FakeUpdateQueue:
+    """Очередь обновлений в памяти с интерфейсом UpdateQueue"""
+
+    def __init__(self, updates):
+        self.updates = list(updates)
+
+    async def pop(self, partitions, timeout=1):
+        if self.updates:
+            return self.updates.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+
+@override_settings(TELEGRAM_WEBHOOK_SECRET='webhook-secret')
+class TelegramWebhookTests(SimpleTestCase):
+    def setUp(self):
+        self.url = reverse('telegram-webhook')
+        patcher = mock.patch('telegram_bot.views.UpdateQueue')
+        self.mock_queue = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def post(self, update, secret='webhook-secret'):
+        headers = {'HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN': secret} if secret else {}
+        return self.client.post(self.url, json.dumps(update), content_type='application/json',
+                                **headers)
+
+    def test_recorded_updates_are_queued(self):
+        """Тест постановки записанных обновлений в очередь"""
+        for update in RECORDED_UPDATES:
+            self.assertEqual(self.post(update).status_code, 200)
+
+        queued = [call.args[0] for call in self.mock_queue.push.call_args_list]
+        self.assertEqual(queued, RECORDED_UPDATES)
+
+    def test_wrong_secret_rejected(self):
+        """Тест отклонения запроса с неверным секретным токеном"""
+        self.assertEqual(self.post(RECORDED_UPDATES[0], secret='wrong').status_code, 403)
+        self.assertEqual(self.post(RECORDED_UPDATES[0], secret=None).status_code, 403)
+        self.mock_queue.push.assert_not_called()
+
+    def test_invalid_body_rejected(self):
+        """Тест отклонения запроса, не являющегося обновлением"""
+        self.assertEqual(self.post(['not', 'an', 'update']).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    @override_settings(TELEGRAM_WEBHOOK_SECRET=None)
+    def test_webhook_disabled_without_secret(self):
+        """Тест: без настроенного секрета webhook не принимает обновления"""
+        self.assertEqual(self.post(RECORDED_UPDATES[0]).status_code, 403)
+
+
+class UpdateQueueTests(SimpleTestCase):
+    def test_updates_of_one_chat_share_partition(self):
+        """Тест: сообщения и нажатия кнопок одного чата попадают в одну секцию"""
+        queue = UpdateQueue(redis_client=mock.Mock(), partitions=16)
+
+        partitions = [queue.get_partition(update) for update in RECORDED_UPDATES]
+
+        self.assertEqual(partitions[0], partitions[1])
+        self.assertEqual(partitions[0], 5001 % 16)
+        self.assertEqual(partitions[2], 5002 % 16)
+
+    def test_push_uses_shared_sync_client(self):
+        """Тест: webhook ставит обновления в очередь через общий синхронный клиент"""
+        with mock.patch('telegram_bot.updates._pool', None), \
+                mock.patch('telegram_bot.updates.redis.Redis') as redis_class:
+            for update in RECORDED_UPDATES:
+                UpdateQueue(partitions=16).push(update)
+
+            pools = {call.kwargs['connection_pool'] for call in redis_class.call_args_list}
+
+        self.assertEqual(len(pools), 1)
+        rpush = redis_class.return_value.rpush
+        self.assertEqual(rpush.call_count, 3)
+        self.assertEqual(rpush.call_args_list[0].args[0], f'telegram:updates:{5001 % 16}')
+        self.assertEqual(json.loads(rpush.call_args_list[2].args[1]), RECORDED_UPDATES[2])
+
+    def test_parse_partitions(self):
+        """Тест разбора списка секций обработчика"""
+        self.assertEqual(parse_partitions('0-3,7', 8), [0, 1, 2, 3, 7])
+        self.assertEqual(parse_partitions(None, 4), [0, 1, 2, 3])
+        with self.assertRaises(ValueError):
+            parse_partitions('8', 8)
+
+    def test_worker_consumes_queued_updates(self):
+        """Тест обработки обновлений из очереди в порядке поступления"""
+        test_router = Router()
+        handled = []
+
+        @test_router.command('list')
+        async def list_command(update, context):
+            handled.append(update.update_id)
+
+        @test_router.callback_query
+        async def callback(update, context):
+            handled.append(update.update_id)
+
+        @test_router.state(None)
+        async def text(update, context):
+            handled.append(update.update_id)
+
+        async def run():
+            runtime = BotRuntime(mock.Mock(), test_router, io_workers=1)
+            stop_event = asyncio.Event()
+            consumer = asyncio.create_task(
+                runtime.consume(FakeUpdateQueue(RECORDED_UPDATES), [0], stop_event))
+            await asyncio.sleep(0.1)
+            stop_event.set()
+            await consumer
+            await runtime.shutdown()
+
+        asyncio.run(run())
+
+        self.assertEqual(handled, [100001, 100002, 100003])
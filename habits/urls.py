@@ -4,7 +4,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     HabitViewSet,
     HabitCompletionViewSet,
-    PublicHabitListView
+    PublicHabitListView,
+    ExportView
 )
 
 router = DefaultRouter()
@@ -27,4 +28,7 @@ urlpatterns = [
     path('habits/<int:habit_id>/completions/',
          HabitCompletionViewSet.as_view({'get': 'list_by_habit'}),
          name='habit-completion-list'),
+    path('export/completions/', ExportView.as_view(resource='completions'),
+         name='export-completions'),
+    path('export/habits/', ExportView.as_view(resource='habits'), name='export-habits'),
 ]
\ No newline at end of file
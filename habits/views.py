@@ -1,15 +1,27 @@
-from django.db.models import Q
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics, viewsets, permissions, status, filters
+from rest_framework import generics, viewsets, permissions, serializers, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from token_management.api_client import APIClient
+from token_management.api_client import get_api_client
+from .bulk import HabitBatch
+from .cache import get_page_cache_key, get_page_etag, get_public_habits_version, get_query_digest
+from .export import RENDERERS, stream_export
+from .fast_serializers import HabitCompletionValuesSerializer, HabitValuesSerializer
 from .models import Habit, HabitCompletion
-from .pagination import HabitPagination
+from .pagination import CompletionKeysetPagination, HabitKeysetPagination, HabitPagination
 from .permissions import IsPublicOrOwner
-from .serializers import HabitSerializer, HabitCompletionSerializer
+from .renderers import FastJSONMixin
+from .search import HabitSearchFilter
+from .serializers import BulkCompletionItemSerializer, HabitSerializer, HabitCompletionSerializer
 
 
 def get_habits_view(request):
@@ -18,8 +30,7 @@ def get_habits_view(request):
 
     Возвращает список привычек пользователя в формате JSON.
     """
-    client = APIClient()
-    response = client.make_request(user_id=request.user.id, method="get", endpoint="/habits/")
+    response = get_api_client().make_request(user_id=request.user.id, method="get", endpoint="/habits/")
     habits = response.json()
     return JsonResponse(habits, safe=False)
 
@@ -42,14 +53,34 @@ def create_habit_view(request):
             "periodicity": int(request.POST.get("periodicity")),
             "estimated_duration": int(request.POST.get("estimated_duration"))
         }
-        client = APIClient()
-        response = client.make_request(user_id=request.user.id, method="post", endpoint="/habits/",
-                                       data=new_habit_data)
+        response = get_api_client().make_request(user_id=request.user.id, method="post",
+                                                 endpoint="/habits/", data=new_habit_data)
         return JsonResponse(response.json(), status=response.status_code)
     return JsonResponse({"error": "Invalid request method"}, status=400)
 
 
-class HabitViewSet(viewsets.ModelViewSet):
+class ValuesListMixin:
+    """
+    Списки только для чтения через values()-сериализацию (см. habits.fast_serializers).
+
+    Фильтрация и пагинация работают как обычно, но вместо моделей
+    и ModelSerializer строки выбираются через values_serializer_class.
+    """
+    values_serializer_class = None
+
+    def values_list_response(self, queryset):
+        values_serializer = self.values_serializer_class
+        queryset = values_serializer.project(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.to_representation(page))
+        return Response(values_serializer.to_representation(queryset))
+
+    def list(self, request, *args, **kwargs):
+        return self.values_list_response(self.filter_queryset(self.get_queryset()))
+
+
+class HabitViewSet(FastJSONMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     API для работы с привычками.
 
@@ -70,11 +101,15 @@ class HabitViewSet(viewsets.ModelViewSet):
 
     destroy:
     Удаление привычки.
+
+    bulk:
+    Пакетное создание, изменение и удаление привычек.
     """
     serializer_class = HabitSerializer
+    values_serializer_class = HabitValuesSerializer
     permission_classes = [permissions.IsAuthenticated, IsPublicOrOwner]
-    pagination_class = HabitPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    pagination_class = HabitKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, HabitSearchFilter]
     filterset_fields = ['is_pleasant', 'is_public', 'periodicity']
     ordering_fields = ['created_at', 'name', 'periodicity']
     search_fields = ['name', 'description', 'place', 'action']
@@ -87,11 +122,13 @@ class HabitViewSet(viewsets.ModelViewSet):
         Для остальных методов возвращает только собственные привычки.
         """
         user = self.request.user
-        # Для операций чтения (GET) - видит свои и публичные привычки
+        # Для операций чтения (GET) - видит свои и публичные привычки.
+        # Объединение вместо OR, чтобы каждая часть шла по своему индексу.
         if self.request.method in permissions.SAFE_METHODS:
-            return Habit.objects.filter(
-                Q(user=user) | Q(is_public=True)
-            ).select_related('user', 'related_habit')
+            visible_ids = Habit.objects.filter(user=user).order_by().values('pk').union(
+                Habit.objects.filter(is_public=True).order_by().values('pk')
+            )
+            return Habit.objects.filter(pk__in=visible_ids).select_related('user', 'related_habit')
         # Для операций изменения - видит только свои привычки
         return Habit.objects.filter(user=user).select_related('user', 'related_habit')
 
@@ -113,10 +150,24 @@ class HabitViewSet(viewsets.ModelViewSet):
         # IsOwner в permission_classes уже проверяет владельца
         serializer = HabitCompletionSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save(habit=habit)
+            serializer.save(habit=habit, user=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Пакетное создание, изменение и удаление привычек.
+
+        Принимает {"create": [...], "update": [{"id": ..., ...}], "delete": [id, ...]}.
+        Изменения частичные. Пачка проверяется целиком и записывается в одной
+        транзакции; при ошибках возвращается 400 с ошибками по разделам
+        и индексам элементов, и ничего не сохраняется.
+        """
+        batch = HabitBatch(request, request.data)
+        batch.validate()
+        return Response(batch.save(), status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def my_habits(self, request):
         """
@@ -131,16 +182,10 @@ class HabitViewSet(viewsets.ModelViewSet):
             habits = backend().filter_queryset(request, habits, self)
 
         # Применяем пагинацию
-        page = self.paginate_queryset(habits)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self.values_list_response(habits)
 
-        serializer = self.get_serializer(habits, many=True)
-        return Response(serializer.data)
 
-
-class HabitCompletionViewSet(viewsets.ModelViewSet):
+class HabitCompletionViewSet(FastJSONMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     API для управления отметками о выполнении привычек.
 
@@ -158,20 +203,26 @@ class HabitCompletionViewSet(viewsets.ModelViewSet):
 
     destroy:
     Удаление записи о выполнении привычки.
+
+    bulk:
+    Пакетная отметка выполнений с результатом по каждому элементу.
     """
     serializer_class = HabitCompletionSerializer
+    values_serializer_class = HabitCompletionValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = HabitPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['completion_date']
-    ordering_fields = ['completion_date']
+    # Порядок (completed_at, id) задается пагинацией по ключу
+    pagination_class = CompletionKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['habit', 'is_successful']
 
     def get_queryset(self):
         """
         Возвращает список выполнений привычек текущего пользователя.
         """
+        # Отметку может создать только владелец привычки, поэтому user совпадает
+        # с habit.user; фильтр по user идет по индексу completion_user_date_idx
         return HabitCompletion.objects.filter(
-            habit__user=self.request.user
+            user=self.request.user
         ).select_related('habit')
 
     def perform_create(self, serializer):
@@ -185,6 +236,71 @@ class HabitCompletionViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Вы можете отмечать только свои привычки")
         serializer.save(user=self.request.user)  # Добавляем пользователя при сохранении
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Пакетная отметка выполнений привычек.
+
+        Принимает список элементов {habit, completed_at, is_successful, notes}.
+        Принадлежность привычек проверяется одним запросом, корректные элементы
+        сохраняются одним INSERT вместе с пересчетом расписания и статистики.
+        Для каждого элемента возвращается результат: created с id или error
+        с ошибками. Статус ответа: 201 - все сохранены, 207 - сохранена часть,
+        400 - ни одного.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Ожидается непустой список выполнений')
+        if len(items) > settings.BULK_COMPLETIONS_MAX_ITEMS:
+            raise ValidationError(
+                f'Не больше {settings.BULK_COMPLETIONS_MAX_ITEMS} выполнений за запрос'
+            )
+
+        item_serializers = [BulkCompletionItemSerializer(data=item) for item in items]
+        valid = [item_serializer.is_valid() for item_serializer in item_serializers]
+        habits = Habit.objects.filter(user=request.user).select_related('user').in_bulk({
+            item_serializer.validated_data['habit']
+            for item_serializer, is_valid in zip(item_serializers, valid) if is_valid
+        })
+
+        results = []
+        pending = []
+        for index, (item_serializer, is_valid) in enumerate(zip(item_serializers, valid)):
+            if not is_valid:
+                results.append({'index': index, 'status': 'error', 'errors': item_serializer.errors})
+                continue
+            data = item_serializer.validated_data
+            habit = habits.get(data['habit'])
+            if habit is None:
+                results.append({'index': index, 'status': 'error',
+                                'errors': {'habit': ['Можно отмечать только свои привычки']}})
+                continue
+            result = {'index': index, 'status': 'created'}
+            results.append(result)
+            pending.append((result, HabitCompletion(
+                habit=habit,
+                user=request.user,
+                completed_at=data.get('completed_at') or timezone.now(),
+                is_successful=data['is_successful'],
+                notes=data.get('notes')
+            )))
+
+        created = HabitCompletion.bulk_record([completion for result, completion in pending])
+        for (result, _), completion in zip(pending, created):
+            result['id'] = completion.id
+
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif len(created) < len(results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({
+            'created': len(created),
+            'errors': len(results) - len(created),
+            'results': results,
+        }, status=response_status)
+
     @action(detail=False, methods=['get'])
     def list_by_habit(self, request, habit_id=None):
         """
@@ -193,28 +309,26 @@ class HabitCompletionViewSet(viewsets.ModelViewSet):
         Возвращает список всех выполнений конкретной привычки с пагинацией.
         """
         completions = self.get_queryset().filter(habit_id=habit_id)
-        page = self.paginate_queryset(completions)
+        return self.values_list_response(completions)
 
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(completions, many=True)
-        return Response(serializer.data)
-
-
-class PublicHabitListView(generics.ListAPIView):
+class PublicHabitListView(FastJSONMixin, ValuesListMixin, generics.ListAPIView):
     """
     API для просмотра публичных привычек.
 
     Предоставляет доступ к списку всех публичных привычек с возможностью
     фильтрации, сортировки и поиска. Доступно только аутентифицированным
     пользователям.
+
+    Страницы кэшируются по нормализованным параметрам запроса до изменения
+    каталога (см. habits.cache) вместе с ETag - хэшем содержимого; при
+    совпадении If-None-Match возвращается 304 без тела.
     """
     serializer_class = HabitSerializer
+    values_serializer_class = HabitValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = HabitPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, HabitSearchFilter]
     filterset_fields = ['is_pleasant', 'periodicity']
     ordering_fields = ['created_at', 'name']
     search_fields = ['name', 'description', 'place', 'action']
@@ -223,4 +337,55 @@ class PublicHabitListView(generics.ListAPIView):
         """
         Возвращает список всех публичных привычек.
         """
-        return Habit.objects.filter(is_public=True).select_related('user')
\ No newline at end of file
+        return Habit.objects.filter(is_public=True).select_related('user')
+
+    def list(self, request, *args, **kwargs):
+        cache_key = get_page_cache_key(get_public_habits_version(), get_query_digest(request))
+        page = cache.get(cache_key)
+        if page is None:
+            data = super().list(request, *args, **kwargs).data
+            page = (data, get_page_etag(data))
+            cache.set(cache_key, page, settings.PUBLIC_HABITS_CACHE_TIMEOUT)
+        data, etag = page
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка привычек или выполнений текущего пользователя.
+
+    Параметры запроса:
+    - output: ndjson (по умолчанию) или csv;
+    - since: ISO-время, для выполнений - не раньше completed_at,
+      для привычек - не раньше updated_at (инкрементальная синхронизация).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    resource = None
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in RENDERERS:
+            raise ValidationError({'output': f'Допустимые значения: {", ".join(RENDERERS)}'})
+
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = serializers.DateTimeField().to_internal_value(since)
+            except serializers.ValidationError as e:
+                raise ValidationError({'since': e.detail})
+
+        content_type = RENDERERS[output][0]
+        response = StreamingHttpResponse(
+            stream_export(self.resource, output, request.user, since or None),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.resource}.{output}"'
+        return response
@@ -0,0 +1,204 @@
+# telegram_bot/conversations.py
+"""
+Хранение состояния диалогов бота в TelegramState.
+
+Состояние читается из кэша в памяти процесса, а изменения записываются
+в базу отложенно (write-behind) пачками, поэтому обработка сообщения не ждет
+записи в БД. Запись кэша перечитывается из базы по истечении TTL, чтобы
+несколько процессов бота могли подхватить чат друг у друга (например, после
+перезапуска или смены секций). Одновременно один чат должен обслуживать один
+процесс: в режиме webhook это обеспечивает разбиение очереди по chat_id,
+иначе другой процесс может видеть устаревшее состояние до истечения TTL.
+
+Кэш ограничен TELEGRAM_STATE_CACHE_SIZE диалогами: давно не использованные
+сохраненные диалоги вытесняются и при следующем сообщении читаются из базы.
+Несохраненные и записываемые в данный момент диалоги не вытесняются.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TelegramState
+from .runtime import database_sync_to_async
+
+logger = logging.getLogger(__name__)
+
+# Значение TelegramState.state, соответствующее отсутствию активного диалога
+NO_STATE = 'start'
+
+
+def state_to_db(state):
+    return NO_STATE if state is None else str(state)
+
+
+def state_from_db(value):
+    if value == NO_STATE or value == '':
+        return None
+    return int(value) if value.lstrip('-').isdigit() else value
+
+
+@database_sync_to_async
+def load_states(telegram_ids):
+    """Состояния диалогов из базы: {telegram_id: conversation}"""
+    return {
+        state.telegram_id: {'state': state_from_db(state.state), 'user_data': state.context}
+        for state in TelegramState.objects.filter(telegram_id__in=telegram_ids)
+    }
+
+
+@database_sync_to_async
+def save_states(states):
+    """Записывает состояния одним запросом (INSERT ... ON CONFLICT UPDATE)"""
+    TelegramState.objects.bulk_create(
+        states,
+        update_conflicts=True,
+        unique_fields=['telegram_id'],
+        update_fields=['user', 'state', 'context', 'updated_at']
+    )
+
+
+class ConversationStore:
+    """
+    Хранилище диалогов с отложенной пакетной записью в TelegramState.
+
+    Интерфейс совпадает с runtime.LocalConversationStore. Изменения сбрасываются
+    в базу каждые flush_interval секунд или при накоплении flush_batch_size
+    измененных диалогов, а также при остановке бота (close).
+    """
+
+    def __init__(self, ttl=None, flush_interval=None, flush_batch_size=None, max_size=None):
+        self.ttl = ttl if ttl is not None else settings.TELEGRAM_STATE_CACHE_TTL
+        self.flush_interval = flush_interval or settings.TELEGRAM_STATE_FLUSH_INTERVAL
+        self.flush_batch_size = flush_batch_size or settings.TELEGRAM_STATE_FLUSH_BATCH_SIZE
+        self.max_size = max_size or settings.TELEGRAM_STATE_CACHE_SIZE
+        # LRU: последние использованные диалоги в конце
+        self.cache = OrderedDict()
+        self.dirty = set()
+        # Диалоги, которые записываются в базу прямо сейчас
+        self.flushing = set()
+        self.flush_lock = None
+        self.flush_task = None
+
+    async def load(self, chat_id):
+        key = str(chat_id)
+        cached = self.cache.get(key)
+        # Несохраненные изменения новее базы, их не перечитываем
+        if cached is not None and (key in self.dirty or time.monotonic() - cached[1] < self.ttl):
+            self.cache.move_to_end(key)
+            return cached[0]
+
+        conversation = (await load_states([key])).get(key)
+        if conversation is None:
+            conversation = {'state': None, 'user_data': {}}
+        self.remember(key, conversation)
+        return conversation
+
+    async def save(self, chat_id, conversation):
+        key = str(chat_id)
+        self.dirty.add(key)
+        self.remember(key, conversation)
+
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_periodically())
+        if len(self.dirty) >= self.flush_batch_size:
+            await self.flush()
+
+    def remember(self, key, conversation):
+        """Кладет диалог в кэш и вытесняет давно не использованные сохраненные диалоги"""
+        self.cache[key] = (conversation, time.monotonic())
+        self.cache.move_to_end(key)
+        if len(self.cache) <= self.max_size:
+            return
+        # Несохраненные и записываемые диалоги не вытесняются
+        evicted = []
+        for cached_key in self.cache:
+            if len(self.cache) - len(evicted) <= self.max_size:
+                break
+            if cached_key not in self.dirty and cached_key not in self.flushing:
+                evicted.append(cached_key)
+        for cached_key in evicted:
+            del self.cache[cached_key]
+
+    async def flush(self):
+        """
+        Записывает измененные диалоги в базу.
+
+        Если пачка не записалась, диалоги записываются по одному: строки,
+        которые не удается записать (например, пользователь удален), пропускаются,
+        остальные сохраняются. Если не записалась ни одна строка (база недоступна),
+        все диалоги остаются измененными до следующей попытки.
+        """
+        if self.flush_lock is None:
+            self.flush_lock = asyncio.Lock()
+        async with self.flush_lock:
+            if not self.dirty:
+                return 0
+            keys, self.dirty = self.dirty, set()
+            self.flushing = keys
+            try:
+                return await self.save_keys(keys)
+            finally:
+                self.flushing = set()
+
+    async def save_keys(self, keys):
+        now = timezone.now()
+        states = []
+        for key in keys:
+            conversation = self.cache[key][0]
+            try:
+                states.append(TelegramState(
+                    telegram_id=key,
+                    user_id=conversation['user_data'].get('user_id'),
+                    state=state_to_db(conversation['state']),
+                    # Копия: обработчики могут менять user_data во время записи
+                    context=json.loads(json.dumps(conversation['user_data'])),
+                    updated_at=now
+                ))
+            except (TypeError, ValueError):
+                logger.exception(f"Состояние диалога {key} не сериализуется и не будет сохранено")
+
+        try:
+            await save_states(states)
+            return len(states)
+        except Exception:
+            logger.exception(f"Не удалось сохранить состояние {len(states)} диалогов, запись по одному")
+
+        saved = 0
+        failed = []
+        for state in states:
+            try:
+                await save_states([state])
+                saved += 1
+            except Exception:
+                failed.append(state.telegram_id)
+
+        if saved:
+            logger.error(f"Пропущены диалоги, которые не удалось сохранить: {failed}")
+        else:
+            # Ни одна строка не записалась: повторим всю пачку позже
+            self.dirty |= set(failed)
+        return saved
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Ошибка фоновой записи состояния диалогов")
+
+    async def close(self):
+        """Останавливает фоновую запись и сохраняет оставшиеся изменения"""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+            self.flush_task = None
+        await self.flush()
@@ -0,0 +1,273 @@
+# telegram_bot/delivery.py
+"""
+Пакетная доставка сообщений в Telegram.
+
+Задачи Celery складывают готовые сообщения в очередь Redis (Outbox), а
+долгоживущий процесс DeliveryEngine забирает их пачками и отправляет
+параллельно через одно HTTP-соединение бота, соблюдая общий лимит
+Telegram и лимит на отдельный чат.
+"""
+import json
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import redis
+from django.conf import settings
+from telegram import Bot, ParseMode
+from telegram.error import NetworkError, RetryAfter, TelegramError, TimedOut
+from telegram.utils.request import Request
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Потокобезопасный token bucket.
+
+    Пополняется со скоростью rate токенов в секунду и вмещает не более capacity.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def try_acquire(self):
+        """Забирает токен; возвращает 0 при успехе или время ожидания в секундах"""
+        with self.lock:
+            now = self.clock()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Блокирует поток до получения токена"""
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Приостанавливает выдачу токенов (например, после ответа 429)"""
+        with self.lock:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0
+            self.updated_at = self.paused_until
+
+    def is_idle(self):
+        """Bucket заполнен и его можно удалить без потери состояния"""
+        with self.lock:
+            self._refill(self.clock())
+            return self.tokens >= self.capacity
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_redis_pool():
+    """Общий для процесса пул соединений с базой Redis очереди доставки"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = redis.ConnectionPool.from_url(settings.TELEGRAM_DELIVERY_REDIS_URL)
+        return _pool
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений Telegram в Redis.
+
+    Забранные сообщения не удаляются сразу, а переносятся (LMOVE) в список
+    обработки своего потребителя и удаляются из него только вызовом ack()
+    после отправки. Если процесс доставки упал посреди пачки, recover() при
+    следующем запуске возвращает недоставленное в начало очереди. Доставка
+    получается "не менее одного раза": сообщения пачки, отправленные до
+    падения, будут отправлены повторно.
+    """
+
+    key = 'telegram:outbox'
+
+    def __init__(self, redis_client=None, consumer=None):
+        self.redis = redis_client or redis.Redis(connection_pool=get_redis_pool())
+        self.processing_key = f'{self.key}:processing:{consumer or socket.gethostname()}'
+
+    def push_many(self, messages):
+        """Добавляет сообщения в очередь одной командой"""
+        if not messages:
+            return 0
+        return self.redis.rpush(self.key, *[json.dumps(message) for message in messages])
+
+    def pop_many(self, count, timeout=1):
+        """
+        Забирает до count сообщений, ожидая первое не дольше timeout секунд.
+
+        Сообщения остаются в списке обработки до вызова ack().
+        """
+        first = self.redis.blmove(self.key, self.processing_key, timeout, 'LEFT', 'RIGHT')
+        if first is None:
+            return []
+        payloads = [first]
+        if count > 1:
+            pipeline = self.redis.pipeline(transaction=False)
+            for _ in range(count - 1):
+                pipeline.lmove(self.key, self.processing_key, 'LEFT', 'RIGHT')
+            payloads.extend(payload for payload in pipeline.execute() if payload is not None)
+        return [json.loads(payload) for payload in payloads]
+
+    def ack(self):
+        """Подтверждает обработку всех забранных сообщений"""
+        self.redis.delete(self.processing_key)
+
+    def recover(self):
+        """Возвращает в начало очереди сообщения, не подтвержденные до падения процесса"""
+        recovered = 0
+        while self.redis.lmove(self.processing_key, self.key, 'RIGHT', 'LEFT') is not None:
+            recovered += 1
+        return recovered
+
+    def __len__(self):
+        return self.redis.llen(self.key)
+
+
+_bot = None
+_bot_lock = threading.Lock()
+
+
+def get_bot():
+    """Возвращает долгоживущий экземпляр бота с пулом HTTP-соединений"""
+    global _bot
+    with _bot_lock:
+        if _bot is None:
+            _bot = Bot(
+                token=settings.TELEGRAM_BOT_TOKEN,
+                base_url=settings.TELEGRAM_API_BASE_URL,
+                request=Request(con_pool_size=settings.TELEGRAM_DELIVERY_WORKERS + 4)
+            )
+        return _bot
+
+
+class DeliveryEngine:
+    """
+    Параллельная отправка сообщений с учетом лимитов Telegram.
+
+    Каждое сообщение проходит через bucket своего чата и общий bucket бота.
+    При ответе 429 общий bucket приостанавливается на retry_after секунд,
+    а сообщение отправляется повторно. Ответ 429 не считается неудачной
+    попыткой (max_retries ограничивает только сетевые ошибки); суммарное
+    ожидание по 429 для одного сообщения ограничено max_throttle_wait.
+    """
+
+    def __init__(self, bot=None, workers=None, global_rate=None, chat_rate=None,
+                 max_retries=None, max_throttle_wait=None):
+        self.bot = bot or get_bot()
+        self.workers = workers or settings.TELEGRAM_DELIVERY_WORKERS
+        self.chat_rate = chat_rate or settings.TELEGRAM_CHAT_RATE_LIMIT
+        self.max_retries = (max_retries if max_retries is not None
+                            else settings.TELEGRAM_DELIVERY_MAX_RETRIES)
+        self.max_throttle_wait = (max_throttle_wait if max_throttle_wait is not None
+                                  else settings.TELEGRAM_DELIVERY_MAX_THROTTLE_WAIT)
+        self.global_bucket = TokenBucket(global_rate or settings.TELEGRAM_GLOBAL_RATE_LIMIT)
+        self.chat_buckets = {}
+        self.chat_buckets_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                           thread_name_prefix='telegram-delivery')
+
+    def _chat_bucket(self, chat_id):
+        with self.chat_buckets_lock:
+            bucket = self.chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, capacity=1)
+            return bucket
+
+    def _prune_chat_buckets(self):
+        """Удаляет buckets чатов, которые успели полностью восстановиться"""
+        with self.chat_buckets_lock:
+            for chat_id in [chat_id for chat_id, bucket in self.chat_buckets.items()
+                            if bucket.is_idle()]:
+                del self.chat_buckets[chat_id]
+
+    def send(self, message):
+        """Отправляет одно сообщение; возвращает True при успешной доставке"""
+        chat_id = message['chat_id']
+        attempt = 0
+        throttled = 0
+        while True:
+            self._chat_bucket(chat_id).acquire()
+            self.global_bucket.acquire()
+            try:
+                self.bot.send_message(
+                    chat_id=chat_id,
+                    text=message['text'],
+                    parse_mode=message.get('parse_mode', ParseMode.MARKDOWN)
+                )
+                return True
+            except RetryAfter as e:
+                throttled += e.retry_after
+                if throttled > self.max_throttle_wait:
+                    logger.error(
+                        f"Сообщение в чат {chat_id} не доставлено: ожидание по лимиту Telegram "
+                        f"превысило {self.max_throttle_wait} с"
+                    )
+                    return False
+                logger.warning(f"Превышен лимит Telegram, пауза {e.retry_after} с")
+                self.global_bucket.pause(e.retry_after)
+                continue
+            except (TimedOut, NetworkError) as e:
+                logger.warning(f"Сетевая ошибка при отправке в чат {chat_id}: {e}")
+                time.sleep(min(2 ** attempt, 30))
+            except TelegramError as e:
+                logger.error(f"Ошибка отправки сообщения в чат {chat_id}: {e}")
+                return False
+
+            attempt += 1
+            if attempt > self.max_retries:
+                logger.error(f"Сообщение в чат {chat_id} не доставлено после {attempt} попыток")
+                return False
+
+    def deliver(self, messages):
+        """Параллельно отправляет пачку сообщений; возвращает число доставленных"""
+        futures = [self.executor.submit(self.send, message) for message in messages]
+        wait(futures)
+        self._prune_chat_buckets()
+        return sum(1 for future in futures if future.result())
+
+    def run(self, outbox, stop_event=None, batch_size=None):
+        """Разбирает очередь исходящих сообщений до установки stop_event"""
+        batch_size = batch_size or self.workers * 8
+        recovered = outbox.recover()
+        if recovered:
+            logger.warning(f"Возвращено в очередь {recovered} неподтвержденных сообщений")
+        while not (stop_event and stop_event.is_set()):
+            messages = outbox.pop_many(batch_size)
+            if not messages:
+                continue
+            started = time.monotonic()
+            sent = self.deliver(messages)
+            outbox.ack()
+            logger.info(
+                f"Доставлено {sent} из {len(messages)} сообщений "
+                f"за {time.monotonic() - started:.2f} с"
+            )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,277 @@
+# telegram_bot/handlers.py
+"""
+Обработчики команд Telegram-бота для асинхронной среды telegram_bot.runtime.
+
+Обращения к ORM вынесены в синхронные функции, обернутые
+database_sync_to_async, и выполняются в ограниченном пуле потоков.
+"""
+from django.contrib.auth import get_user_model
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from habits.cache import get_public_habit_summaries
+from habits.models import Habit, HabitCompletion, TelegramProfile
+from habits.tasks import schedule_reminder
+from .runtime import END, Router, database_sync_to_async
+
+User = get_user_model()
+
+# Определение состояний диалога
+AUTH_STATE, HABIT_NAME, HABIT_PLACE, HABIT_ACTION, HABIT_DURATION, HABIT_TIME = range(6)
+
+AUTH_REQUIRED_MESSAGE = 'Пожалуйста, авторизуйтесь с помощью команды /start'
+
+router = Router()
+
+
+@database_sync_to_async
+def check_credentials(username, password, chat_id):
+    """Проверяет логин и пароль и привязывает чат к пользователю"""
+    user = User.objects.filter(username=username).first()
+    if user is None:
+        return None, 'Пользователь не найден. Попробуйте еще раз.'
+    if not user.check_password(password):
+        return None, 'Неверный пароль. Попробуйте еще раз.'
+
+    # Сохраняем chat_id в базу данных для постоянного хранения
+    TelegramProfile.objects.update_or_create(user=user, defaults={'chat_id': str(chat_id)})
+    return user, None
+
+
+@database_sync_to_async
+def get_user_habits(user_id):
+    return list(Habit.objects.filter(user_id=user_id))
+
+
+@database_sync_to_async
+def get_public_habits(limit=10):
+    return get_public_habit_summaries(limit)
+
+
+@database_sync_to_async
+def create_habit(user_id, name, place, action, duration, time_to_complete):
+    habit = Habit.objects.create(
+        user_id=user_id,
+        name=name,
+        place=place,
+        action=action,
+        estimated_duration=duration,
+        is_pleasant=False,
+        is_public=False,
+        periodicity=1,
+        time_to_complete=time_to_complete
+    )
+    # Планирование напоминания
+    result = schedule_reminder.delay(habit.id, minutes_before=30)
+    return habit, bool(result)
+
+
+@database_sync_to_async
+def complete_user_habit(habit_id, user_id):
+    """Отмечает выполнение привычки пользователя, возвращает привычку или None"""
+    habit = Habit.objects.filter(id=habit_id, user_id=user_id).first()
+    if habit is not None:
+        HabitCompletion.objects.create(habit=habit, user_id=user_id)
+    return habit
+
+
+# Команда /start - начало авторизации
+@router.command('start')
+async def start(update, context):
+    await context.reply('Привет! Для работы с ботом введите ваш логин и пароль через пробел.')
+    return AUTH_STATE
+
+
+@router.command('cancel')
+async def cancel(update, context):
+    return END
+
+
+# Команда /help
+@router.command('help')
+async def help_command(update, context):
+    await context.reply(
+        'Доступные команды:\n'
+        '/start - Авторизация\n'
+        '/list - Список ваших привычек\n'
+        '/create - Создать новую привычку\n'
+        '/complete - Отметить привычку выполненной\n'
+        '/public - Просмотр публичных привычек\n'
+        '/help - Помощь'
+    )
+
+
+# Функция авторизации
+@router.state(AUTH_STATE)
+async def authenticate(update, context):
+    user_input = update.message.text.split()
+    if len(user_input) != 2:
+        await context.reply('Пожалуйста, введите логин и пароль через пробел.')
+        return AUTH_STATE
+
+    username, password = user_input
+    user, error = await check_credentials(username, password, context.chat_id)
+    if user is None:
+        await context.reply(error)
+        return AUTH_STATE
+
+    context.user_data['user_id'] = user.id
+    context.user_data['username'] = user.username
+    await context.reply(
+        f'Вы успешно авторизованы, {user.username}!\n'
+        'Используйте /help для просмотра доступных команд.'
+    )
+    return END
+
+
+# Функция вывода списка привычек
+@router.command('list')
+async def list_habits(update, context):
+    if 'user_id' not in context.user_data:
+        await context.reply(AUTH_REQUIRED_MESSAGE)
+        return
+
+    habits = await get_user_habits(context.user_data['user_id'])
+    if not habits:
+        await context.reply('У вас пока нет привычек. Создайте новую с помощью команды /create')
+        return
+
+    message = "Ваши привычки:\n"
+    for i, habit in enumerate(habits, 1):
+        message += f"{i}. {habit.name} - {habit.action} в {habit.place} ({habit.estimated_duration} мин)\n"
+
+    await context.reply(message)
+
+
+# Начало создания привычки
+@router.command('create')
+async def create_habit_start(update, context):
+    if 'user_id' not in context.user_data:
+        await context.reply(AUTH_REQUIRED_MESSAGE)
+        return END
+
+    await context.reply('Введите название привычки:')
+    return HABIT_NAME
+
+
+# Получение названия привычки
+@router.state(HABIT_NAME)
+async def habit_name(update, context):
+    context.user_data['habit_name'] = update.message.text
+    await context.reply('Введите место выполнения привычки:')
+    return HABIT_PLACE
+
+
+# Получение места привычки
+@router.state(HABIT_PLACE)
+async def habit_place(update, context):
+    context.user_data['habit_place'] = update.message.text
+    await context.reply('Введите действие привычки:')
+    return HABIT_ACTION
+
+
+# Получение действия привычки
+@router.state(HABIT_ACTION)
+async def habit_action(update, context):
+    context.user_data['habit_action'] = update.message.text
+    await context.reply('Введите продолжительность в минутах:')
+    return HABIT_DURATION
+
+
+# Получение продолжительности
+@router.state(HABIT_DURATION)
+async def habit_duration(update, context):
+    try:
+        context.user_data['duration'] = int(update.message.text)
+    except ValueError:
+        await context.reply('Пожалуйста, введите число для продолжительности.')
+        return HABIT_DURATION
+
+    await context.reply('Введите время выполнения привычки (например, "9:00"):')
+    return HABIT_TIME
+
+
+@router.state(HABIT_TIME)
+async def habit_time(update, context):
+    time_to_complete = update.message.text
+
+    try:
+        habit, success = await create_habit(
+            context.user_data['user_id'],
+            context.user_data['habit_name'],
+            context.user_data['habit_place'],
+            context.user_data['habit_action'],
+            context.user_data['duration'],
+            time_to_complete
+        )
+    except Exception as e:
+        await context.reply(f'Ошибка при создании привычки: {str(e)}')
+        return END
+
+    if success:
+        await context.reply(
+            f'Привычка "{habit.name}" успешно создана! Напоминание будет отправлено за 30 минут до {time_to_complete}.'
+        )
+    else:
+        await context.reply(
+            f'Привычка "{habit.name}" успешно создана! Не удалось настроить напоминания.'
+        )
+    return END
+
+
+# Выбор привычки для отметки о выполнении
+@router.command('complete')
+async def complete_habit(update, context):
+    if 'user_id' not in context.user_data:
+        await context.reply(AUTH_REQUIRED_MESSAGE)
+        return
+
+    habits = await get_user_habits(context.user_data['user_id'])
+    if not habits:
+        await context.reply('У вас пока нет привычек.')
+        return
+
+    keyboard = [
+        [InlineKeyboardButton(habit.name, callback_data=f"complete_{habit.id}")]
+        for habit in habits
+    ]
+    await context.reply('Выберите привычку для отметки:', reply_markup=InlineKeyboardMarkup(keyboard))
+
+
+# Обработка нажатия на кнопки
+@router.callback_query
+async def button_callback(update, context):
+    query = update.callback_query
+    await context.run(query.answer)
+
+    if not query.data.startswith("complete_"):
+        return
+    if 'user_id' not in context.user_data:
+        await context.run(query.edit_message_text, text=AUTH_REQUIRED_MESSAGE)
+        return
+
+    habit_id = int(query.data.split("_")[1])
+    habit = await complete_user_habit(habit_id, context.user_data['user_id'])
+    if habit is None:
+        await context.run(query.edit_message_text, text="Привычка не найдена.")
+    else:
+        await context.run(query.edit_message_text, text=f"Привычка '{habit.name}' отмечена как выполненная!")
+
+
+# Просмотр публичных привычек
+@router.command('public')
+async def public_habits(update, context):
+    if 'user_id' not in context.user_data:
+        await context.reply(AUTH_REQUIRED_MESSAGE)
+        return
+
+    habits = await get_public_habits()
+    if not habits:
+        await context.reply('Публичных привычек пока нет.')
+        return
+
+    message = "Публичные привычки:\n"
+    for i, habit in enumerate(habits, 1):
+        message += (f"{i}. {habit['name']} - {habit['action']} в {habit['place']} "
+                    f"(автор: {habit['username']})\n")
+
+    await context.reply(message)
@@ -0,0 +1,35 @@
+# telegram_bot/management/commands/deliver_messages.py
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from telegram_bot.delivery import DeliveryEngine, Outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет сообщения из очереди доставки Telegram с учетом лимитов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Количество параллельных отправок')
+        parser.add_argument('--batch-size', type=int, help='Размер пачки, забираемой из очереди')
+        parser.add_argument(
+            '--consumer',
+            help='Имя процесса доставки для списка обработки (по умолчанию имя хоста); '
+                 'должно быть уникальным и не меняться между перезапусками'
+        )
+
+    def handle(self, *args, **kwargs):
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+        engine = DeliveryEngine(workers=kwargs['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Доставка сообщений запущена ({engine.workers} потоков)'))
+        try:
+            engine.run(Outbox(consumer=kwargs['consumer']), stop_event=stop_event,
+                       batch_size=kwargs['batch_size'])
+        finally:
+            engine.shutdown()
+        self.stdout.write(self.style.SUCCESS('Доставка сообщений остановлена'))
@@ -0,0 +1,32 @@
+# telegram_bot/management/commands/run_bot_worker.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from telegram_bot.conversations import ConversationStore
+from telegram_bot.handlers import router
+from telegram_bot.runtime import run_worker
+from telegram_bot.updates import UpdateQueue, parse_partitions
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает обновления Telegram, полученные через webhook'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--partitions',
+            help='Секции очереди, например "0-7" или "0,2,4" (по умолчанию все). '
+                 'Каждую секцию должен читать только один процесс'
+        )
+
+    def handle(self, *args, **kwargs):
+        queue = UpdateQueue()
+        try:
+            partitions = parse_partitions(kwargs['partitions'], queue.partitions)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработчик обновлений запущен (секции: {",".join(map(str, partitions))}, '
+            f'до {settings.TELEGRAM_BOT_CONCURRENCY} обновлений одновременно)'))
+        run_worker(router, queue, partitions, store=ConversationStore())
+        self.stdout.write(self.style.SUCCESS('Обработчик обновлений остановлен'))
@@ -0,0 +1,36 @@
+# telegram_bot/management/commands/set_webhook.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from telegram_bot.runtime import create_bot
+
+
+class Command(BaseCommand):
+    help = 'Регистрирует (или удаляет) webhook бота в Telegram'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', help='Адрес webhook (по умолчанию TELEGRAM_WEBHOOK_URL)')
+        parser.add_argument('--delete', action='store_true',
+                            help='Удалить webhook и вернуться к long polling')
+
+    def handle(self, *args, **kwargs):
+        bot = create_bot()
+
+        if kwargs['delete']:
+            bot.delete_webhook()
+            self.stdout.write(self.style.SUCCESS('Webhook удален'))
+            return
+
+        url = kwargs['url'] or settings.TELEGRAM_WEBHOOK_URL
+        if not url:
+            raise CommandError('Не указан адрес webhook (аргумент url или TELEGRAM_WEBHOOK_URL)')
+        if not settings.TELEGRAM_WEBHOOK_SECRET:
+            raise CommandError('Не задан TELEGRAM_WEBHOOK_SECRET')
+
+        bot.set_webhook(
+            url=url,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            max_connections=100,
+            allowed_updates=['message', 'callback_query']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Webhook установлен: {url}'))
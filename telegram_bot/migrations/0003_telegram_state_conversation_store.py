@@ -0,0 +1,51 @@
+# Generated by Django 4.2.1 on 2026-10-18 03:09
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def remove_duplicate_states(apps, schema_editor):
+    """Оставить по одному (последнему) состоянию на telegram_id перед добавлением уникальности."""
+    TelegramState = apps.get_model("telegram_bot", "TelegramState")
+    duplicates = (
+        TelegramState.objects.values("telegram_id")
+        .annotate(last_id=Max("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        TelegramState.objects.filter(telegram_id=row["telegram_id"]).exclude(
+            id=row["last_id"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("telegram_bot", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_states, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="telegramstate",
+            name="telegram_id",
+            field=models.CharField(
+                max_length=50, unique=True, verbose_name="ID в Telegram"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="telegramstate",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="telegram_states",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+    ]
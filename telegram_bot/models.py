@@ -9,9 +9,12 @@ class TelegramState(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='telegram_states',
-        verbose_name=_('Пользователь')
+        verbose_name=_('Пользователь'),
+        # Диалог начинается до авторизации, когда пользователь еще неизвестен
+        null=True,
+        blank=True
     )
-    telegram_id = models.CharField(_('ID в Telegram'), max_length=50)
+    telegram_id = models.CharField(_('ID в Telegram'), max_length=50, unique=True)
     state = models.CharField(_('Состояние диалога'), max_length=100, default='start')
     context = models.JSONField(_('Контекст диалога'), default=dict, blank=True)
     updated_at = models.DateTimeField(_('Обновлено'), auto_now=True)
@@ -21,7 +24,7 @@ class TelegramState(models.Model):
         verbose_name_plural = _('Состояния в Telegram')
 
     def __str__(self):
-        return f"{self.user.username} - {self.state}"
+        return f"{self.user.username if self.user else self.telegram_id} - {self.state}"
 
 
 class NotificationLog(models.Model):
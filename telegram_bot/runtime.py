@@ -0,0 +1,329 @@
+# telegram_bot/runtime.py
+"""
+Асинхронная среда выполнения Telegram-бота.
+
+Обновления обрабатываются корутинами в одном цикле asyncio вместо потоков
+диспетчера Updater. Блокирующие вызовы выносятся в ограниченные пулы потоков:
+запросы к Bot API (python-telegram-bot 13 синхронный) - в пул ввода-вывода,
+работа с ORM - в пул базы данных, размер которого ограничивает число
+соединений с БД. Обновления одного чата обрабатываются строго по очереди,
+разные чаты - параллельно.
+"""
+import asyncio
+import functools
+import logging
+import signal
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from redis.exceptions import RedisError
+from telegram import Bot, Update
+from telegram.error import NetworkError, RetryAfter, TimedOut
+from telegram.ext import ConversationHandler
+from telegram.utils.request import Request
+
+logger = logging.getLogger(__name__)
+
+# Значение, которое обработчик возвращает для завершения диалога
+END = ConversationHandler.END
+
+_db_executor = None
+
+
+def get_db_executor():
+    """Пул потоков для работы с ORM (один поток - одно соединение с БД)"""
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(
+            max_workers=settings.TELEGRAM_BOT_DB_WORKERS,
+            thread_name_prefix='bot-db'
+        )
+    return _db_executor
+
+
+def configure_db_connections():
+    """
+    Включает постоянные соединения с БД для процесса бота.
+
+    Потоки пула ORM живут все время работы процесса, поэтому каждый держит
+    свое соединение до TELEGRAM_BOT_DB_CONN_MAX_AGE секунд, а перед
+    повторным использованием соединение проверяется (CONN_HEALTH_CHECKS).
+    """
+    for alias in connections:
+        connections.settings[alias].update(
+            CONN_MAX_AGE=settings.TELEGRAM_BOT_DB_CONN_MAX_AGE,
+            CONN_HEALTH_CHECKS=True
+        )
+
+
+def database_sync_to_async(func):
+    """
+    Декоратор: превращает синхронную функцию с запросами к ORM в корутину,
+    выполняемую в пуле get_db_executor().
+
+    close_old_connections закрывает только устаревшие и сломанные
+    соединения, рабочее соединение потока переиспользуется следующим вызовом.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_db_executor(), functools.partial(run, *args, **kwargs))
+
+    return wrapper
+
+
+class LocalConversationStore:
+    """
+    Хранилище состояния диалогов в памяти процесса.
+
+    Для работы нескольких процессов используется conversations.ConversationStore.
+    """
+
+    def __init__(self):
+        self.conversations = {}
+
+    async def load(self, chat_id):
+        conversation = self.conversations.get(chat_id)
+        if conversation is None:
+            conversation = {'state': None, 'user_data': {}}
+        return conversation
+
+    async def save(self, chat_id, conversation):
+        self.conversations[chat_id] = conversation
+
+    async def close(self):
+        pass
+
+
+class Router:
+    """
+    Маршрутизация обновлений по обработчикам.
+
+    Команды обрабатываются в любом состоянии диалога, обычный текст - обработчиком
+    текущего состояния. Обработчик может вернуть новое состояние, END для
+    завершения диалога или None, чтобы оставить состояние без изменений.
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.states = {}
+        self.callback_handler = None
+
+    def command(self, name):
+        def decorator(handler):
+            self.commands[name] = handler
+            return handler
+        return decorator
+
+    def state(self, state):
+        def decorator(handler):
+            self.states[state] = handler
+            return handler
+        return decorator
+
+    def callback_query(self, handler):
+        self.callback_handler = handler
+        return handler
+
+    def resolve(self, update, state):
+        """Возвращает обработчик обновления или None"""
+        if update.callback_query:
+            return self.callback_handler
+        message = update.message
+        if not message or not message.text:
+            return None
+        if message.text.startswith('/'):
+            name = message.text[1:].split(maxsplit=1)[0].split('@')[0] if len(message.text) > 1 else ''
+            return self.commands.get(name)
+        return self.states.get(state)
+
+    async def dispatch(self, update, context):
+        handler = self.resolve(update, context.state)
+        if handler is None:
+            return
+        result = await handler(update, context)
+        if result == END:
+            context.state = None
+        elif result is not None:
+            context.state = result
+
+
+class ChatContext:
+    """Контекст обработки обновления: состояние диалога чата и доступ к Bot API"""
+
+    def __init__(self, runtime, chat_id, conversation):
+        self.runtime = runtime
+        self.bot = runtime.bot
+        self.chat_id = chat_id
+        self.state = conversation['state']
+        self.user_data = conversation['user_data']
+
+    def to_conversation(self):
+        return {'state': self.state, 'user_data': self.user_data}
+
+    async def run(self, func, *args, **kwargs):
+        """Выполняет блокирующий вызов Bot API в пуле ввода-вывода"""
+        return await self.runtime.run_io(func, *args, **kwargs)
+
+    async def reply(self, text, **kwargs):
+        """Отправляет сообщение в текущий чат"""
+        return await self.run(self.bot.send_message, chat_id=self.chat_id, text=text, **kwargs)
+
+
+class BotRuntime:
+    """
+    Цикл обработки обновлений на asyncio.
+
+    concurrency ограничивает число одновременно обрабатываемых обновлений,
+    max_pending - число обновлений, принятых в работу, но еще не обработанных;
+    при его превышении новые обновления не запрашиваются.
+    """
+
+    def __init__(self, bot, router, store=None, concurrency=None, io_workers=None,
+                 max_pending=None, poll_timeout=None):
+        self.bot = bot
+        self.router = router
+        self.store = store or LocalConversationStore()
+        self.concurrency = concurrency or settings.TELEGRAM_BOT_CONCURRENCY
+        self.max_pending = max_pending or self.concurrency * 4
+        self.poll_timeout = poll_timeout if poll_timeout is not None else settings.TELEGRAM_BOT_POLL_TIMEOUT
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=io_workers or settings.TELEGRAM_BOT_IO_WORKERS,
+            thread_name_prefix='bot-io'
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.chat_locks = weakref.WeakValueDictionary()
+        self.tasks = set()
+
+    async def run_io(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, functools.partial(func, *args, **kwargs))
+
+    def get_chat_lock(self, chat_id):
+        lock = self.chat_locks.get(chat_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.chat_locks[chat_id] = lock
+        return lock
+
+    async def process_update(self, update):
+        """Обрабатывает одно обновление с учетом очередности внутри чата"""
+        chat = update.effective_chat
+        if chat is None:
+            return
+        async with self.get_chat_lock(chat.id):
+            async with self.semaphore:
+                try:
+                    conversation = await self.store.load(chat.id)
+                    context = ChatContext(self, chat.id, conversation)
+                    await self.router.dispatch(update, context)
+                    await self.store.save(chat.id, context.to_conversation())
+                except Exception:
+                    logger.exception(f"Ошибка при обработке обновления {update.update_id}")
+
+    def submit(self, update):
+        """Ставит обновление в обработку, не дожидаясь ее завершения"""
+        task = asyncio.create_task(self.process_update(update))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def wait_for_capacity(self):
+        while len(self.tasks) >= self.max_pending:
+            await asyncio.wait(self.tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    async def poll(self, stop_event):
+        """Получает обновления через getUpdates, пока не установлен stop_event"""
+        offset = None
+        while not stop_event.is_set():
+            await self.wait_for_capacity()
+            try:
+                updates = await self.run_io(
+                    self.bot.get_updates,
+                    offset=offset,
+                    timeout=self.poll_timeout,
+                    read_latency=5
+                )
+            except RetryAfter as e:
+                await asyncio.sleep(e.retry_after)
+                continue
+            except TimedOut:
+                continue
+            except NetworkError as e:
+                logger.warning(f"Ошибка сети при получении обновлений: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for update in updates:
+                offset = update.update_id + 1
+                self.submit(update)
+
+    async def consume(self, queue, partitions, stop_event):
+        """Обрабатывает обновления из секций очереди webhook, пока не установлен stop_event"""
+        while not stop_event.is_set():
+            await self.wait_for_capacity()
+            try:
+                data = await queue.pop(partitions, timeout=1)
+            except RedisError as e:
+                logger.warning(f"Ошибка соединения с очередью обновлений: {e}")
+                await asyncio.sleep(1)
+                continue
+            if data is not None:
+                self.submit(Update.de_json(data, self.bot))
+
+    async def shutdown(self):
+        """Дожидается обработки принятых обновлений, сохраняет диалоги и останавливает пулы"""
+        if self.tasks:
+            await asyncio.wait(self.tasks)
+        await self.store.close()
+        self.io_executor.shutdown(wait=True)
+
+
+def create_bot(token=None):
+    """Бот с пулом HTTP-соединений под размер пула ввода-вывода"""
+    return Bot(
+        token=token or settings.TELEGRAM_BOT_TOKEN,
+        base_url=settings.TELEGRAM_API_BASE_URL,
+        request=Request(con_pool_size=settings.TELEGRAM_BOT_IO_WORKERS + 1)
+    )
+
+
+def _run(router, serve, token=None, store=None):
+    configure_db_connections()
+
+    async def main():
+        runtime = BotRuntime(create_bot(token), router, store=store)
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+        try:
+            await serve(runtime, stop_event)
+        finally:
+            await runtime.shutdown()
+
+    asyncio.run(main())
+
+
+def run_polling(router, token=None, store=None):
+    """Запускает бота в режиме long polling до получения SIGINT/SIGTERM"""
+    _run(router, lambda runtime, stop_event: runtime.poll(stop_event), token=token, store=store)
+
+
+def run_worker(router, queue, partitions, token=None, store=None):
+    """Обрабатывает обновления из очереди webhook до получения SIGINT/SIGTERM"""
+    _run(
+        router,
+        lambda runtime, stop_event: runtime.consume(queue, partitions, stop_event),
+        token=token,
+        store=store
+    )
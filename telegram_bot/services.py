@@ -0,0 +1,52 @@
+# telegram_bot/services.py
+from django.conf import settings
+from django.core.cache import cache
+
+from habits.models import TelegramProfile
+
+# Значение в кэше для пользователей без привязанного Telegram
+NO_CHAT_ID = ''
+
+
+class ChatIdService:
+    """Определение chat_id Telegram по ID пользователя с кэшированием в Redis."""
+
+    key_prefix = 'telegram_chat_id'
+
+    def __init__(self):
+        self.timeout = settings.TELEGRAM_CHAT_ID_CACHE_TIMEOUT
+
+    def get_cache_key(self, user_id):
+        return f"{self.key_prefix}:{user_id}"
+
+    def get_chat_id(self, user_id):
+        """Возвращает chat_id пользователя или None, если Telegram не привязан"""
+        return self.get_chat_ids([user_id]).get(user_id)
+
+    def get_chat_ids(self, user_ids):
+        """
+        Возвращает словарь {user_id: chat_id} для пользователей с привязанным Telegram.
+
+        Недостающие в кэше значения загружаются из TelegramProfile одним запросом.
+        """
+        keys = {self.get_cache_key(user_id): user_id for user_id in user_ids}
+        cached = cache.get_many(keys.keys())
+        chat_ids = {keys[key]: chat_id for key, chat_id in cached.items()}
+
+        missing = [user_id for key, user_id in keys.items() if key not in cached]
+        if missing:
+            loaded = dict(
+                TelegramProfile.objects.filter(user_id__in=missing).values_list('user_id', 'chat_id')
+            )
+            cache.set_many(
+                {self.get_cache_key(user_id): loaded.get(user_id, NO_CHAT_ID) for user_id in missing},
+                self.timeout
+            )
+            chat_ids.update(loaded)
+
+        return {user_id: chat_id for user_id, chat_id in chat_ids.items() if chat_id != NO_CHAT_ID}
+
+    def invalidate(self, user_id):
+        """Удаляет закэшированный chat_id пользователя"""
+        cache.delete(self.get_cache_key(user_id))
+        return True
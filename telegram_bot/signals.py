@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from habits.models import TelegramProfile
+from .services import ChatIdService
+
+
+@receiver(post_save, sender=TelegramProfile)
+@receiver(post_delete, sender=TelegramProfile)
+def invalidate_chat_id(sender, instance, **kwargs):
+    """Сбросить закэшированный chat_id при изменении профиля Telegram."""
+    ChatIdService().invalidate(instance.user_id)
@@ -0,0 +1,124 @@
+# telegram_bot/updates.py
+"""
+Очередь входящих обновлений Telegram для режима webhook.
+
+Webhook складывает обновления в списки Redis, разбитые на секции по chat_id.
+Каждый обработчик (команда run_bot_worker) читает свою часть секций, поэтому
+обновления одного чата всегда обрабатываются одним процессом и по порядку,
+а число процессов можно наращивать на любом количестве машин.
+"""
+import asyncio
+import json
+import threading
+import weakref
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+_clients = weakref.WeakKeyDictionary()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_sync_redis():
+    """
+    Синхронный клиент Redis для постановки обновлений в очередь из webhook.
+
+    Пул соединений общий для процесса: под WSGI запросы не привязаны
+    к циклу событий, поэтому клиент не создается заново на каждый запрос.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = redis.ConnectionPool.from_url(settings.TELEGRAM_UPDATES_REDIS_URL)
+    return redis.Redis(connection_pool=_pool)
+
+
+def get_redis():
+    """
+    Асинхронный клиент Redis для текущего цикла событий (процессы run_bot_worker).
+
+    Соединения redis.asyncio привязаны к циклу, поэтому клиент создается
+    для каждого цикла; у обработчика цикл один на все время работы.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(settings.TELEGRAM_UPDATES_REDIS_URL)
+        _clients[loop] = client
+    return client
+
+
+def get_update_chat_id(update):
+    """chat_id обновления (словаря из Bot API) или None"""
+    for key in ('message', 'edited_message', 'channel_post', 'edited_channel_post'):
+        if key in update:
+            return update[key].get('chat', {}).get('id')
+    callback_query = update.get('callback_query')
+    if callback_query:
+        message = callback_query.get('message')
+        if message:
+            return message.get('chat', {}).get('id')
+        return callback_query.get('from', {}).get('id')
+    for value in update.values():
+        if isinstance(value, dict) and 'from' in value:
+            return value['from'].get('id')
+    return None
+
+
+def parse_partitions(value, total):
+    """
+    Разбирает список секций вида "0-3,7" (номера от 0 до total - 1).
+
+    Пустое значение означает все секции.
+    """
+    if not value:
+        return list(range(total))
+    partitions = set()
+    for part in value.split(','):
+        start, _, end = part.partition('-')
+        partitions.update(range(int(start), int(end or start) + 1))
+    invalid = [partition for partition in partitions if not 0 <= partition < total]
+    if invalid:
+        raise ValueError(f"Секции вне диапазона 0..{total - 1}: {invalid}")
+    return sorted(partitions)
+
+
+class UpdateQueue:
+    """Очередь обновлений в Redis, разбитая на секции по chat_id"""
+
+    key_prefix = 'telegram:updates'
+
+    def __init__(self, redis_client=None, partitions=None, sync_redis_client=None):
+        self.redis = redis_client
+        self.sync_redis = sync_redis_client
+        self.partitions = partitions or settings.TELEGRAM_UPDATE_PARTITIONS
+
+    def get_redis(self):
+        return self.redis or get_redis()
+
+    def get_sync_redis(self):
+        return self.sync_redis or get_sync_redis()
+
+    def get_partition(self, update):
+        chat_id = get_update_chat_id(update)
+        if chat_id is None:
+            chat_id = update.get('update_id', 0)
+        return int(chat_id) % self.partitions
+
+    def get_key(self, partition):
+        return f'{self.key_prefix}:{partition}'
+
+    def push(self, update, payload=None):
+        """Добавляет обновление в секцию его чата; payload - исходное тело запроса"""
+        key = self.get_key(self.get_partition(update))
+        return self.get_sync_redis().rpush(key, payload or json.dumps(update))
+
+    async def pop(self, partitions, timeout=1):
+        """Забирает следующее обновление из указанных секций или None по таймауту"""
+        item = await self.get_redis().blpop([self.get_key(partition) for partition in partitions],
+                                            timeout=timeout)
+        if item is None:
+            return None
+        return json.loads(item[1])
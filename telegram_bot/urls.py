@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TelegramStateViewSet, NotificationLogViewSet, send_test_notification
+from .views import TelegramStateViewSet, NotificationLogViewSet, send_test_notification, \
+    telegram_webhook
 
 router = DefaultRouter()
 router.register(r'states', TelegramStateViewSet)
@@ -9,4 +10,5 @@ router.register(r'logs', NotificationLogViewSet, basename='notification-log')
 urlpatterns = [
     path('', include(router.urls)),
     path('test-notification/', send_test_notification, name='test-notification'),
+    path('webhook/', telegram_webhook, name='telegram-webhook'),
 ]
\ No newline at end of file
@@ -1,11 +1,18 @@
+import hmac
+import json
 import logging
 
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, \
+    HttpResponseNotAllowed
+from redis.exceptions import RedisError
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 from .models import TelegramState, NotificationLog
 from .serializers import TelegramStateSerializer, NotificationLogSerializer
+from .updates import UpdateQueue
 
 logger = logging.getLogger(__name__)
 
@@ -102,4 +109,41 @@ def send_test_notification(request):
         return Response(
             {"error": f"Ошибка при отправке: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+def telegram_webhook(request):
+    """
+    Прием обновлений Telegram в режиме webhook.
+
+    Запрос проверяется по заголовку X-Telegram-Bot-Api-Secret-Token, после чего
+    обновление без обработки ставится в очередь (см. telegram_bot.updates),
+    которую разбирают процессы run_bot_worker. Представление синхронное:
+    под WSGI ему не нужен отдельный цикл событий и клиент Redis на каждый запрос.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    secret = settings.TELEGRAM_WEBHOOK_SECRET
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    if not secret or not hmac.compare_digest(token.encode(), secret.encode()):
+        return HttpResponseForbidden()
+
+    try:
+        update = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+    if not isinstance(update, dict) or 'update_id' not in update:
+        return HttpResponseBadRequest()
+
+    try:
+        UpdateQueue().push(update, payload=request.body)
+    except RedisError as e:
+        # Telegram повторит доставку обновления, если ответ не 2xx
+        logger.error(f"Не удалось поставить обновление {update['update_id']} в очередь: {e}")
+        return HttpResponse(status=503)
+    return HttpResponse()
+
+
+# CSRF-защита не нужна: запрос подписан секретным токеном webhook
+telegram_webhook.csrf_exempt = True
@@ -1,12 +1,79 @@
 # token_management/api_client.py
+"""
+Клиент API с пулом keep-alive соединений.
+
+Все клиенты процесса используют одну сессию requests, поэтому TCP-соединения
+переиспользуются между запросами. Если API_BASE_URL указывает на этот же сервер,
+запросы выполняются внутри процесса (см. token_management.dispatch).
+AsyncAPIClient выполняет те же запросы из asyncio, распределяя их по
+ограниченному пулу потоков.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .dispatch import LocalDispatcher, is_local_url
 from .services import TokenService
 
+SUPPORTED_METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+_session = None
+_client = None
+_lock = threading.Lock()
+
+
+def create_session(pool_size=None, retries=None):
+    """Сессия с пулом соединений и повтором идемпотентных запросов"""
+    pool_size = pool_size or settings.API_CLIENT_POOL_SIZE
+    retry = Retry(
+        total=settings.API_CLIENT_RETRIES if retries is None else retries,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'PUT', 'DELETE', 'HEAD', 'OPTIONS'}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Общая для процесса сессия requests"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def get_api_client():
+    """Общий для процесса экземпляр APIClient"""
+    global _client
+    if _client is None:
+        client = APIClient()
+        with _lock:
+            if _client is None:
+                _client = client
+    return _client
+
 
 class APIClient:
-    def __init__(self):
-        self.token_service = TokenService()
+    def __init__(self, session=None, token_service=None, timeout=None):
+        self.session = session or get_session()
+        self.token_service = token_service or TokenService()
+        self.timeout = timeout or (settings.API_CLIENT_CONNECT_TIMEOUT, settings.API_CLIENT_TIMEOUT)
+        # Запросы к этому же серверу выполняются внутри процесса
+        self.dispatcher = None
+        if is_local_url(settings.API_BASE_URL):
+            self.dispatcher = LocalDispatcher(settings.API_BASE_URL)
 
     def get_headers(self, user_id):
         """Получает заголовки с токеном авторизации"""
@@ -17,18 +84,56 @@ class APIClient:
 
     def make_request(self, user_id, method, endpoint, data=None):
         """Выполняет запрос к API с токеном авторизации"""
+        method = method.lower()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError("Неподдерживаемый метод запроса")
+
         headers = self.get_headers(user_id)
+        json_data = data if method in ('post', 'put', 'patch') else None
+        if self.dispatcher is not None:
+            return self.dispatcher.request(method, endpoint, headers=headers, data=json_data)
+
         url = f"{settings.API_BASE_URL}{endpoint}"
+        return self.session.request(method, url, headers=headers, json=json_data,
+                                    timeout=self.timeout)
 
-        if method.lower() == "get":
-            response = requests.get(url, headers=headers)
-        elif method.lower() == "post":
-            response = requests.post(url, headers=headers, json=data)
-        elif method.lower() == "put":
-            response = requests.put(url, headers=headers, json=data)
-        elif method.lower() == "delete":
-            response = requests.delete(url, headers=headers)
-        else:
-            raise ValueError("Неподдерживаемый метод запроса")
 
-        return response
\ No newline at end of file
+class AsyncAPIClient:
+    """
+    Асинхронный вариант APIClient.
+
+    Запросы выполняются синхронным клиентом в пуле потоков размером с пул
+    соединений, поэтому одновременно открыто не больше pool_size соединений.
+    """
+
+    def __init__(self, client=None, max_workers=None):
+        self.client = client or get_api_client()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.API_CLIENT_POOL_SIZE,
+            thread_name_prefix='api-client'
+        )
+
+    async def make_request(self, user_id, method, endpoint, data=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(self.client.make_request, user_id, method, endpoint, data)
+        )
+
+    async def gather(self, calls):
+        """
+        Выполняет несколько запросов одновременно.
+
+        calls - последовательность кортежей (user_id, method, endpoint[, data]),
+        ответы возвращаются в том же порядке.
+        """
+        return await asyncio.gather(*(self.make_request(*call) for call in calls))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
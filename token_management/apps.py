@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TokenManagementConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "token_management"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,169 @@
+# token_management/authentication.py
+"""
+Аутентификация по JWT с кэшированием проверенных токенов.
+
+Проверенные токены хранятся в ограниченном LRU-кэше процесса (ключ - SHA-256
+токена) до истечения exp, поэтому подпись повторно не проверяется.
+Пользователь и отметка об отзыве токенов читаются из кэша Django одним
+запросом вместо обращения к БД. Отзыв через TokenService.delete_user_tokens
+записывает отметку в общий кэш и действует сразу во всех процессах.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .tokens import is_issued_before
+
+
+class TokenCache:
+    """Потокобезопасный LRU-кэш проверенных токенов с учетом срока действия"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, token, expires_at):
+        with self.lock:
+            self.entries[key] = (token, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def evict_user(self, user_id):
+        """Удаляет из кэша все токены пользователя"""
+        with self.lock:
+            keys = [
+                key for key, (token, expires_at) in self.entries.items()
+                if str(token.get(api_settings.USER_ID_CLAIM)) == str(user_id)
+            ]
+            for key in keys:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(settings.JWT_AUTH_CACHE_SIZE)
+
+
+def get_user_cache_key(user_id):
+    return f'jwt_auth_user:{user_id}'
+
+
+def get_revoked_cache_key(user_id):
+    return f'jwt_auth_revoked:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """
+    Отзывает все выданные пользователю токены.
+
+    Токены, выпущенные до отзыва, отклоняются; момент отзыва сравнивается
+    с точным временем выпуска токена (см. token_management.tokens), поэтому
+    токены, полученные сразу после отзыва, действуют. Отметка хранится
+    в общем кэше в течение срока жизни access-токена.
+    """
+    cache.set(
+        get_revoked_cache_key(user_id),
+        time.time(),
+        int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    )
+    cache.delete(get_user_cache_key(user_id))
+    token_cache.evict_user(user_id)
+
+
+def invalidate_cached_user(user_id):
+    """Сбрасывает закэшированного пользователя (при изменении учетной записи)"""
+    cache.delete(get_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication с кэшем проверенных токенов и пользователей.
+
+    В общем кэше пользователь хранится без хэша пароля: значения остальных
+    полей и md5 хэша для проверки CHECK_REVOKE_TOKEN. Восстановленный из кэша
+    объект загружает пароль из БД только при обращении к нему.
+    """
+
+    @staticmethod
+    def get_cache_entry(user):
+        return {
+            'db': user._state.db,
+            'fields': {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields if field.name != 'password'
+            },
+            'password_md5': get_md5_hash_password(user.password),
+        }
+
+    def user_from_cache_entry(self, entry):
+        fields = entry['fields']
+        # Пропущенный пароль становится отложенным полем: save() его не перезапишет
+        return self.user_model.from_db(entry['db'], list(fields), list(fields.values()))
+
+    def get_validated_token(self, raw_token):
+        key = hashlib.sha256(raw_token).hexdigest()
+        validated_token = token_cache.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.set(key, validated_token, validated_token['exp'])
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user_key = get_user_cache_key(user_id)
+        revoked_key = get_revoked_cache_key(user_id)
+        cached = cache.get_many([user_key, revoked_key])
+
+        revoked_at = cached.get(revoked_key)
+        if revoked_at is not None and is_issued_before(validated_token, revoked_at):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        entry = cached.get(user_key)
+        if entry is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = self.get_cache_entry(user)
+            cache.set(user_key, entry, settings.JWT_AUTH_USER_CACHE_TIMEOUT)
+        else:
+            user = self.user_from_cache_entry(entry)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['password_md5']:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
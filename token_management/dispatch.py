@@ -0,0 +1,89 @@
+# token_management/dispatch.py
+"""
+Вызов API внутри процесса без HTTP.
+
+Если API_BASE_URL указывает на этот же сервер, APIClient не отправляет HTTP-запрос
+самому себе, а вызывает view напрямую: запрос проходит ту же аутентификацию
+по JWT, проверку прав и сериализацию, но не занимает второй рабочий процесс.
+"""
+import io
+import json
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+def is_local_url(url):
+    """True, если адрес указывает на этот же сервер и вызов внутри процесса разрешен"""
+    if not settings.API_CLIENT_LOCAL_DISPATCH:
+        return False
+    hostname = urlsplit(url).hostname
+    return hostname is None or hostname in LOCAL_HOSTS
+
+
+class LocalResponse:
+    """Ответ внутреннего вызова с интерфейсом requests.Response"""
+
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class LocalDispatcher:
+    """Выполняет запросы к URL проекта вызовом соответствующего view"""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.base_path = parts.path.rstrip('/')
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.netloc or 'localhost'
+
+    def build_request(self, method, path, query, headers, body):
+        environ = {
+            'REQUEST_METHOD': method.upper(),
+            'SCRIPT_NAME': '',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host.rsplit(':', 1)[0],
+            'SERVER_PORT': '443' if self.scheme == 'https' else '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.host,
+            'wsgi.url_scheme': self.scheme,
+            'wsgi.input': io.BytesIO(body),
+            'CONTENT_LENGTH': str(len(body)),
+            'CONTENT_TYPE': 'application/json',
+            'HTTP_ACCEPT': 'application/json',
+        }
+        for name, value in headers.items():
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+        return WSGIRequest(environ)
+
+    def request(self, method, endpoint, headers=None, data=None):
+        path, _, query = f"{self.base_path}{endpoint}".partition('?')
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return LocalResponse(404, json.dumps({'detail': 'Not found.'}).encode())
+
+        body = json.dumps(data).encode() if data is not None else b''
+        request = self.build_request(method, path, query, headers or {}, body)
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        return LocalResponse(response.status_code, response.content, dict(response.items()))
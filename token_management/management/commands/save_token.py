@@ -1,17 +1,92 @@
 # token_management/management/commands/save_token.py
+import csv
 import json
-from django.core.management.base import BaseCommand
-from token_management.services import TokenService
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import jwt
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from token_management.services import TokenService, get_token_ttl
+
+TOKEN_TYPES = ('access', 'refresh')
+
+
+def read_rows(path, file_format):
+    """
+    Построчно читает файл JSONL или CSV с полями user_id, access, refresh.
+
+    Вместо некорректной строки JSONL возвращается None: prepare_entries
+    учтет ее как ошибочную, а загрузка продолжится.
+    """
+    with open(path, 'r', newline='') as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        yield None
+
+
+def prepare_entries(rows):
+    """
+    Рассчитывает время жизни токенов пачки строк (выполняется в пуле процессов).
+
+    Возвращает записи для TokenService.store_token_entries и число ошибочных строк.
+    """
+    entries = []
+    errors = 0
+    for row in rows:
+        try:
+            user_id = int(row['user_id'])
+            prepared = [
+                (user_id, token_type, row[token_type], get_token_ttl(row[token_type]))
+                for token_type in TOKEN_TYPES
+                if row.get(token_type)
+            ]
+        except (KeyError, TypeError, ValueError, jwt.InvalidTokenError):
+            errors += 1
+            continue
+        entries.extend(prepared)
+    return entries, errors
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class Command(BaseCommand):
-    help = 'Сохраняет JWT токен для пользователя'
+    help = 'Сохраняет JWT токен для пользователя или загружает токены многих пользователей из файла'
 
     def add_arguments(self, parser):
-        parser.add_argument('user_id', type=int, help='ID пользователя')
-        parser.add_argument('token_file', type=str, help='Путь к файлу с токеном')
+        parser.add_argument('user_id', type=int, nargs='?', help='ID пользователя')
+        parser.add_argument('token_file', type=str, nargs='?', help='Путь к файлу с токеном')
+        parser.add_argument('--bulk', metavar='PATH',
+                            help='Файл JSONL или CSV со строками (user_id, access, refresh)')
+        parser.add_argument('--format', dest='file_format', choices=('jsonl', 'csv'),
+                            help='Формат файла --bulk (по умолчанию по расширению)')
+        parser.add_argument('--batch-size', type=int,
+                            help='Строк в одной пачке (по умолчанию TOKEN_PIPELINE_BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Процессов для разбора токенов (0 - без пула)')
 
     def handle(self, *args, **kwargs):
+        if kwargs['bulk']:
+            return self.handle_bulk(kwargs)
+        if kwargs['user_id'] is None or not kwargs['token_file']:
+            raise CommandError('Укажите user_id и token_file или --bulk')
+
         user_id = kwargs['user_id']
         token_file = kwargs['token_file']
 
@@ -32,4 +107,53 @@ class Command(BaseCommand):
                     self.style.SUCCESS(f'Refresh токен сохранен для пользователя {user_id}'))
 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Ошибка сохранения токена: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Ошибка сохранения токена: {str(e)}'))
+
+    def handle_bulk(self, options):
+        """
+        Потоковая загрузка токенов.
+
+        Файл читается пачками; время жизни токенов рассчитывается в пуле процессов,
+        а готовые пачки записываются в Redis конвейером. В обработке одновременно
+        находится не больше двух пачек на процесс.
+        """
+        path = options['bulk']
+        file_format = options['file_format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        batch_size = options['batch_size'] or settings.TOKEN_PIPELINE_BATCH_SIZE
+        workers = options['workers'] or 0
+
+        token_service = TokenService()
+        chunks = chunked(read_rows(path, file_format), batch_size)
+        started = reported = time.monotonic()
+        stored = errors = 0
+
+        def store(result):
+            nonlocal stored, errors, reported
+            entries, chunk_errors = result
+            stored += token_service.store_token_entries(entries)
+            errors += chunk_errors
+            now = time.monotonic()
+            if now - reported >= 1:
+                reported = now
+                self.stdout.write(f'Сохранено токенов: {stored} ({stored / (now - started):.0f}/с)')
+
+        try:
+            if workers:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(executor.submit(prepare_entries, chunk))
+                        if len(pending) >= workers * 2:
+                            store(pending.popleft().result())
+                    while pending:
+                        store(pending.popleft().result())
+            else:
+                for chunk in chunks:
+                    store(prepare_entries(chunk))
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Ошибка чтения файла {path}: {e}')
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено токенов: {stored} за {elapsed:.1f} с ({stored / elapsed:.0f}/с), '
+            f'пропущено строк с ошибками: {errors}'))
@@ -0,0 +1,10 @@
+# token_management/serializers.py
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
+
+from .tokens import RefreshToken
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """Выдача пары токенов с точным временем выпуска (см. token_management.tokens)"""
+
+    token_class = RefreshToken
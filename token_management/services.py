@@ -1,39 +1,100 @@
 # token_management/services.py
+import threading
+
 import jwt
 import redis
 from django.conf import settings
-from datetime import datetime, timedelta
+from datetime import datetime
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_redis_pool():
+    """Общий для процесса пул соединений с базой Redis для токенов"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = redis.ConnectionPool.from_url(
+                settings.TOKEN_REDIS_URL,
+                max_connections=settings.TOKEN_REDIS_MAX_CONNECTIONS
+            )
+        return _pool
+
+
+def get_token_ttl(token):
+    """Время жизни токена в секундах (по полю exp, без проверки подписи)"""
+    decoded = jwt.decode(token, options={"verify_signature": False})
+    exp_timestamp = decoded.get("exp", 0)
+    current_timestamp = datetime.now().timestamp()
+    return max(1, int(exp_timestamp - current_timestamp))
 
 
 class TokenService:
-    def __init__(self):
-        self.redis = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+    def __init__(self, redis_client=None):
+        self.redis = redis_client or redis.Redis(connection_pool=get_redis_pool())
+
+    @staticmethod
+    def get_key(user_id, token_type="access"):
+        return f"{token_type}_token:{user_id}"
 
     def store_user_token(self, user_id, token, token_type="access"):
         """Сохраняет токен в Redis"""
-        # Декодирование токена для получения срока действия
-        decoded = jwt.decode(token, options={"verify_signature": False})
-        exp_timestamp = decoded.get("exp", 0)
+        # Сохраняем токен с временем жизни, равным сроку его действия
+        self.redis.setex(self.get_key(user_id, token_type), get_token_ttl(token), token)
+        return True
 
-        # Рассчитываем время жизни токена в секундах
-        current_timestamp = datetime.now().timestamp()
-        ttl = max(1, int(exp_timestamp - current_timestamp))
+    def store_user_tokens(self, tokens, token_type="access"):
+        """
+        Сохраняет токены многих пользователей.
 
-        # Сохраняем токен с установленным временем жизни
-        key = f"{token_type}_token:{user_id}"
-        self.redis.setex(key, ttl, token)
-        return True
+        tokens - словарь {user_id: token} или последовательность пар (user_id, token).
+        """
+        items = tokens.items() if isinstance(tokens, dict) else tokens
+        return self.store_token_entries(
+            (user_id, token_type, token, get_token_ttl(token)) for user_id, token in items
+        )
+
+    def store_token_entries(self, entries):
+        """
+        Сохраняет записи (user_id, token_type, token, ttl) с уже рассчитанным временем жизни.
+
+        Команды отправляются конвейером пачками по TOKEN_PIPELINE_BATCH_SIZE.
+        """
+        count = 0
+        pipeline = self.redis.pipeline(transaction=False)
+        for user_id, token_type, token, ttl in entries:
+            pipeline.setex(self.get_key(user_id, token_type), ttl, token)
+            count += 1
+            if count % settings.TOKEN_PIPELINE_BATCH_SIZE == 0:
+                pipeline.execute()
+        if count % settings.TOKEN_PIPELINE_BATCH_SIZE:
+            pipeline.execute()
+        return count
 
     def get_user_token(self, user_id, token_type="access"):
         """Получает токен пользователя из Redis"""
-        key = f"{token_type}_token:{user_id}"
-        token = self.redis.get(key)
+        token = self.redis.get(self.get_key(user_id, token_type))
         if token:
             return token.decode('utf-8')
         return None
 
+    def get_user_tokens(self, user_ids, token_type="access"):
+        """Получает токены многих пользователей: {user_id: token или None}"""
+        user_ids = list(user_ids)
+        result = {}
+        batch_size = settings.TOKEN_PIPELINE_BATCH_SIZE
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            values = self.redis.mget([self.get_key(user_id, token_type) for user_id in batch])
+            for user_id, token in zip(batch, values):
+                result[user_id] = token.decode('utf-8') if token else None
+        return result
+
     def delete_user_tokens(self, user_id):
-        """Удаляет все токены пользователя"""
-        self.redis.delete(f"access_token:{user_id}")
-        self.redis.delete(f"refresh_token:{user_id}")
-        return True
\ No newline at end of file
+        """Удаляет все токены пользователя и отзывает уже выданные"""
+        from .authentication import revoke_user_tokens
+
+        self.redis.delete(self.get_key(user_id, "access"), self.get_key(user_id, "refresh"))
+        revoke_user_tokens(user_id)
+        return True
@@ -0,0 +1,41 @@
+# token_management/tokens.py
+"""
+Токены JWT с точным временем выпуска.
+
+Claim iat хранит целые секунды, и по нему нельзя отличить токен, выпущенный
+до отзыва, от выпущенного в ту же секунду после него (например, при повторном
+входе). Поэтому токены дополнительно несут iat_us - время выпуска
+в микросекундах, по которому и проверяется отзыв.
+"""
+from rest_framework_simplejwt.tokens import AccessToken as BaseAccessToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+ISSUED_AT_CLAIM = 'iat_us'
+
+
+class PreciseIssuedAtMixin:
+    """Добавляет в новый токен claim iat_us"""
+
+    def __init__(self, token=None, verify=True):
+        super().__init__(token, verify)
+        if token is None:
+            self.payload[ISSUED_AT_CLAIM] = int(self.current_time.timestamp() * 1_000_000)
+
+
+class AccessToken(PreciseIssuedAtMixin, BaseAccessToken):
+    pass
+
+
+class RefreshToken(PreciseIssuedAtMixin, BaseRefreshToken):
+    # access-токен копирует iat и iat_us из refresh-токена, из которого получен
+    access_token_class = AccessToken
+
+
+def is_issued_before(token, moment):
+    """Выпущен ли токен раньше момента moment (секунды, time.time())"""
+    issued_at_us = token.get(ISSUED_AT_CLAIM)
+    if issued_at_us is not None:
+        return issued_at_us < moment * 1_000_000
+    # У токенов без iat_us время выпуска известно с точностью до секунды:
+    # токен той же секунды, что и moment, считается выпущенным раньше
+    return token.get('iat', 0) <= moment
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 
 
@@ -28,4 +31,20 @@ class User(AbstractUser):
         verbose_name_plural = _('Пользователи')
 
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_notify_before_minutes = instance.__dict__.get('notify_before_minutes')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        loaded = getattr(self, '_loaded_notify_before_minutes', None)
+        if loaded is not None and loaded != self.notify_before_minutes:
+            # Сдвигаем время напоминаний всех привычек одним запросом
+            self.habits.filter(next_due_at__isnull=False).update(
+                next_reminder_at=F('next_due_at') - timedelta(minutes=self.notify_before_minutes)
+            )
+        self._loaded_notify_before_minutes = self.notify_before_minutes